@@ -3,10 +3,11 @@ import neat
 import sys
 import os
 import pickle
-from python.car_neat import Car
-from python.raycast import Raycast
-from python.map import Map
-from python.lap_counter import LapCounter
+from python.simulation_core import CarParameters
+from python.track_registry import get_track
+from python.render import DirtyRectRenderer, TextCache
+from python.race import Race, format_standings, write_standings_csv
+from python.checkpoint import restore_checkpoint
 
 from PIL import Image
 
@@ -19,169 +20,213 @@ with Image.open(map_path) as map:
 
 # Fenêtre de jeu pour la course
 WIDTH, HEIGHT = width, height
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Best Cars Race")
-
-clock = pygame.time.Clock()
 
 # Variables de configuration de la voiture
 CAR_WIDTH = 13  # Largeur de la voiture
 CAR_HEIGHT = 23  # Hauteur de la voiture
 CAR_TURN_SPEED = 150  # Vitesse de rotation de la voiture
 
+# Paramètres de la course
+laps_to_complete = 3  # Nombre de tours à compléter pour terminer la course
+LEADERBOARD_SIZE = 20  # Nombre de lignes du tableau des scores affiché
 
-# Charger les meilleurs résultats des voitures depuis le dossier "final_result"
+# Dossier des meilleurs résultats des voitures
 final_result_dir = "final_result"
-car_nets = []  # Liste des réseaux de neurones associés aux voitures
-car_names = []  # Liste des noms des voitures
 
-# Charger les réseaux de neurones et paramètres des voitures depuis le dossier "final_result"
-for file in os.listdir(final_result_dir):
-    if file.endswith(".pkl"):
-        car_name = file[:-4]
-        # Charger les paramètres de la voiture
-        param_file = os.path.join(final_result_dir, f"parameters-{car_name}.txt")
-        with open(param_file, "r") as pf:
-            params = pf.readlines()
-            car_max_speed = float(params[0].strip())  # Vitesse maximale de la voiture
-            car_min_speed = float(params[1].strip())  # Vitesse minimale de la voiture
-            car_acceleration = float(params[2].strip())  # Accélération de la voiture
-            raycast_angles = [float(angle) for angle in params[3].strip().split(",")]  # Angles des rayons pour la détection
-
-        # Charger la configuration NEAT pour chaque voiture
-        config_path = os.path.join(final_result_dir, f"config-{car_name}.txt")
-        config = neat.Config(
-            neat.DefaultGenome,
-            neat.DefaultReproduction,
-            neat.DefaultSpeciesSet,
-            neat.DefaultStagnation,
-            config_path
-        )
 
-        # Charger le meilleur génome
-        with open(os.path.join(final_result_dir, file), "rb") as f:
-            genome = pickle.load(f)
-            car_nets.append(neat.nn.FeedForwardNetwork.create(genome, config))
-            car_names.append(car_name)
-
-# Initialiser les voitures et les compteurs de tours
-game_map = Map()  # Instance de la carte
-total_cars = len(car_names)  # Nombre total de voitures
-cars = []
-raycasts = []
-for i, car_name in enumerate(car_names):
-    # Charger les paramètres de chaque voiture
+def read_parameters(car_name):
+    """
+    Lit le fichier de paramètres d'une voiture (écrit par main_neat.run_neat).
+
+    Paramètres :
+        car_name : str
+            Nom de la voiture.
+
+    Retourne :
+        CarParameters : Caractéristiques de la voiture.
+    """
     param_file = os.path.join(final_result_dir, f"parameters-{car_name}.txt")
     with open(param_file, "r") as pf:
         params = pf.readlines()
-        car_max_speed = float(params[0].strip())
-        car_min_speed = float(params[1].strip())
-        car_acceleration = float(params[2].strip())
-        raycast_angles = [float(angle) for angle in params[3].strip().split(",")]
-        print(raycast_angles)
-    car = Car(game_map.start_position[0], game_map.start_position[1], width=CAR_WIDTH, height=CAR_HEIGHT,
-              max_speed=car_max_speed, acceleration=car_acceleration, turn_speed=CAR_TURN_SPEED, image_path=f"final_result/{car_name}.png")
-    cars.append(car)
-
-    raycast=Raycast([float(angle) for angle in params[3].strip().split(",")])
-    raycasts.append(raycast)
-
-#raycasts = [Raycast([float(angle) for angle in params[3].strip().split(",")]) for car_name in car_names]
-lap_counters = [LapCounter(game_map.checkpoints) for _ in range(total_cars)]
-
-previous_positions = [car.position.copy() for car in cars]  # Positions précédentes des voitures
+        car_max_speed = float(params[0].strip())  # Vitesse maximale de la voiture
+        car_min_speed = float(params[1].strip())  # Vitesse minimale de la voiture
+        car_acceleration = float(params[2].strip())  # Accélération de la voiture
+        raycast_angles = [float(angle) for angle in params[3].strip().split(",")]  # Angles des rayons pour la détection
+    return CarParameters(width=CAR_WIDTH, height=CAR_HEIGHT, max_speed=car_max_speed, min_speed=car_min_speed,
+                         acceleration=car_acceleration, turn_speed=CAR_TURN_SPEED, raycast_angles=raycast_angles,
+                         image_path=f"final_result/{car_name}.png")
+
+
+def load_final_results():
+    """
+    Charge toutes les voitures du dossier "final_result" : chaque fichier de paramètres est lu une seule
+    fois, et les configurations NEAT identiques ne sont chargées qu'une fois.
+
+    Retourne :
+        tuple : (noms, réseaux de neurones, CarParameters) des voitures.
+    """
+    configs = {}  # Contenu du fichier de configuration -> neat.Config
+    car_names, car_nets, car_parameters = [], [], []
+    for file in sorted(os.listdir(final_result_dir)):
+        if not file.endswith(".pkl"):
+            continue
+        car_name = file[:-4]
 
-# Paramètres de la course
-running = True
-race_complete = False
-laps_to_complete = 3  # Nombre de tours à compléter pour terminer la course
+        # Charger la configuration NEAT de la voiture
+        config_path = os.path.join(final_result_dir, f"config-{car_name}.txt")
+        with open(config_path, "r") as cf:
+            config_text = cf.read()
+        if config_text not in configs:
+            configs[config_text] = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet,
+                                               neat.DefaultStagnation, config_path)
 
-# Police d'affichage du tableau des scores
-font = pygame.font.Font(None, 24)
-
-# Boucle principale du jeu
-while running:
-    # Dessiner la carte sur l'écran principal
-    screen.fill((0, 0, 0))  # Remplir l'écran de noir
-    game_map.draw(screen)  # Dessiner la carte sur l'écran
-
-    dt = clock.tick(60) / 1000  # Temps écoulé en secondes (delta time)
-    dt = min(dt, 1 / 30)  # Limiter dt à un maximum de 1/30ème de seconde
-
-    # Gérer les événements utilisateur
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:  # Si l'utilisateur ferme la fenêtre
-            running = False
-            pygame.quit()
-            sys.exit()
-
-    leaderboard = []  # Tableau des scores
-
-    # Mettre à jour chaque voiture
-    for i in range(total_cars):
-        car = cars[i]
-        if not car.active:
-            # Dessiner la voiture en gris si elle est inactive
-            car_surface = pygame.transform.rotate(pygame.transform.scale(car.surface, (car.width, car.height)), car.angle)
-            car_surface.fill((128, 128, 128, 255), special_flags=pygame.BLEND_RGBA_MULT)
-            screen.blit(car_surface, car_surface.get_rect(center=car.position))
-        else:
-            distances, endpoints = raycasts[i].cast_rays(car.position, car.angle, game_map.road_surface)
-            car.draw(screen)  # Dessiner la voiture sur l'écran
-
-            # Normaliser les distances pour le réseau de neurones
-            inputs = [distance / 200 for distance in distances]  # Supposant une distance max de 200 pixels
-            inputs.append(car.speed / car.max_speed)  # Normaliser la vitesse
-            inputs.append(car.angle / 360)  # Normaliser l'angle
-
-            # Entrer les entrées dans le réseau de neurones
-            output = car_nets[i].activate(inputs)
-
-            # Logique d'accélération/décélération
-            if output[0] > 0.5:
-                car.speed += car.acceleration * dt  # Accélérer
-            elif output[0] <= 0.5:
-                car.speed -= car.acceleration * dt  # Décélérer
-                car.speed = max(car.speed, car.min_speed)
-
-            # Logique de rotation
-            if output[1] > 0.5 and abs(car.speed) > 0:
-                car.angle -= car.turn_speed * dt  # Tourner à droite
-            elif output[1] <= 0.5 and abs(car.speed) > 0:
-                car.angle += car.turn_speed * dt  # Tourner à gauche
-
-            car.update(dt)  # Mettre à jour la voiture basée sur les nouvelles valeurs
-
-            # Vérifier le passage des points de contrôle
-            previous_laps = lap_counters[i].laps_completed
-            previous_checkpoints = lap_counters[i].current_checkpoint
-
-            lap_counters[i].check_checkpoint(previous_positions[i], car.position)
-            previous_positions[i] = car.position.copy()
-
-            # Si la voiture a complété un tour, mettre à jour son état
-            if lap_counters[i].laps_completed > previous_laps:
-                if lap_counters[i].laps_completed == laps_to_complete:
-                    car.active = False  # Arrêter la voiture après avoir complété les tours requis
-
-            # Détection de collision avec l'herbe (zones hors route) en utilisant la méthode check_collision de la voiture
-            if car.check_collision(game_map):
-                car.active = False  # Désactiver la voiture si elle touche l'herbe
-
-        # Ajouter la voiture au tableau des scores avec les tours complétés et le point de contrôle actuel
-        leaderboard.append((car_names[i], lap_counters[i].laps_completed, lap_counters[i].current_checkpoint, car.active))
-
-    # Trier le tableau des scores : d'abord par tours complétés, puis par points de contrôle
-    leaderboard.sort(key=lambda x: (x[1], x[2]), reverse=True)
-
-    # Dessiner le tableau des scores dans le coin supérieur droit
-    x_offset = WIDTH - 400
-    y_offset = 10
-    for rank, (car_name, laps_completed, current_checkpoint, active) in enumerate(leaderboard):
-        color = (255, 255, 255) if active else (0, 0, 0)
-        text = font.render(f"rank: {rank}, {car_name}: Laps {laps_completed}, Checkpoint {current_checkpoint}", True, color)
-        screen.blit(text, (x_offset, y_offset))
-        y_offset += 30
-
-    # Mettre à jour l'écran
-    pygame.display.flip()
\ No newline at end of file
+        # Charger le meilleur génome
+        with open(os.path.join(final_result_dir, file), "rb") as f:
+            genome = pickle.load(f)
+        car_names.append(car_name)
+        car_nets.append(neat.nn.FeedForwardNetwork.create(genome, configs[config_text]))
+        car_parameters.append(read_parameters(car_name))
+    return car_names, car_nets, car_parameters
+
+
+def load_checkpoint_field(checkpoint_path, top=None):
+    """
+    Charge tout un plateau depuis un checkpoint d'entraînement : chaque génome de la population
+    devient une voiture (avec les caractéristiques par défaut, celles de l'entraînement).
+
+    Paramètres :
+        checkpoint_path : str
+            Chemin du checkpoint.
+        top : int, optionnel
+            Ne garde que les top meilleurs génomes (fitness du checkpoint).
+
+    Retourne :
+        tuple : (noms, réseaux de neurones, CarParameters) des voitures.
+    """
+    population = restore_checkpoint(checkpoint_path)
+    genomes = sorted(population.population.items(),
+                     key=lambda item: item[1].fitness if item[1].fitness is not None else float("-inf"), reverse=True)
+    if top is not None:
+        genomes = genomes[:top]
+    parameters = CarParameters()
+    return ([f"genome-{genome_id}" for genome_id, _ in genomes],
+            [neat.nn.FeedForwardNetwork.create(genome, population.config) for _, genome in genomes],
+            [parameters] * len(genomes))
+
+
+def race_with_display(race, screen):
+    """
+    Affiche la course dans une fenêtre jusqu'à sa fermeture.
+
+    Paramètres :
+        race : Race
+            Course à afficher.
+        screen : pygame.Surface
+            Fenêtre de jeu.
+    """
+    clock = pygame.time.Clock()
+    cars = race.simulation.cars
+
+    # Police d'affichage du tableau des scores
+    font = pygame.font.Font(None, 24)
+    text_cache = TextCache(font)  # Une ligne n'est rendue à nouveau que si son texte change
+
+    # Affichage par zones : la carte n'est dessinée qu'une fois, puis seules les zones des voitures et du
+    # tableau des scores sont effacées et mises à jour à chaque image
+    renderer = DirtyRectRenderer(screen, race.simulation.game_map.road_surface)
+    results_printed = False
+
+    # Boucle principale du jeu
+    while True:
+        # Effacer les voitures et le tableau des scores de l'image précédente
+        renderer.begin_frame()
+
+        # L'horloge ne sert plus qu'à limiter l'affichage à 60 FPS
+        clock.tick(60)
+
+        # Gérer les événements utilisateur
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:  # Si l'utilisateur ferme la fenêtre
+                pygame.quit()
+                return
+
+        if not race.finished():
+            # Faire avancer d'un tick toutes les voitures en course (elles sont dessinées avant d'avancer)
+            result, stopped = race.step(screen)
+            renderer.add(result.rects)
+
+            # Une voiture arrêtée ne bouge plus : elle est dessinée une seule fois, en gris, dans le fond
+            for i in stopped.tolist():
+                car = cars[i]
+                car_surface = pygame.transform.rotate(pygame.transform.scale(car.surface, (car.width, car.height)),
+                                                      car.angle)
+                car_surface.fill((128, 128, 128, 255), special_flags=pygame.BLEND_RGBA_MULT)
+                renderer.stamp(car_surface, car_surface.get_rect(center=car.position))
+        elif not results_printed:
+            print(format_standings(race.standings()))
+            results_printed = True
+
+        # Dessiner le tableau des scores (les premières voitures du classement) dans le coin supérieur droit
+        x_offset = WIDTH - 400
+        y_offset = 10
+        for row in race.standings()[:LEADERBOARD_SIZE]:
+            color = (255, 255, 255) if row["status"] == "en course" else (0, 0, 0)
+            text = text_cache.render(f"rank: {row['rank']}, {row['name']}: Laps {row['laps']}, "
+                                     f"Checkpoint {row['checkpoint']}", color)
+            renderer.blit(text, (x_offset, y_offset))
+            y_offset += 30
+
+        # Mettre à jour les zones modifiées de l'écran
+        renderer.end_frame()
+
+
+if __name__ == "__main__":
+    # Usage : python FINAL_CAR_RACE.py [--checkpoint=chemin] [--top=N] [--headless] [--results=fichier.csv]
+    #                                  [--raycast=sdf] [--collision=obb] [--laps=3]
+    # "--checkpoint" fait courir toute la population d'un checkpoint (ou ses N meilleurs génomes avec "--top")
+    # au lieu des voitures du dossier "final_result" ; "--headless" fait courir sans fenêtre et affiche le classement
+    checkpoint_path = None
+    top = None
+    headless = "--headless" in sys.argv[1:]
+    results_path = None
+    raycast_backend = "step"
+    collision_mode = "mask"
+    for arg in sys.argv[1:]:
+        if arg.startswith("--checkpoint="):
+            checkpoint_path = arg.split("=", 1)[1]
+        elif arg.startswith("--top="):
+            top = int(arg.split("=", 1)[1])
+        elif arg.startswith("--results="):
+            results_path = arg.split("=", 1)[1]
+        elif arg.startswith("--raycast="):
+            raycast_backend = arg.split("=", 1)[1]
+        elif arg.startswith("--collision="):
+            collision_mode = arg.split("=", 1)[1]
+        elif arg.startswith("--laps="):
+            laps_to_complete = int(arg.split("=", 1)[1])
+
+    if checkpoint_path is not None:
+        car_names, car_nets, car_parameters = load_checkpoint_field(checkpoint_path, top)
+    else:
+        car_names, car_nets, car_parameters = load_final_results()
+    print(f"{len(car_names)} voitures au départ")
+
+    # Fenêtre de jeu (créée avant les voitures : leurs images sont alors converties pour un affichage rapide)
+    screen = None
+    if not headless:
+        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption("Best Cars Race")
+
+    # Simulation à pas de temps fixe : le résultat de la course ne dépend pas de la vitesse de la machine
+    race = Race(get_track(), car_names, car_nets, car_parameters, laps=laps_to_complete,
+                raycast_backend=raycast_backend, collision_mode=collision_mode)
+
+    if headless:
+        standings = race.run()
+        print(format_standings(standings))
+    else:
+        race_with_display(race, screen)
+        standings = race.standings()
+    if results_path:
+        write_standings_csv(results_path, standings)
+        print(f"Classement enregistré dans {results_path}")
@@ -0,0 +1,305 @@
+import json
+import os
+import platform
+import sys
+import time
+
+import neat
+import numpy as np
+import pygame
+
+from python.car_batch import CarBatch
+from python.collision import check_collisions, obb_collisions
+from python.lap_counter import BatchLapCounter
+from python.network_batch import NetworkBatch
+from python.raycast import Raycast, MAX_RAY_DISTANCE, RAYCAST_BACKENDS
+from python.ray_table import get_ray_table
+from python.simulation_core import Simulation, NetworkController
+from python.track_registry import get_track
+from python.checkpoint import restore_checkpoint
+
+import main_neat
+
+# Scénarios fixes : circuit livré, génomes du checkpoint et poses enregistrées une fois par exécution
+CHECKPOINT_PATH = "checkpoint/neat-checkpoint-848"
+TRACK = "map"  # maps/map.json
+POSE_GENOMES = 50  # Génomes dont on enregistre les poses
+POSE_TICKS = 600  # Durée de l'enregistrement (en ticks)
+POSE_COUNT = 2000  # Poses utilisées par les étapes (réparties sur tout l'enregistrement)
+SIMULATION_GENOMES = 100  # Génomes de la simulation complète
+SIMULATION_TICKS = 300  # Durée de la simulation complète (en ticks)
+
+REPEAT = 7  # Mesures par étape (la meilleure est retenue, moins sensible à la charge de la machine)
+THRESHOLD = 0.10  # Ralentissement toléré par rapport à la référence (10 %)
+RESULTS_PATH = "benchmark_results.json"
+BASELINE_PATH = "benchmark_baseline.json"
+
+
+def record_poses(genomes, config, game_map, ticks=POSE_TICKS, count=POSE_COUNT):
+    """
+    Enregistre des poses réalistes en faisant rouler des génomes dans le cœur de simulation déterministe :
+    les mêmes génomes donnent toujours les mêmes poses.
+
+    Paramètres :
+        genomes : list
+            Génomes à faire rouler.
+        config : neat.Config
+            Configuration NEAT.
+        game_map : Map
+            Carte du circuit.
+        ticks : int, optionnel
+            Nombre maximal de ticks enregistrés.
+        count : int, optionnel
+            Nombre de poses retenues.
+
+    Retourne :
+        dict : Tableaux "position" (count, 2), "angle", "speed" et "next_position" (position au tick suivant).
+    """
+    nets = [neat.nn.FeedForwardNetwork.create(genome, config) for genome in genomes]
+    simulation = Simulation(game_map, [main_neat.car_parameters()] * len(nets), NetworkController(nets))
+    batch = simulation.batch
+    positions, angles, speeds, next_positions = [], [], [], []
+
+    for _ in range(ticks):
+        indices = np.flatnonzero(batch.active)
+        if len(indices) == 0:
+            break
+        position = batch.position[indices].copy()
+        angle = batch.angle[indices].copy()
+        speed = batch.speed[indices].copy()
+        result = simulation.step(indices)
+        positions.append(position)
+        angles.append(angle)
+        speeds.append(speed)
+        next_positions.append(batch.position[indices].copy())
+        batch.active[indices[result.collisions]] = False
+
+    positions = np.concatenate(positions)
+    picked = np.linspace(0, len(positions) - 1, min(count, len(positions))).astype(np.intp)
+    return {"position": positions[picked], "angle": np.concatenate(angles)[picked],
+            "speed": np.concatenate(speeds)[picked], "next_position": np.concatenate(next_positions)[picked]}
+
+
+def measure(function, ops, repeat=REPEAT, setup=None):
+    """
+    Mesure une étape : un appel de préchauffe, puis repeat appels chronométrés.
+
+    Paramètres :
+        function : callable
+            Étape à mesurer (sans argument).
+        ops : int
+            Nombre d'opérations effectuées par un appel.
+        repeat : int, optionnel
+            Nombre d'appels chronométrés.
+        setup : callable, optionnel
+            Appelé avant chaque appel, hors chronométrage (remise à zéro de l'état).
+
+    Retourne :
+        dict : ns_per_op, ops, repeat et seconds (durée du meilleur appel).
+    """
+    durations = []
+    for k in range(repeat + 1):
+        if setup is not None:
+            setup()
+        start = time.perf_counter_ns()
+        function()
+        if k > 0:
+            durations.append(time.perf_counter_ns() - start)
+    best = min(durations)
+    return {"ns_per_op": best / ops, "ops": ops, "repeat": repeat, "seconds": best / 1e9}
+
+
+def run_benchmarks(checkpoint_path=CHECKPOINT_PATH, repeat=REPEAT):
+    """
+    Mesure chaque étape chaude de la simulation sur les scénarios fixes.
+
+    Une opération vaut un rayon pour le lancer de rayons, une voiture pour la physique, les collisions
+    et les checkpoints, et un réseau pour l'activation. car_ticks_per_second est le nombre de voitures
+    que l'étape traite par seconde (pour la simulation complète : ticks de voiture réellement simulés).
+
+    Paramètres :
+        checkpoint_path : str, optionnel
+            Checkpoint dont les génomes pilotent les scénarios.
+        repeat : int, optionnel
+            Nombre de mesures par étape.
+
+    Retourne :
+        dict : Résultats lisibles par compare_results (scénario, environnement et étapes).
+    """
+    population = restore_checkpoint(checkpoint_path)
+    config = population.config
+    genomes = [genome for _, genome in sorted(population.population.items())]
+    game_map = get_track(TRACK)
+    parameters = main_neat.car_parameters()
+
+    poses = record_poses(genomes[:POSE_GENOMES], config, game_map)
+    positions, angles = poses["position"], poses["angle"]
+    count = len(positions)
+    rays = len(parameters.raycast_angles)
+    stages = {}
+
+    # Lancer de rayons
+    get_ray_table(game_map)  # La construction de la table ne fait pas partie de la mesure
+    for backend in RAYCAST_BACKENDS:
+        raycast = Raycast(parameters.raycast_angles, backend=backend)
+        stages[f"raycast_{backend}"] = measure(lambda: raycast.cast_rays_batch(positions, angles, game_map),
+                                               count * rays, repeat)
+        stages[f"raycast_{backend}"]["car_ops"] = count
+
+    # Collisions
+    batch = CarBatch(count, game_map.start_position)
+    batch.position[:] = positions
+    batch.angle[:] = angles
+    cars = [batch.view(i, parameters.image_path, width=parameters.width, height=parameters.height)
+            for i in range(count)]
+    # Mode "obb" mesuré comme Simulation l'appelle : directement sur les tableaux de CarBatch
+    stages["collision_mask"] = measure(lambda: check_collisions(cars, game_map, "mask"), count, repeat)
+    stages["collision_obb"] = measure(lambda: obb_collisions(batch.position, batch.angle, parameters.width,
+                                                             parameters.height, game_map.grass_grid), count, repeat)
+
+    # Physique : commandes puis intégration, repartant des poses enregistrées à chaque mesure
+    physics = CarBatch(count, game_map.start_position, max_speed=parameters.max_speed,
+                       acceleration=parameters.acceleration, turn_speed=parameters.turn_speed,
+                       min_speed=parameters.min_speed)
+    throttle = np.where(np.arange(count) % 3 == 0, -1, 1)
+    steer = np.arange(count) % 3 - 1
+
+    def reset_physics():
+        physics.reset(positions)
+        physics.angle[:] = angles
+        physics.speed[:] = poses["speed"]
+
+    def step_physics():
+        physics.apply_commands(throttle, steer, main_neat.FIXED_DT)
+        physics.update(main_neat.FIXED_DT)
+
+    stages["physics"] = measure(step_physics, count, repeat, setup=reset_physics)
+
+    # Passages de checkpoints
+    lap_counter = BatchLapCounter(game_map.checkpoints, count)
+    stages["lap_counter"] = measure(lambda: lap_counter.check_checkpoints(positions, poses["next_position"]),
+                                    count, repeat)
+
+    # Activation des réseaux : toute la population, sur les entrées des premières poses
+    nets = [neat.nn.FeedForwardNetwork.create(genome, config) for genome in genomes]
+    distances, _ = Raycast(parameters.raycast_angles).cast_rays_batch(positions[:len(nets)], angles[:len(nets)],
+                                                                      game_map)
+    inputs = np.column_stack((distances / MAX_RAY_DISTANCE, poses["speed"][:len(nets)] / parameters.max_speed,
+                              angles[:len(nets)] / 360))
+    network_batch = NetworkBatch(nets)
+    stages["network_batch"] = measure(lambda: network_batch.activate(inputs), len(nets), repeat)
+    input_lists = inputs.tolist()
+    stages["network_neat"] = measure(lambda: [net.activate(row) for net, row in zip(nets, input_lists)],
+                                     len(nets), repeat)
+
+    # Simulation complète (capteurs, réseaux, physique, checkpoints, collisions), sans affichage
+    sim_nets = nets[:SIMULATION_GENOMES]
+    car_ticks = []
+
+    def run_simulation():
+        simulation = Simulation(game_map, [parameters] * len(sim_nets), NetworkController(sim_nets))
+        total = 0
+        for _ in range(SIMULATION_TICKS):
+            result = simulation.step()
+            total += len(result.indices)
+            simulation.batch.active[result.indices[result.collisions]] = False
+        car_ticks.append(total)
+
+    run_simulation()
+    stages["simulation"] = measure(run_simulation, car_ticks[0], repeat)
+
+    for stage in stages.values():
+        stage["car_ticks_per_second"] = stage.get("car_ops", stage["ops"]) / stage["seconds"]
+
+    return {
+        "scenario": {"checkpoint": checkpoint_path, "track": TRACK, "poses": count, "rays": rays,
+                     "genomes": len(nets), "simulation_genomes": len(sim_nets),
+                     "simulation_ticks": SIMULATION_TICKS},
+        "environment": {"python": platform.python_version(), "numpy": np.__version__,
+                        "machine": platform.machine(), "processor": platform.processor()},
+        "stages": stages,
+    }
+
+
+def compare_results(results, baseline, threshold=THRESHOLD):
+    """
+    Compare des résultats à une référence, étape par étape.
+
+    Paramètres :
+        results, baseline : dict
+            Résultats de run_benchmarks.
+        threshold : float, optionnel
+            Ralentissement toléré : une étape régresse si son ns/op dépasse celui de la référence
+            de plus de threshold (0.10 = 10 %).
+
+    Retourne :
+        list : Un dict par étape commune (stage, baseline, current, ratio, regression), dans l'ordre des résultats.
+    """
+    comparison = []
+    for name, stage in results["stages"].items():
+        reference = baseline.get("stages", {}).get(name)
+        if reference is None:
+            continue
+        ratio = stage["ns_per_op"] / reference["ns_per_op"]
+        comparison.append({"stage": name, "baseline": reference["ns_per_op"], "current": stage["ns_per_op"],
+                           "ratio": ratio, "regression": ratio > 1 + threshold})
+    return comparison
+
+
+def format_results(results):
+    """
+    Retourne :
+        str : Tableau lisible des étapes (ns/op et voitures traitées par seconde).
+    """
+    lines = [f"{'étape':<16}{'ns/op':>14}{'voitures/s':>16}"]
+    for name, stage in results["stages"].items():
+        lines.append(f"{name:<16}{stage['ns_per_op']:>14.1f}{stage['car_ticks_per_second']:>16.0f}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # Usage : python benchmark.py [checkpoint] [--repeat=7] [--output=benchmark_results.json]
+    #                             [--baseline=benchmark_baseline.json] [--threshold=0.10] [--save-baseline]
+    # "--save-baseline" enregistre les résultats comme nouvelle référence ;
+    # sinon, ils sont comparés à la référence si elle existe (code de sortie 1 en cas de régression).
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    checkpoint_path = args[0] if args else CHECKPOINT_PATH
+    repeat = REPEAT
+    output_path = RESULTS_PATH
+    baseline_path = BASELINE_PATH
+    threshold = THRESHOLD
+    for arg in sys.argv[1:]:
+        if arg.startswith("--repeat="):
+            repeat = int(arg.split("=", 1)[1])
+        elif arg.startswith("--output="):
+            output_path = arg.split("=", 1)[1]
+        elif arg.startswith("--baseline="):
+            baseline_path = arg.split("=", 1)[1]
+        elif arg.startswith("--threshold="):
+            threshold = float(arg.split("=", 1)[1])
+
+    pygame.init()
+    results = run_benchmarks(checkpoint_path, repeat)
+    print(format_results(results))
+
+    with open(output_path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nRésultats enregistrés dans {output_path}")
+
+    if "--save-baseline" in sys.argv[1:]:
+        with open(baseline_path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Référence enregistrée dans {baseline_path}")
+    elif os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        comparison = compare_results(results, baseline, threshold)
+        print(f"\nComparaison avec {baseline_path} (seuil : +{threshold:.0%}) :")
+        for row in comparison:
+            status = "RÉGRESSION" if row["regression"] else "ok"
+            print(f"  {row['stage']:<16}{row['baseline']:>12.1f} -> {row['current']:>12.1f} ns/op "
+                  f"({row['ratio'] - 1:+.1%})  {status}")
+        if any(row["regression"] for row in comparison):
+            sys.exit(1)
+    else:
+        print(f"Aucune référence ({baseline_path}) : lancer avec --save-baseline pour en créer une")
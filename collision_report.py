@@ -0,0 +1,84 @@
+import sys
+import neat
+import numpy as np
+import pygame
+
+from python.car_neat import Car
+from python.simulation_core import Simulation, NetworkController
+from python.track_registry import get_track
+from python.checkpoint import restore_checkpoint
+from python.collision import collision_disagreement_report
+
+import main_neat
+
+# Nombre de génomes du checkpoint dont on enregistre la trajectoire
+TRAJECTORY_COUNT = 30
+MAX_TICKS = 2000  # Durée maximale d'une trajectoire (en ticks)
+EDGE_SAMPLES = (0, 1, 2)  # Nombres de points par bord comparés
+
+
+def record_trajectories(genomes, config, game_map, max_ticks=MAX_TICKS):
+    """
+    Enregistre la trajectoire de chaque génome, simulée par le même cœur (Simulation) que l'entraînement.
+
+    La collision de référence (masques pixel par pixel) termine la trajectoire : la dernière pose
+    enregistrée est donc celle de la collision.
+
+    Paramètres :
+        genomes : list
+            Génomes à faire rouler.
+        config : neat.Config
+            Configuration NEAT.
+        game_map : Map
+            Carte du circuit.
+        max_ticks : int, optionnel
+            Nombre maximal de ticks par trajectoire.
+
+    Retourne :
+        list : Une liste de poses (x, y, angle) par génome.
+    """
+    nets = [neat.nn.FeedForwardNetwork.create(genome, config) for genome in genomes]
+    simulation = Simulation(game_map, [main_neat.car_parameters()] * len(nets), NetworkController(nets),
+                            raycast_backend=main_neat.RAYCAST_BACKEND, collision_mode="mask")
+    batch = simulation.batch
+    trajectories = [[] for _ in nets]
+
+    for _ in range(max_ticks):
+        indices = np.flatnonzero(batch.active)
+        if len(indices) == 0:
+            break
+        result = simulation.step(indices)
+        for i in indices.tolist():
+            trajectories[i].append((float(batch.position[i, 0]), float(batch.position[i, 1]),
+                                    float(batch.angle[i])))
+        batch.active[indices[result.collisions]] = False
+
+    return trajectories
+
+
+if __name__ == "__main__":
+    # Usage : python collision_report.py [checkpoint]
+    checkpoint_path = sys.argv[1] if len(sys.argv) > 1 else "checkpoint/neat-checkpoint-848"
+
+    pygame.init()
+    population = restore_checkpoint(checkpoint_path)
+    genomes = sorted(population.population.values(),
+                     key=lambda g: g.fitness if g.fitness is not None else float("-inf"), reverse=True)
+    game_map = get_track(main_neat.TRACK)
+
+    print(f"Enregistrement de {TRAJECTORY_COUNT} trajectoires depuis {checkpoint_path}...")
+    trajectories = record_trajectories(genomes[:TRAJECTORY_COUNT], population.config, game_map)
+
+    reference_car = Car(0, 0, width=main_neat.CAR_WIDTH, height=main_neat.CAR_HEIGHT,
+                        image_path=main_neat.image_path)
+    for edge_samples in EDGE_SAMPLES:
+        report = collision_disagreement_report(trajectories, reference_car, game_map, edge_samples)
+        deltas = report["first_hit_tick_deltas"]
+        print(f"\nMode obb, {edge_samples} point(s) par bord :")
+        print(f"  poses : {report['poses']} sur {report['trajectories']} trajectoires")
+        print(f"  accord : {report['both']} collisions, {report['neither']} sans collision")
+        print(f"  désaccord : {report['mask_only']} vues seulement par le masque, "
+              f"{report['obb_only']} seulement par obb ({report['disagreement_rate']:.2%})")
+        if deltas:
+            print(f"  écart de la première collision (obb - masque) : "
+                  f"min {min(deltas)}, max {max(deltas)}, moyenne {sum(deltas) / len(deltas):.2f} ticks")
@@ -1,10 +1,9 @@
 import pygame
+import numpy as np
 import sys
 
-from python.car_neat import Car
-from python.raycast import Raycast
-from python.map import Map
-from python.lap_counter import LapCounter
+from python.simulation_core import Simulation, CarParameters
+from python.track_registry import get_track
 
 from PIL import Image
 
@@ -33,13 +32,41 @@ CAR_MIN_SPEED = 0  # Vitesse minimale de la voiture
 CAR_ACCELERATION = 80  # Accélération de la voiture
 image_path = "cars/Red_Car.png"  # Chemin vers l'image de la voiture
 
-# Création de l'objet voiture
+
+class KeyboardController:
+    """
+    Pilote la voiture avec les flèches du clavier.
+    """
+
+    def commands(self, simulation, inputs, indices):
+        """
+        Paramètres :
+            simulation : Simulation
+                Simulation pilotée.
+            inputs : numpy.ndarray
+                Entrées des capteurs (inutilisées).
+            indices : numpy.ndarray
+                Voitures pilotées.
+
+        Retourne :
+            tuple : (accélération, direction) pour chaque voiture (voir CarBatch.apply_commands).
+        """
+        # Récupère les touches enfoncées
+        keys = pygame.key.get_pressed()
+
+        # Accélère (haut) ou décélère (bas) ; la vitesse reste entre la vitesse minimale et maximale
+        throttle = 1 if keys[pygame.K_UP] else -1 if keys[pygame.K_DOWN] else 0
+        # Tourne à droite ou à gauche (uniquement si la voiture bouge)
+        steer = -1 if keys[pygame.K_RIGHT] else 1 if keys[pygame.K_LEFT] else 0
+        return np.full(len(indices), throttle), np.full(len(indices), steer)
+
+
+# Création de la simulation avec une seule voiture
 # Utilise la position de départ de la carte pour initialiser la voiture
-game_map = Map()
-car = Car(game_map.start_position[0], game_map.start_position[1],
-          width=CAR_WIDTH, height=CAR_HEIGHT,
-          max_speed=CAR_MAX_SPEED, acceleration=CAR_ACCELERATION,
-          turn_speed=CAR_TURN_SPEED, image_path=image_path)
+game_map = get_track()  # Carte partagée du circuit par défaut
+car_parameters = CarParameters(width=CAR_WIDTH, height=CAR_HEIGHT, max_speed=CAR_MAX_SPEED, min_speed=CAR_MIN_SPEED,
+                               acceleration=CAR_ACCELERATION, turn_speed=CAR_TURN_SPEED, image_path=image_path)
+simulation = Simulation(game_map, [car_parameters], KeyboardController())
 
 # Variable pour indiquer si le jeu est en cours
 running = True
@@ -52,11 +79,8 @@ while running:
     # Dessine l'environnement de jeu
     game_map.draw(screen)
 
-    # Calcul du delta temps réel en utilisant l'horloge
-    dt = clock.tick(60) / 1000  # Delta temps en secondes (temps réel)
-
-    # Limite le delta temps pour éviter des sauts trop grands (utile quand les FPS chutent)
-    dt = min(dt, 1 / 30)  # Limite dt à un maximum de 1/30 de seconde
+    # L'horloge ne sert plus qu'à limiter l'affichage à 60 FPS : la simulation avance par pas de temps fixes
+    clock.tick(60)
 
     # Gestion des événements
     for event in pygame.event.get():
@@ -65,34 +89,13 @@ while running:
             pygame.quit()
             sys.exit()
 
-    # Récupère les touches enfoncées
-    keys = pygame.key.get_pressed()
-
-    # Logique d'accélération/décélération
-    if keys[pygame.K_UP]:
-        car.speed += CAR_ACCELERATION * dt  # Accélère la voiture
-        car.speed = min(car.speed, CAR_MAX_SPEED)  # Limite la vitesse maximale
-    elif keys[pygame.K_DOWN]:
-        car.speed -= CAR_ACCELERATION * dt  # Décélère la voiture
-        car.speed = max(car.speed, CAR_MIN_SPEED)  # Limite la vitesse minimale
-
-    # Logique de rotation
-    if keys[pygame.K_RIGHT] and abs(car.speed) > 0:
-        car.angle -= CAR_TURN_SPEED * dt  # Tourne à droite
-    elif keys[pygame.K_LEFT] and abs(car.speed) > 0:
-        car.angle += CAR_TURN_SPEED * dt  # Tourne à gauche
-
-    # Mise à jour de la voiture avec les nouvelles valeurs
-    car.update(dt)
-
-    # Dessine la voiture sur l'écran
-    car.draw(screen)
+    # Dessine la voiture puis la fait avancer d'un tick selon les touches enfoncées
+    result = simulation.step(screen=screen)
 
     # Vérifie la collision avec la carte
-    if car.check_collision(game_map):
+    if result.collisions.any():
         print("Collision détectée ! Réinitialisation de la position de la voiture.")
-        car.reset(game_map.start_position)  # Réinitialise la position de la voiture
-        car.speed = 0  # Réinitialise la vitesse à 0
+        simulation.reset_cars([0])  # Réinitialise la position et la vitesse de la voiture
 
 # Point d'entrée du script
 if __name__ == "__main__":
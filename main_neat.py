@@ -3,20 +3,34 @@ import neat
 import sys
 import os
 import pickle
+import random
 
 
 
 
 #from FINAL_CAR_RACE import car_min_speed
-from python.car_neat import Car
-from python.raycast import Raycast
-from python.map import Map
-from python.lap_counter import LapCounter
+from python.simulation_core import CarParameters, NetworkController
+from python.simulation import (PopulationSimulation, CullingRules, resolve_generation, culling_report,
+                               format_culling_report, MAX_TICKS)
+from python.parallel_eval import ShardedEvaluator
+from python.profiling import StageProfiler, ProfilingReporter
+from python.checkpoint import AsyncCheckpointer, restore_checkpoint
+from python.spectator import SpectatorStream
+from python.render import DirtyRectRenderer
+from python.scenarios import Scenario, parse_scenarios, aggregate_fitness, format_scenario_fitness
+from python.fitness_cache import (FitnessCache, genome_digest, evaluation_digest, format_cache_report,
+                                  FITNESS_CACHE_SIZE)
+from python.ray_table import get_ray_table
+from python.replay import ReplayReporter, REPLAY_DIR
 
 from PIL import Image
 
 
 
+# Pilote vidéo choisi par l'utilisateur, relevé avant qu'init_display ne le remplace par "dummy"
+# (le spectateur le rétablit pour ouvrir sa fenêtre)
+VIDEO_DRIVER = os.environ.get("SDL_VIDEODRIVER")
+
 # Initialise Pygame
 pygame.init()
 
@@ -27,12 +41,16 @@ with Image.open(map_path) as map:
 
 # Définition des dimensions de la fenêtre du jeu
 WIDTH, HEIGHT = width, height
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Course des Meilleures Voitures")
+screen = None  # Fenêtre du jeu, créée par init_display()
 
 # Horloge pour contrôler le taux de rafraîchissement
 clock = pygame.time.Clock()
 
+# Pas de temps simulé fixe : la fitness ne dépend plus du taux de rafraîchissement réel
+FIXED_DT = 1 / 60
+HEADLESS = False  # Mode sans affichage (entraînement aussi rapide que le CPU le permet)
+SEED = None  # Graine : avec la même graine, un entraînement depuis zéro est reproductible au bit près
+
 # Variables de configuration de la voiture
 CAR_WIDTH = 13  # Largeur de la voiture
 CAR_HEIGHT = 23  # Hauteur de la voiture
@@ -43,12 +61,112 @@ CAR_MAX_SPEED = 2000  # Vitesse maximale de la voiture
 CAR_MIN_SPEED = 0  # Vitesse minimale de la voiture
 CAR_ACCELERATION = 80  # Accélération de la voiture
 Raycast_angles = [-67.5, -45, -22.5, 0, 22.5, 45, 67.5]  # Angles des rayons pour la détection
-image_path = "cars/Blue_F1.png"  # Chemin vers l'image de la voiture
+TRACK = "map"  # Circuit d'entraînement (maps/map.json)
+# Scénarios d'évaluation "circuit[@position][*poids],..." (ex. "map,map@1,road-train") : chaque génome est évalué
+# sur chaque circuit et chaque position de départ, puis sa fitness est agrégée. None : TRACK seul, position 0
+SCENARIOS = None
+FITNESS_AGGREGATE = "mean"  # Agrégation de la fitness sur les scénarios : "mean", "min" ou "weighted"
+scenarios = []  # Scénarios de l'entraînement en cours (Scenario)
+
+# Cache de fitness : un génome déjà évalué dans les mêmes conditions (élites, génomes identiques) n'est pas
+# simulé à nouveau (désactivé par "--no-fitness-cache")
+FITNESS_CACHE = True
+fitness_cache = None  # FitnessCache de l'entraînement en cours
+RAYCAST_BACKEND = "step"  # Algorithme de lancer de rayons : "step" (pixel par pixel), "sdf" (champ de distance)
+                          # ou "lut" (table des distances précalculée, approchée)
+COLLISION_MODE = "mask"  # Détection des collisions : "mask" (pixel par pixel) ou "obb" (rectangle orienté)
+
+# Élimination anticipée des voitures qui ne progressent plus (activée par "--cull")
+CULLING = False
+CULL_PROGRESS_TICKS = 600  # Aucun nouveau checkpoint pendant ce nombre de ticks
+CULL_SLOW_SPEED = 10  # Vitesse inférieure à ce seuil...
+CULL_SLOW_TICKS = 180  # ...pendant ce nombre de ticks consécutifs
+CULL_PENALTY = 0  # Pénalité de fitness d'une voiture éliminée
+
+# Profilage de chaque génération par étape (activé par "--profile")
+PROFILE = False
+PROFILE_CSV = "profiling/profile.csv"  # Une ligne par étape et par génération
+PROFILE_JSON = "profiling/profile.jsonl"  # Un objet par génération (avec le nombre de voitures à chaque tick)
+profiler = StageProfiler(enabled=False)
+
+# Checkpoints compressés écrits en arrière-plan ; en mode différentiel (activé par "--delta-checkpoints"),
+# un checkpoint ne stocke que les génomes absents des précédents (et dépend donc d'eux)
+CHECKPOINT_DELTAS = False
+CHECKPOINT_FULL_INTERVAL = 10  # Un checkpoint complet tous les 10 checkpoints
+
+# Spectateur (activé par "--spectator") : l'entraînement tourne sans affichage et un processus séparé
+# dessine les meilleures voitures à sa propre fréquence, sans ralentir la simulation
+SPECTATOR = False
+SPECTATOR_BEST = 10  # Nombre de voitures affichées (0 : toutes les voitures actives)
+SPECTATOR_EVERY = 1  # Diffuse une génération sur SPECTATOR_EVERY
+spectator = None  # SpectatorStream de l'entraînement en cours
+
+# Replays (activés par "--replay=N") : après chaque génération, les trajectoires des N meilleurs génomes sont
+# enregistrées dans REPLAY_DIR (un fichier .npz par génération), à revoir avec replay_player.py
+REPLAY_BEST = 0  # 0 : aucun replay
+REPLAY_EVERY = 1  # Enregistre une génération sur REPLAY_EVERY
+image_path = "Cars/Blue_F1.png"  # Chemin vers l'image de la voiture
 team_name = "Agarfield F1"  # Nom de l'équipe
 
 # Variables pour NEAT
-GENERATION = 0  # Génération actuelle
+GENERATION = 0  # Génération actuelle, numérotée par neat (voir GenerationReporter)
+
+
+class GenerationReporter(neat.reporting.BaseReporter):
+    def start_generation(self, generation):
+        """
+        Relève le numéro de la génération de neat dans GENERATION (il reprend au numéro du checkpoint
+        restauré, contrairement à un simple compteur des appels à eval_genomes).
+
+        Paramètres :
+            generation : int
+                Génération qui commence.
+        """
+        global GENERATION
+        GENERATION = generation
+
+
+def init_display(headless=False):
+    """
+    Crée la fenêtre du jeu, ou une surface factice en mode sans affichage.
+
+    Paramètres :
+        headless : bool, optionnel
+            Si True, utilise le pilote vidéo "dummy" de SDL : aucune fenêtre n'est ouverte,
+            ce qui permet l'entraînement sur des machines sans écran.
+    """
+    global screen, HEADLESS
+    HEADLESS = headless
+
+    if headless:
+        # Le pilote "dummy" doit être choisi avant l'initialisation du module d'affichage
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        pygame.display.quit()
+        pygame.display.init()
+        # Une surface minimale suffit pour que convert()/convert_alpha() fonctionnent
+        screen = pygame.display.set_mode((1, 1))
+    else:
+        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption("Course des Meilleures Voitures")
+
+def car_parameters():
+    """
+    Retourne :
+        CarParameters : Caractéristiques des voitures définies en tête de ce fichier.
+    """
+    return CarParameters(width=CAR_WIDTH, height=CAR_HEIGHT, max_speed=CAR_MAX_SPEED, min_speed=CAR_MIN_SPEED,
+                         acceleration=CAR_ACCELERATION, turn_speed=CAR_TURN_SPEED, raycast_angles=Raycast_angles,
+                         image_path=image_path)
 
+def culling_rules():
+    """
+    Retourne :
+        CullingRules : Règles d'élimination anticipée, ou None si CULLING est désactivé.
+    """
+    if not CULLING:
+        return None
+    return CullingRules(progress_ticks=CULL_PROGRESS_TICKS, slow_speed=CULL_SLOW_SPEED, slow_ticks=CULL_SLOW_TICKS,
+                        penalty=CULL_PENALTY)
 
 # Charge la configuration de NEAT
 def load_config(config_path):
@@ -71,7 +189,9 @@ def load_config(config_path):
     )
 
 # Exécute l'algorithme NEAT et sauvegarde la meilleure configuration de voiture
-def run_neat(config_file, checkpoint_path=None):
+def run_neat(config_file, checkpoint_path=None, headless=False, raycast_backend=None, collision_mode=None,
+             workers=1, culling=None, seed=None, profile=None, delta_checkpoints=None, spectator_mode=None,
+             scenario_spec=None, aggregate=None, cache_fitness=None, replay_best=None):
     """
     Exécute l'algorithme NEAT et sauvegarde la meilleure configuration de voiture.
 
@@ -80,30 +200,134 @@ def run_neat(config_file, checkpoint_path=None):
             Chemin vers le fichier de configuration.
         checkpoint_path : str, optionnel
             Chemin vers le fichier de checkpoint pour charger la progression précédente.
+        headless : bool, optionnel
+            Si True, entraîne sans affichage ni limitation du nombre d'images par seconde.
+            Le pas de temps simulé (FIXED_DT) est identique dans les deux modes.
+        raycast_backend : str, optionnel
+            Algorithme de lancer de rayons ("step", "sdf" ou "lut"). Par défaut, RAYCAST_BACKEND.
+        collision_mode : str, optionnel
+            Détection des collisions ("mask" ou "obb"). Par défaut, COLLISION_MODE.
+        workers : int, optionnel
+            Nombre de processus d'évaluation. Au-delà de 1, la population est évaluée en parallèle
+            et sans affichage ; la fitness obtenue est identique à celle de l'évaluation séquentielle.
+        culling : bool, optionnel
+            Active l'élimination anticipée des voitures (règles CULL_*). Par défaut, CULLING.
+        seed : int, optionnel
+            Graine de NEAT et de la simulation (sans effet sur une population restaurée depuis un
+            checkpoint, qui contient son propre état aléatoire).
+        profile : bool, optionnel
+            Affiche et enregistre (PROFILE_CSV, PROFILE_JSON) le temps passé dans chaque étape de
+            chaque génération. Par défaut, PROFILE.
+        delta_checkpoints : bool, optionnel
+            Écrit des checkpoints différentiels. Par défaut, CHECKPOINT_DELTAS.
+        spectator_mode : bool, optionnel
+            Entraîne sans affichage et diffuse les meilleures voitures vers une fenêtre de spectateur
+            (SPECTATOR_BEST, SPECTATOR_EVERY ; évaluation séquentielle uniquement). Par défaut, SPECTATOR.
+        scenario_spec : str, optionnel
+            Scénarios d'évaluation (circuits et positions de départ). Par défaut, SCENARIOS.
+        aggregate : str, optionnel
+            Agrégation de la fitness sur les scénarios. Par défaut, FITNESS_AGGREGATE.
+        cache_fitness : bool, optionnel
+            Réutilise l'historique des génomes déjà évalués au lieu de les simuler (la fitness obtenue est
+            identique). Par défaut, FITNESS_CACHE.
+        replay_best : int, optionnel
+            Enregistre après chaque génération le replay de ce nombre de meilleurs génomes, sur le premier
+            scénario (0 : aucun replay). Par défaut, REPLAY_BEST.
     """
-    global team_name
+    global team_name, RAYCAST_BACKEND, COLLISION_MODE, CULLING, SEED, PROFILE, CHECKPOINT_DELTAS, SPECTATOR
+    global SCENARIOS, FITNESS_AGGREGATE, FITNESS_CACHE, REPLAY_BEST, spectator, scenarios, fitness_cache
+
+    if raycast_backend is not None:
+        RAYCAST_BACKEND = raycast_backend
+    if collision_mode is not None:
+        COLLISION_MODE = collision_mode
+    if culling is not None:
+        CULLING = culling
+    if seed is not None:
+        SEED = seed
+    if profile is not None:
+        PROFILE = profile
+    if delta_checkpoints is not None:
+        CHECKPOINT_DELTAS = delta_checkpoints
+    if spectator_mode is not None:
+        SPECTATOR = spectator_mode
+    if scenario_spec is not None:
+        SCENARIOS = scenario_spec
+    if aggregate is not None:
+        FITNESS_AGGREGATE = aggregate
+    if cache_fitness is not None:
+        FITNESS_CACHE = cache_fitness
+    if replay_best is not None:
+        REPLAY_BEST = replay_best
+    if SPECTATOR and workers > 1:
+        print("Le spectateur n'est disponible qu'avec l'évaluation séquentielle (--workers=1)")
+        SPECTATOR = False
+    if SEED is not None:
+        random.seed(SEED)  # NEAT utilise le module random (population initiale, mutations, croisements)
+
+    # L'évaluation parallèle n'affiche rien ; avec le spectateur, c'est lui qui affiche
+    init_display(headless or workers > 1 or SPECTATOR)
+    # Les circuits sont chargés ici, une seule fois pour toutes les générations
+    scenarios = parse_scenarios(SCENARIOS) if SCENARIOS else [Scenario(TRACK)]
+    for scenario in scenarios:
+        game_map = scenario.game_map()
+        if RAYCAST_BACKEND == "lut":
+            # Table des rayons calculée (ou ouverte) avant le lancement des processus de travail, qui
+            # l'ouvrent ensuite en lecture seule depuis le cache disque
+            get_ray_table(game_map)
+    fitness_cache = FitnessCache(FITNESS_CACHE_SIZE) if FITNESS_CACHE else None
+    if SPECTATOR:
+        spectator = SpectatorStream(scenarios[0].track, image_path, CAR_WIDTH, CAR_HEIGHT, best=SPECTATOR_BEST,
+                                    every=SPECTATOR_EVERY, video_driver=VIDEO_DRIVER)
 
     if checkpoint_path and os.path.exists(checkpoint_path):
-        # Charge la population depuis un checkpoint
-        population = neat.Checkpointer.restore_checkpoint(checkpoint_path)
+        # Charge la population depuis un checkpoint (format compact ou checkpoint gzip de neat)
+        population = restore_checkpoint(checkpoint_path)
     else:
         # Crée une nouvelle population
         config = load_config(config_file)
         population = neat.Population(config)
 
     # Ajoute des reporters pour afficher les informations
+    population.add_reporter(GenerationReporter())
     population.add_reporter(neat.StdOutReporter(True))
     stats = neat.StatisticsReporter()
     population.add_reporter(stats)
+    if PROFILE:
+        population.add_reporter(ProfilingReporter(profiler, csv_path=PROFILE_CSV, json_path=PROFILE_JSON))
+    if REPLAY_BEST > 0:
+        population.add_reporter(ReplayReporter(REPLAY_BEST, scenarios[0], car_parameters(),
+                                               raycast_backend=RAYCAST_BACKEND, collision_mode=COLLISION_MODE,
+                                               max_ticks=MAX_TICKS, dt=FIXED_DT, culling=culling_rules(), seed=SEED,
+                                               directory=REPLAY_DIR, every=REPLAY_EVERY))
 
     # Ajoute un Checkpointer pour sauvegarder la progression toutes les 5 générations
     checkpoint_dir = "checkpoint"
     if not os.path.exists(checkpoint_dir):
         os.makedirs(checkpoint_dir)
-    population.add_reporter(neat.Checkpointer(5, filename_prefix=os.path.join(checkpoint_dir, "neat-checkpoint-")))
+    checkpointer = AsyncCheckpointer(5, filename_prefix=os.path.join(checkpoint_dir, "neat-checkpoint-"),
+                                     deltas=CHECKPOINT_DELTAS, full_interval=CHECKPOINT_FULL_INTERVAL)
+    population.add_reporter(checkpointer)
 
     # Exécute l'algorithme NEAT
-    winner = population.run(eval_genomes, 2000) # 50 générations
+    try:
+        if workers > 1:
+            evaluator = ShardedEvaluator(workers, car_parameters(), track_name=TRACK, raycast_backend=RAYCAST_BACKEND,
+                                         collision_mode=COLLISION_MODE, culling=culling_rules(), seed=SEED,
+                                         profiler=profiler, scenarios=scenarios, aggregate=FITNESS_AGGREGATE,
+                                         cache=fitness_cache)
+            try:
+                winner = population.run(evaluator.evaluate, 2000)
+            finally:
+                evaluator.close()
+        else:
+            winner = population.run(eval_genomes, 2000) # 50 générations
+    finally:
+        # Attend l'écriture des derniers checkpoints
+        checkpointer.close()
+        if spectator is not None:
+            spectator.close()
+            spectator = None
 
     # Sauvegarde le meilleur génome et sa configuration
     final_result_dir = "final_result"
@@ -132,7 +356,8 @@ raycast_visible = False
 # Fonction d'évaluation des génomes
 def eval_genomes(genomes, config):
     """
-    Évalue chaque génome dans la population pour déterminer la meilleure voiture.
+    Évalue chaque génome dans la population pour déterminer la meilleure voiture, sur chaque scénario
+    d'évaluation (voir SCENARIOS).
 
     Paramètres :
         genomes : list
@@ -140,161 +365,186 @@ def eval_genomes(genomes, config):
         config : neat.Config
             Configuration utilisée pour le réseau neuronal.
     """
-    global GENERATION, raycast_visible, Raycast_angles, CAR_MAX_SPEED, CAR_MIN_SPEED, CAR_ACCELERATION, image_path
-    GENERATION += 1
-
     nets = []
     ge = []
-    cars = []
-
-    # Charge la carte
-    game_map = Map()
 
     for genome_id, genome in genomes:
         genome.fitness = 0  # Fitness initiale
         net = neat.nn.FeedForwardNetwork.create(genome, config)
         nets.append(net)
-
-        # Crée une nouvelle voiture pour chaque génome
-        car = Car(game_map.start_position[0], game_map.start_position[1],
-                  width=CAR_WIDTH, height=CAR_HEIGHT,
-                  max_speed=CAR_MAX_SPEED, acceleration=CAR_ACCELERATION,
-                  turn_speed=CAR_TURN_SPEED, image_path=image_path, min_speed=CAR_MIN_SPEED)
-        cars.append(car)
         ge.append(genome)
+    genome_keys = None
+    if fitness_cache is not None:
+        fitness_cache.begin_generation()
+        genome_keys = [genome_digest(genome) for genome in ge]
+    controllers = {}  # Réseaux compilés une seule fois pour tous les scénarios
+
+    # Chaque scénario simule toute la population à la fois ; seul le premier est affiché
+    evaluated = scenarios or [Scenario(TRACK)]
+    scenario_fitnesses = [simulate_scenario(nets, genome_keys, controllers, scenario, show=k == 0)
+                          for k, scenario in enumerate(evaluated)]
+
+    # Fitness finale : agrégation des fitness de chaque scénario
+    fitnesses = aggregate_fitness(scenario_fitnesses, evaluated, FITNESS_AGGREGATE)
+    for genome, fitness in zip(ge, fitnesses):
+        genome.fitness = float(fitness)
+    if len(evaluated) > 1:
+        print(format_scenario_fitness(scenario_fitnesses, evaluated))
+    if fitness_cache is not None:
+        print(format_cache_report(fitness_cache.report()))
+
+def simulate_scenario(nets, genome_keys, controllers, scenario, show=True):
+    """
+    Simule toute la population sur un scénario (circuit et position de départ). Les génomes dont
+    l'historique est dans le cache de fitness ne sont pas simulés, sauf sur le scénario affiché ou
+    diffusé au spectateur.
 
-    # Crée l'objet Raycast avec des angles personnalisés
-    angles = Raycast_angles  # Angles modulables des rayons
-    raycast = Raycast(angles)
-
-    # Compteur de tours pour toutes les voitures
-    lap_counters = [LapCounter(game_map.checkpoints) for _ in range(len(cars))]
-    
-    checkpoint_claimed = [False] * len(game_map.checkpoints)
-
-    previous_positions = [car.position.copy() for car in cars]
+    Paramètres :
+        nets : list
+            Réseaux de neurones de la population.
+        genome_keys : list
+            Empreinte de chaque génome (voir genome_digest), ou None sans cache de fitness.
+        controllers : dict
+            Contrôleurs déjà compilés pendant cette génération, par tuple d'indices des voitures simulées
+            (partagés entre les scénarios).
+        scenario : Scenario
+            Circuit et position de départ.
+        show : bool, optionnel
+            Affiche la simulation (hors mode sans affichage) et la diffuse au spectateur.
 
-    running = True
-    max_time = 2000  # Temps maximum avant la fin de la génération
-    current_time = 0
-
-    while running and len(cars) > 0 and current_time < max_time:
-        pygame.display.flip()
-        # Dessine l'environnement
-        game_map.draw(screen)
-
-        # Calcul du delta temps réel en utilisant l'horloge
-        dt = clock.tick(60) / 1000  # Delta temps en secondes (temps réel)
-
-        # Limite le delta temps pour éviter des sauts trop grands (utile quand les FPS chutent)
-        dt = min(dt, 1 / 30)  # Limite dt à un maximum de 1/30 de seconde
-        current_time += 1  # Incrémente le temps
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r:
-                    raycast_visible = not raycast_visible  # Affiche ou masque les rayons
-
-        for i in range(len(cars)):
-            car = cars[i]
-
-            if not car.active:
-                continue  # Ignore les voitures inactives
-
-            # Mise à jour de la voiture
-            distances, endpoints = raycast.cast_rays(car.position, car.angle, game_map.road_surface)
-
-            car.draw(screen)
-
-            if raycast_visible:
-                raycast.draw_rays(screen, car.position, endpoints)
-
-            # Normalise les distances pour le réseau neuronal
-            inputs = [distance / 200 for distance in distances]  # Supposons une distance maximale de 200 pixels
-            inputs.append(car.speed / CAR_MAX_SPEED)  # Normalise la vitesse
-            inputs.append(car.angle / 360)  # Normalise l'angle
-
-            # Donne les entrées au réseau
-            output = nets[i].activate(inputs)
-
-            # Contrôle par le réseau neuronal :
-            # output[0] = accélérer ou décélérer
-            # output[1] = tourner à gauche ou à droite
-
-            # Logique d'accélération/décélération
-            if output[0] > 0.5:
-                car.speed += CAR_ACCELERATION * dt  # Accélère la voiture
-            elif output[0] <= 0.5:
-                car.speed -= CAR_ACCELERATION * dt  # Décélère la voiture
-                car.speed = max(car.speed, CAR_MIN_SPEED)
-
-            # Logique de rotation
-            if output[1] > 0.5 and abs(car.speed) > 0:
-                car.angle -= CAR_TURN_SPEED * dt  # Tourne à droite
-            elif output[1] <= 0.5 and abs(car.speed) > 0:
-                car.angle += CAR_TURN_SPEED * dt  # Tourne à gauche
-
-            car.update(dt)  # Mise à jour de la voiture
-
-            # Vérifie le passage des checkpoints
-            previous_laps = lap_counters[i].laps_completed
-            previous_checkpoints = lap_counters[i].current_checkpoint
-
-            
-
-            lap_counters[i].check_checkpoint(previous_positions[i], car.position)
-            previous_positions[i] = car.position.copy()
-
-            # Récompense pour passer un checkpoint
-            if lap_counters[i].current_checkpoint > previous_checkpoints:
-                cp = previous_checkpoints  # numéro du checkpoint atteint
-
-                # Récompense normale
-                ge[i].fitness += 100
-
-                # Bonus si c’est la première voiture à passer ce checkpoint
-                if not checkpoint_claimed[cp]:
-                    ge[i].fitness += 200      # BONUS pour le premier
-                    checkpoint_claimed[cp] = True
-
-            # Récompense pour terminer un tour
-            if lap_counters[i].laps_completed > previous_laps:
-                ge[i].fitness += 10000  # Très grande récompense pour un tour complété
-
-            # Décroissance de la fitness : petite pénalité pour encourager un mouvement rapide
-            ge[i].fitness -= 0.001  # Petite décroissance au fil du temps
-
-            # Récompense pour le mouvement : si la voiture avance, récompense basée sur la distance parcourue
-            distance_traveled = previous_positions[i].distance_to(car.position)
-            ge[i].fitness += distance_traveled * 1  # Récompense pour avancer
-            
-            ge[i].fitness -= 1  # Petite pénalité pour rester bloqué
-            
-            if(cars[i].speed<80):
-                ge[i].fitness -= 3
-            
-            # Vérifie la collision
-            if car.check_collision(game_map):
-                ge[i].fitness -= 4000  # Pénalise la collision
-                car.active = False  # Marque la voiture comme inactive
-
-        # Arrête si toutes les voitures sont bloquées et ne progressent pas
-        if all(not car.active or (abs(car.speed) <= 1 and ge[i].fitness < 0.1) for i, car in enumerate(cars)):
-            break
+    Retourne :
+        numpy.ndarray : Fitness de chaque voiture sur ce scénario.
+    """
+    global raycast_visible
+    display = show and not HEADLESS
+    streamed = show and spectator is not None
+    game_map = scenario.game_map()
+
+    # Historiques déjà en cache ; sur le scénario affiché ou diffusé, toutes les voitures sont simulées
+    traces = [None] * len(nets)
+    if fitness_cache is not None:
+        context = evaluation_digest(game_map, car_parameters(), RAYCAST_BACKEND, COLLISION_MODE, MAX_TICKS, FIXED_DT,
+                                    culling_rules(), SEED)
+        if not display and not streamed:
+            traces = fitness_cache.lookup(genome_keys, context)
+    missing = [i for i, trace in enumerate(traces) if trace is None]
+
+    if missing:
+        if tuple(missing) not in controllers:
+            controllers[tuple(missing)] = NetworkController([nets[i] for i in missing])
+
+        # Simulation de toutes les voitures à simuler (carte partagée, chargée une seule fois pour toutes les générations)
+        simulation = PopulationSimulation([nets[i] for i in missing], game_map, car_parameters(),
+                                          raycast_backend=RAYCAST_BACKEND, collision_mode=COLLISION_MODE,
+                                          culling=culling_rules(), seed=SEED, profiler=profiler,
+                                          controller=controllers[tuple(missing)])
+        if streamed:
+            spectator.begin_generation(GENERATION)
+        # Affichage par zones : seules les zones des voitures (et des rayons) sont redessinées
+        renderer = DirtyRectRenderer(screen, simulation.game_map.road_surface) if display else None
+
+        while not simulation.finished():
+            if display:
+                # Efface les voitures de l'image précédente
+                with profiler.stage("draw_map"):
+                    renderer.begin_frame()
+
+                # L'horloge ne sert plus qu'à limiter l'affichage à 60 FPS
+                with profiler.stage("clock.tick"):
+                    clock.tick(60)
+
+                with profiler.stage("events"):
+                    for event in pygame.event.get():
+                        if event.type == pygame.QUIT:
+                            pygame.quit()
+                            sys.exit()
+                        elif event.type == pygame.KEYDOWN:
+                            if event.key == pygame.K_r:
+                                raycast_visible = not raycast_visible  # Affiche ou masque les rayons
+
+            # Un tick à pas de temps fixe : la fitness ne dépend pas de la vitesse de la machine
+            rects = simulation.step(screen if display else None, raycast_visible)
+            if display:
+                renderer.add(rects)
+                with profiler.stage("display.update"):
+                    renderer.end_frame()
+            if streamed:
+                spectator.publish(simulation)
+
+            # Arrête si toutes les voitures sont bloquées et ne progressent pas (seulement si toute la
+            # population est simulée : cette condition porte sur toutes les voitures)
+            if len(missing) == len(nets) and simulation.all_stalled():
+                break
+
+        simulated = simulation.traces()
+        for i, trace in zip(missing, simulated):
+            traces[i] = trace
+        if fitness_cache is not None:
+            fitness_cache.store([genome_keys[i] for i in missing], context, simulated, MAX_TICKS)
+
+    # Fitness du scénario (bonus du premier passage et arrêt anticipé compris)
+    fitnesses, generation_ticks = resolve_generation(traces)
+
+    if CULLING:
+        print(format_culling_report(culling_report(traces, generation_ticks)))
+    return fitnesses
 
 # Point d'entrée du script
 if __name__ == "__main__":
     # Chemin vers le fichier de configuration NEAT
-    config_path = "config-feedforward.txt"
+    config_path = "config/config-feedforward.txt"
+
+    # "--headless" entraîne sans fenêtre ni limitation de FPS
+    # "--raycast=sdf" choisit l'algorithme de lancer de rayons ("--raycast=lut" : table précalculée)
+    # "--collision=obb" choisit la détection des collisions
+    # "--workers=4" évalue la population sur 4 processus (sans affichage)
+    # "--cull" élimine en cours de génération les voitures qui ne progressent plus
+    # "--seed=42" rend l'entraînement reproductible
+    # "--profile" affiche et enregistre le temps passé dans chaque étape de chaque génération
+    # "--delta-checkpoints" écrit des checkpoints différentiels (plus petits)
+    # "--spectator" entraîne sans affichage et montre les meilleures voitures dans une fenêtre séparée
+    # "--scenarios=map,map@1,road-train" évalue chaque génome sur plusieurs circuits et positions de départ
+    # "--aggregate=min" choisit l'agrégation de la fitness sur les scénarios ("mean", "min" ou "weighted")
+    # "--no-fitness-cache" simule tous les génomes à chaque génération, même ceux déjà évalués
+    # "--replay=5" enregistre après chaque génération le replay des 5 meilleurs génomes (voir replay_player.py)
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    headless = "--headless" in sys.argv[1:]
+    culling = True if "--cull" in sys.argv[1:] else None
+    profile = True if "--profile" in sys.argv[1:] else None
+    delta_checkpoints = True if "--delta-checkpoints" in sys.argv[1:] else None
+    spectator_mode = True if "--spectator" in sys.argv[1:] else None
+    cache_fitness = False if "--no-fitness-cache" in sys.argv[1:] else None
+    raycast_backend = None
+    collision_mode = None
+    workers = 1
+    seed = None
+    scenario_spec = None
+    aggregate = None
+    replay_best = None
+    for arg in sys.argv[1:]:
+        if arg.startswith("--raycast="):
+            raycast_backend = arg.split("=", 1)[1]
+        elif arg.startswith("--collision="):
+            collision_mode = arg.split("=", 1)[1]
+        elif arg.startswith("--workers="):
+            workers = int(arg.split("=", 1)[1])
+        elif arg.startswith("--seed="):
+            seed = int(arg.split("=", 1)[1])
+        elif arg.startswith("--scenarios="):
+            scenario_spec = arg.split("=", 1)[1]
+        elif arg.startswith("--aggregate="):
+            aggregate = arg.split("=", 1)[1]
+        elif arg.startswith("--replay="):
+            replay_best = int(arg.split("=", 1)[1])
 
     # Vérifie si un fichier de checkpoint doit être chargé
     checkpoint_path = "checkpoint/neat-checkpoint-836"  # Définit le chemin du fichier de checkpoint à charger
-    if len(sys.argv) > 1:
-        checkpoint_path = sys.argv[1]
+    if len(args) > 0:
+        checkpoint_path = args[0]
 
 
-    run_neat(config_path, checkpoint_path)
+    run_neat(config_path, checkpoint_path, headless=headless, raycast_backend=raycast_backend,
+             collision_mode=collision_mode, workers=workers,
+             culling=culling, seed=seed, profile=profile, delta_checkpoints=delta_checkpoints,
+             spectator_mode=spectator_mode, scenario_spec=scenario_spec, aggregate=aggregate,
+             cache_fitness=cache_fitness, replay_best=replay_best)
@@ -0,0 +1,231 @@
+import numpy as np
+import pygame
+
+from python.car_neat import Car
+
+
+class CarBatch:
+    def __init__(self, count, start_position, max_speed=200, acceleration=200, turn_speed=180, min_speed=0,
+                 drift_factor=0.8):
+        """
+        Regroupe l'état physique de toute une population de voitures dans des tableaux NumPy
+        (une ligne par voiture), pour les faire avancer toutes en un seul appel.
+
+        Les paramètres de conduite acceptent une valeur commune ou une valeur par voiture.
+
+        Paramètres :
+            count : int
+                Nombre de voitures.
+            start_position : tuple (float, float)
+                Position de départ commune.
+            max_speed, acceleration, turn_speed, min_speed, drift_factor : float ou array-like (count,)
+                Mêmes paramètres que Car.
+        """
+        self.count = count
+        self.position = np.empty((count, 2), dtype=np.float64)  # Positions (x, y)
+        self.velocity = np.empty((count, 2), dtype=np.float64)  # Vitesses vers l'avant (vx, vy)
+        self.lateral_velocity = np.empty(count, dtype=np.float64)  # Vitesses latérales (dérapage)
+        self.angle = np.empty(count, dtype=np.float64)  # Angles en degrés
+        self.speed = np.empty(count, dtype=np.float64)  # Vitesses scalaires
+        self.active = np.ones(count, dtype=bool)  # Voitures encore en course
+
+        self.max_speed = np.broadcast_to(np.asarray(max_speed, dtype=np.float64), (count,)).copy()
+        self.min_speed = np.broadcast_to(np.asarray(min_speed, dtype=np.float64), (count,)).copy()
+        self.acceleration = np.broadcast_to(np.asarray(acceleration, dtype=np.float64), (count,)).copy()
+        self.turn_speed = np.broadcast_to(np.asarray(turn_speed, dtype=np.float64), (count,)).copy()
+        self.drift_factor = np.broadcast_to(np.asarray(drift_factor, dtype=np.float64), (count,)).copy()
+
+        self.reset(start_position)
+
+    def reset(self, start_position, indices=slice(None), start_angle=-90):
+        """
+        Replace des voitures au départ, à l'arrêt et orientées selon start_angle (par défaut comme Car.reset).
+
+        Paramètres :
+            start_position : tuple (float, float) ou array-like (N, 2)
+                Position de départ.
+            indices : array-like ou slice, optionnel
+                Voitures concernées (toutes par défaut).
+            start_angle : float, optionnel
+                Orientation de départ en degrés (-90 : vers la droite, comme Car.reset).
+        """
+        self.position[indices] = start_position
+        self.velocity[indices] = 0
+        self.lateral_velocity[indices] = 0
+        self.speed[indices] = 0
+        self.angle[indices] = start_angle
+
+    def apply_controls(self, outputs, dt, indices=slice(None)):
+        """
+        Applique les sorties des réseaux de neurones (accélérer/freiner, tourner) comme main_neat.eval_genomes.
+
+        Paramètres :
+            outputs : array-like (N, 2)
+                Sorties des réseaux : output[0] > 0.5 accélère, output[1] > 0.5 tourne à droite.
+            dt : float
+                Pas de temps en secondes.
+            indices : array-like ou slice, optionnel
+                Voitures pilotées, dans l'ordre des lignes de outputs.
+        """
+        outputs = np.asarray(outputs, dtype=np.float64).reshape(-1, 2)
+        self.apply_commands(np.where(outputs[:, 0] > 0.5, 1, -1), np.where(outputs[:, 1] > 0.5, -1, 1), dt, indices)
+
+    def apply_commands(self, throttle, steer, dt, indices=slice(None)):
+        """
+        Applique des commandes de conduite à plusieurs voitures.
+
+        Paramètres :
+            throttle : array-like (N,)
+                1 accélère, -1 freine (sans descendre sous la vitesse minimale), 0 ne change rien.
+            steer : array-like (N,)
+                1 tourne à gauche, -1 tourne à droite, 0 ne tourne pas (la voiture ne tourne que si elle bouge).
+            dt : float
+                Pas de temps en secondes.
+            indices : array-like ou slice, optionnel
+                Voitures pilotées, dans l'ordre des commandes.
+        """
+        throttle = np.asarray(throttle)
+        steer = np.asarray(steer)
+        speed = self.speed[indices]
+        angle = self.angle[indices]
+        acceleration = self.acceleration[indices]
+        turn_speed = self.turn_speed[indices]
+
+        # Logique d'accélération/décélération
+        speed = np.where(throttle > 0, speed + acceleration * dt, speed)
+        speed = np.where(throttle < 0, np.maximum(speed - acceleration * dt, self.min_speed[indices]), speed)
+
+        # Logique de rotation (uniquement si la voiture bouge)
+        moving = np.abs(speed) > 0
+        angle = np.where(moving & (steer < 0), angle - turn_speed * dt, angle)
+        angle = np.where(moving & (steer > 0), angle + turn_speed * dt, angle)
+
+        self.speed[indices] = speed
+        self.angle[indices] = angle
+
+    def update(self, dt, indices=slice(None)):
+        """
+        Fait avancer des voitures d'un pas de temps avec le modèle de Car.update (limitation de vitesse, dérapage).
+
+        Paramètres :
+            dt : float
+                Pas de temps en secondes.
+            indices : array-like ou slice, optionnel
+                Voitures à faire avancer (toutes par défaut).
+        """
+        max_speed = self.max_speed[indices]
+        turn_speed = self.turn_speed[indices]
+
+        # Limiter la vitesse
+        speed = np.maximum(np.minimum(self.speed[indices], max_speed), -max_speed / 2)
+
+        # Effet de dérapage, puis réduction progressive de la vitesse latérale (friction)
+        lateral_velocity = self.lateral_velocity[indices]
+        drifting = (np.abs(speed) > max_speed * 0.5) & (np.abs(lateral_velocity) < 20)
+        lateral_velocity = np.where(drifting, lateral_velocity + (turn_speed * dt) * self.drift_factor[indices],
+                                    lateral_velocity)
+        lateral_velocity = lateral_velocity * 0.95
+
+        # Mouvement vers l'avant et mouvement latéral
+        rad_angle = np.radians(self.angle[indices])
+        sin, cos = np.sin(rad_angle), np.cos(rad_angle)
+        velocity = np.stack((-speed * sin, -speed * cos), axis=1)
+        drift = np.stack((lateral_velocity * cos, lateral_velocity * sin), axis=1)
+
+        self.speed[indices] = speed
+        self.lateral_velocity[indices] = lateral_velocity
+        self.velocity[indices] = velocity
+        self.position[indices] = self.position[indices] + (velocity + drift) * dt
+
+    def view(self, index, image_path, width=20, height=40):
+        """
+        Crée une voiture (Car) dont l'état est lu et écrit directement dans ce lot.
+
+        Paramètres :
+            index : int
+                Ligne de la voiture dans le lot.
+            image_path : str
+                Chemin de l'image de la voiture.
+            width : int, optionnel
+                Largeur de la voiture.
+            height : int, optionnel
+                Hauteur de la voiture.
+
+        Retourne :
+            BatchedCar : La vue sur la voiture.
+        """
+        return BatchedCar(self, index, image_path, width, height)
+
+
+class BatchedCar(Car):
+    """
+    Vue Car sur une ligne d'un CarBatch : draw, check_collision, update et reset fonctionnent comme
+    pour une voiture indépendante, mais l'état est stocké dans les tableaux du lot.
+    """
+
+    def __init__(self, batch, index, image_path, width=20, height=40):
+        self.batch = batch
+        self.index = index
+        super().__init__(batch.position[index, 0], batch.position[index, 1], image_path=image_path,
+                         width=width, height=height, max_speed=batch.max_speed[index],
+                         acceleration=batch.acceleration[index], turn_speed=batch.turn_speed[index],
+                         min_speed=batch.min_speed[index])
+        self.drift_factor = batch.drift_factor[index]
+
+    @property
+    def position(self):
+        return pygame.Vector2(self.batch.position[self.index, 0], self.batch.position[self.index, 1])
+
+    @position.setter
+    def position(self, value):
+        self.batch.position[self.index] = (value[0], value[1])
+
+    @property
+    def velocity(self):
+        return pygame.Vector2(self.batch.velocity[self.index, 0], self.batch.velocity[self.index, 1])
+
+    @velocity.setter
+    def velocity(self, value):
+        self.batch.velocity[self.index] = (value[0], value[1])
+
+    @property
+    def lateral_velocity(self):
+        return float(self.batch.lateral_velocity[self.index])
+
+    @lateral_velocity.setter
+    def lateral_velocity(self, value):
+        self.batch.lateral_velocity[self.index] = value
+
+    @property
+    def angle(self):
+        return float(self.batch.angle[self.index])
+
+    @angle.setter
+    def angle(self, value):
+        self.batch.angle[self.index] = value
+
+    @property
+    def speed(self):
+        return float(self.batch.speed[self.index])
+
+    @speed.setter
+    def speed(self, value):
+        self.batch.speed[self.index] = value
+
+    @property
+    def active(self):
+        return bool(self.batch.active[self.index])
+
+    @active.setter
+    def active(self, value):
+        self.batch.active[self.index] = value
+
+    def update(self, dt):
+        """
+        Met à jour la voiture avec le modèle vectorisé du lot (limité à cette ligne).
+
+        Paramètres :
+            dt : float
+                Temps écoulé depuis la dernière mise à jour (delta time).
+        """
+        self.batch.update(dt, [self.index])
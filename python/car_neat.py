@@ -1,6 +1,66 @@
 import math
 import pygame
 
+from python.collision import COLLISION_MODES, obb_collisions
+
+ROTATION_STEP = 1.0  # Pas de quantification des angles des sprites pré-tournés (en degrés)
+
+# Tables de sprites pré-tournés partagées : {(image, largeur, hauteur, pas): RotatedSprites}
+_sprite_tables = {}
+
+
+class RotatedSprites:
+    def __init__(self, surface, step=ROTATION_STEP):
+        """
+        Précalcule les surfaces tournées et leurs masques pour tous les angles quantifiés.
+        :param surface: Image de la voiture, déjà mise à l'échelle et orientée.
+        :param step: Pas de quantification des angles en degrés.
+        """
+        self.surface = surface  # Image non tournée
+        self.step = step
+        self.count = int(round(360 / step))  # Nombre d'angles quantifiés
+        self.surfaces = [pygame.transform.rotate(surface, i * step) for i in range(self.count)]
+        self.masks = [pygame.mask.from_surface(rotated) for rotated in self.surfaces]
+
+    def index(self, angle):
+        """
+        Renvoie l'indice de l'angle quantifié le plus proche.
+        :param angle: Angle en degrés (quelconque, même négatif ou supérieur à 360).
+        :return: Indice dans les tables de surfaces et de masques.
+        """
+        return int(round(angle / self.step)) % self.count
+
+    def get(self, angle):
+        """
+        Renvoie la surface tournée et son masque pour un angle donné, sans aucune allocation.
+        :param angle: Angle en degrés.
+        :return: Tuple (pygame.Surface, pygame.mask.Mask).
+        """
+        i = self.index(angle)
+        return self.surfaces[i], self.masks[i]
+
+
+def get_rotated_sprites(image_path, width, height, step=ROTATION_STEP):
+    """
+    Renvoie la table de sprites pré-tournés d'une image, partagée par toutes les voitures
+    qui utilisent la même image à la même taille.
+    :param image_path: Chemin de l'image de la voiture.
+    :param width: Largeur de la voiture.
+    :param height: Hauteur de la voiture.
+    :param step: Pas de quantification des angles en degrés.
+    :return: La table RotatedSprites partagée.
+    """
+    key = (image_path, width, height, step)
+    if key not in _sprite_tables:
+        surface = pygame.image.load(image_path)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()  # Chargement de l'image avec transparence (nécessite une fenêtre)
+        surface = pygame.transform.scale(surface, (width, height))  # Mise à l'échelle de l'image
+        surface = pygame.transform.rotate(surface, 180)  # Rotation initiale de l'image
+        _sprite_tables[key] = RotatedSprites(surface, step)
+    return _sprite_tables[key]
+
+
 class Car:
     def __init__(self, x, y, image_path= "Car_red_Frong.png", width=20, height=40, max_speed=200, acceleration=200, turn_speed=180, min_speed=0):
         """
@@ -28,10 +88,9 @@ class Car:
         self.turn_speed = turn_speed  # Vitesse de rotation réglable
         self.drift_factor = 0.8  # Facteur de dérapage (contrôle l'intensité du dérapage)
 
-        # Chargement et préparation de l'image de la voiture
-        self.surface = pygame.image.load(image_path).convert_alpha()  # Chargement de l'image avec transparence
-        self.surface = pygame.transform.scale(self.surface, (self.width, self.height))  # Mise à l'échelle de l'image
-        self.surface = pygame.transform.rotate(self.surface, 180)  # Rotation initiale de l'image
+        # Image de la voiture et ses rotations précalculées, partagées entre les voitures identiques
+        self.sprites = get_rotated_sprites(image_path, self.width, self.height)
+        self.surface = self.sprites.surface
 
         self.active = True  # Indique si la voiture est toujours en course (active)
 
@@ -68,21 +127,31 @@ class Car:
         """
         Dessine la voiture sur l'écran.
         :param screen: Surface de l'écran sur laquelle la voiture sera dessinée.
+        :return: Zone de l'écran modifiée (pygame.Rect).
         """
-        # Rotation de l'image de la voiture
-        rotated_surface = pygame.transform.rotate(self.surface, self.angle)
+        # Image pré-tournée la plus proche de l'angle de la voiture
+        rotated_surface, _ = self.sprites.get(self.angle)
         rect = rotated_surface.get_rect(center=self.position)  # Création d'un rectangle centré sur la position actuelle
-        screen.blit(rotated_surface, rect)  # Dessiner l'image de la voiture sur l'écran
+        return screen.blit(rotated_surface, rect)  # Dessiner l'image de la voiture sur l'écran
 
-    def check_collision(self, map_instance):
+    def check_collision(self, map_instance, mode="mask", edge_samples=0):
         """
-        Vérifie les collisions pixel par pixel avec les zones d'herbe sur la carte à l'aide de masques.
+        Vérifie les collisions avec les zones d'herbe sur la carte.
         :param map_instance: Instance de la carte avec laquelle la voiture peut entrer en collision.
+        :param mode: "mask" (pixel par pixel, à l'aide de masques) ou "obb" (coins du rectangle orienté
+                     testés sur la grille de l'herbe, plus rapide mais approximatif).
+        :param edge_samples: Nombre de points testés sur chaque bord en plus des coins (mode "obb").
         :return: True si une collision est détectée, sinon False.
         """
-        # Rotation de l'image de la voiture et création d'un masque
-        rotated_surface = pygame.transform.rotate(self.surface, self.angle)
-        rotated_mask = pygame.mask.from_surface(rotated_surface)  # Création d'un masque à partir de l'image
+        if mode not in COLLISION_MODES:
+            raise ValueError(f"Mode de collision inconnu : {mode!r} (choix : {', '.join(COLLISION_MODES)})")
+
+        if mode == "obb":
+            return bool(obb_collisions([(self.position[0], self.position[1])], [self.angle], self.width, self.height,
+                                       map_instance.grass_grid, edge_samples)[0])
+
+        # Image et masque pré-tournés (aucune rotation ni création de masque à chaque image)
+        rotated_surface, rotated_mask = self.sprites.get(self.angle)
         rect = rotated_surface.get_rect(center=self.position)
 
         # Décalage pour la vérification de chevauchement des masques
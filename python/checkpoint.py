@@ -0,0 +1,253 @@
+import gzip
+import hashlib
+import io
+import lzma
+import os
+import pickle
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import neat
+
+MAGIC = b"NEAT-CAR-CKPT\x01"  # En-tête du format (les checkpoints de neat sont des fichiers gzip)
+PRESET = 6  # Niveau de compression lzma (la compression se fait en arrière-plan)
+
+
+class _StatePickler(pickle.Pickler):
+    def __init__(self, file, genome_type, genomes):
+        """
+        Sérialise l'état de l'entraînement en remplaçant chaque génome par l'empreinte de son contenu :
+        les génomes sont stockés à part, une seule fois, et peuvent être partagés entre checkpoints.
+
+        Paramètres :
+            file : fichier binaire
+                Destination de l'état.
+            genome_type : type
+                Classe des génomes (config.genome_type).
+            genomes : dict
+                Reçoit les génomes sérialisés, par empreinte.
+        """
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.genome_type = genome_type
+        self.genomes = genomes
+        self.keys = {}  # id(génome) -> empreinte
+
+    def persistent_id(self, obj):
+        if not isinstance(obj, self.genome_type):
+            return None
+        key = self.keys.get(id(obj))
+        if key is None:
+            data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+            key = hashlib.sha1(data).hexdigest()
+            self.keys[id(obj)] = key
+            self.genomes.setdefault(key, data)
+        return key
+
+
+class _StateUnpickler(pickle.Unpickler):
+    def __init__(self, file, genomes):
+        """
+        Relit un état écrit par _StatePickler ; un même génome n'est désérialisé qu'une fois
+        (la population et les espèces partagent les mêmes objets, comme avant la sauvegarde).
+
+        Paramètres :
+            file : fichier binaire
+                État sérialisé.
+            genomes : dict
+                Génomes sérialisés, par empreinte.
+        """
+        super().__init__(file)
+        self.genomes = genomes
+        self.loaded = {}
+
+    def persistent_load(self, key):
+        genome = self.loaded.get(key)
+        if genome is None:
+            try:
+                genome = pickle.loads(self.genomes[key])
+            except KeyError:
+                raise pickle.UnpicklingError(f"Génome {key} absent du checkpoint et de ses bases") from None
+            self.loaded[key] = genome
+        return genome
+
+
+def _write_checkpoint(filename, record):
+    """
+    Compresse et écrit un checkpoint (dans un fichier temporaire renommé à la fin : un arrêt pendant
+    l'écriture ne laisse jamais de checkpoint incomplet).
+    """
+    data = MAGIC + lzma.compress(pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL), preset=PRESET)
+    temporary = filename + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(data)
+    os.replace(temporary, filename)
+
+
+def _read_record(filename):
+    """
+    Retourne :
+        dict : Contenu d'un checkpoint de ce format (voir AsyncCheckpointer.save_checkpoint).
+    """
+    with open(filename, "rb") as f:
+        data = f.read()
+    return pickle.loads(lzma.decompress(data[len(MAGIC):]))
+
+
+def is_compact_checkpoint(filename):
+    """
+    Retourne :
+        bool : True si le fichier est un checkpoint de ce format (False pour un checkpoint gzip de neat).
+    """
+    with open(filename, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def load_checkpoint_state(filename):
+    """
+    Relit l'état d'un checkpoint, en suivant la chaîne des checkpoints différentiels jusqu'au
+    checkpoint complet. Les checkpoints gzip de neat sont aussi acceptés.
+
+    Paramètres :
+        filename : str
+            Chemin du checkpoint.
+
+    Retourne :
+        tuple : (génération, config, population, espèces, état du module random), comme neat.Checkpointer.
+
+    Lève :
+        FileNotFoundError : Si un checkpoint de la chaîne est introuvable.
+    """
+    if not is_compact_checkpoint(filename):
+        with gzip.open(filename) as f:
+            return pickle.load(f)
+
+    record = _read_record(filename)
+    genomes = dict(record["genomes"])
+    base = record["base"]
+    while base is not None:
+        base_path = os.path.join(os.path.dirname(filename), base)
+        if not os.path.exists(base_path):
+            raise FileNotFoundError(f"Checkpoint de base introuvable pour {filename} : {base_path}")
+        base_record = _read_record(base_path)
+        for key, data in base_record["genomes"].items():
+            genomes.setdefault(key, data)
+        base = base_record["base"]
+
+    return _StateUnpickler(io.BytesIO(record["state"]), genomes).load()
+
+
+def restore_checkpoint(filename):
+    """
+    Reprend l'entraînement depuis un checkpoint (ce format ou celui de neat), comme
+    neat.Checkpointer.restore_checkpoint.
+
+    Paramètres :
+        filename : str
+            Chemin du checkpoint.
+
+    Retourne :
+        neat.Population : Population restaurée (l'état du module random est aussi restauré).
+    """
+    generation, config, population, species_set, random_state = load_checkpoint_state(filename)
+    random.setstate(random_state)
+    return neat.Population(config, (population, species_set, generation))
+
+
+class AsyncCheckpointer(neat.Checkpointer):
+    def __init__(self, generation_interval=100, time_interval_seconds=300, filename_prefix="neat-checkpoint-",
+                 deltas=False, full_interval=10):
+        """
+        Checkpointer compatible avec neat.Checkpointer (mêmes intervalles, mêmes noms de fichiers), qui
+        compresse (lzma) et écrit les checkpoints dans un thread : la boucle d'entraînement ne fait que
+        sérialiser l'état en mémoire.
+
+        Les génomes sont stockés une seule fois par contenu. En mode différentiel, un checkpoint ne
+        contient que les génomes absents des précédents (élites, meilleurs génomes des statistiques...)
+        et le nom du checkpoint précédent ; un checkpoint complet est écrit tous les full_interval
+        checkpoints pour limiter la longueur des chaînes. restore_checkpoint relit les deux formats.
+
+        Paramètres :
+            generation_interval, time_interval_seconds, filename_prefix :
+                Voir neat.Checkpointer.
+            deltas : bool, optionnel
+                Écrit des checkpoints différentiels.
+            full_interval : int, optionnel
+                Nombre de checkpoints entre deux checkpoints complets (mode différentiel).
+        """
+        super().__init__(generation_interval, time_interval_seconds, filename_prefix)
+        self.deltas = deltas
+        self.full_interval = full_interval
+        self._reset_chain()
+        self.executor = None
+        self.pending = []
+
+    def _reset_chain(self):
+        self.base = None  # Dernier checkpoint écrit (base du prochain checkpoint différentiel)
+        self.chain_genomes = set()  # Empreintes des génomes déjà stockés dans la chaîne
+        self.chain_length = 0
+
+    def __getstate__(self):
+        # Le checkpointer fait partie des reporters, donc de l'état sauvegardé : le thread n'est pas sérialisable
+        state = self.__dict__.copy()
+        state["executor"] = None
+        state["pending"] = []
+        state["base"] = None
+        state["chain_genomes"] = set()
+        state["chain_length"] = 0
+        return state
+
+    def save_checkpoint(self, config, population, species_set, generation):
+        """
+        Sérialise l'état tout de suite, puis confie la compression et l'écriture au thread d'écriture.
+        """
+        self._raise_failures()
+        filename = f"{self.filename_prefix}{generation}"
+
+        genomes = {}
+        state = io.BytesIO()
+        _StatePickler(state, config.genome_type, genomes).dump(
+            (generation, config, population, species_set, random.getstate()))
+
+        delta = self.deltas and self.base is not None and self.chain_length < self.full_interval
+        if not delta:
+            self._reset_chain()
+        new_genomes = {key: data for key, data in genomes.items() if key not in self.chain_genomes}
+        record = {"generation": generation, "base": os.path.basename(self.base) if delta else None,
+                  "state": state.getvalue(), "genomes": new_genomes}
+        print(f"Sauvegarde du checkpoint dans {filename}"
+              + (f" (différentiel : {len(new_genomes)}/{len(genomes)} génomes)" if delta else ""))
+
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1)  # Un seul thread : les écritures restent dans l'ordre
+        self.pending.append(self.executor.submit(_write_checkpoint, filename, record))
+
+        self.base = filename
+        self.chain_genomes.update(new_genomes)
+        self.chain_length += 1
+
+    def _raise_failures(self):
+        """
+        Relance l'erreur d'une écriture terminée en échec.
+        """
+        pending = []
+        for future in self.pending:
+            if future.done():
+                future.result()
+            else:
+                pending.append(future)
+        self.pending = pending
+
+    def close(self):
+        """
+        Attend la fin des écritures en cours (à appeler à la fin de l'entraînement).
+        """
+        pending, self.pending = self.pending, []
+        for future in pending:
+            future.result()
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    @staticmethod
+    def restore_checkpoint(filename):
+        return restore_checkpoint(filename)
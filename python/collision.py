@@ -0,0 +1,164 @@
+import numpy as np
+
+COLLISION_MODES = ("mask", "obb")  # Modes de détection des collisions disponibles
+
+
+def car_outline_points(positions, angles, width, height, edge_samples=0):
+    """
+    Calcule les coins (et éventuellement des points sur les bords) du rectangle orienté de chaque voiture.
+
+    Le rectangle suit la convention de Car : à l'angle 0, la voiture pointe vers le haut de l'écran,
+    et sa longueur (height) est alignée sur la direction d'avancement (-sin(angle), -cos(angle)).
+
+    Paramètres :
+        positions : array-like (N, 2)
+            Centres (x, y) des voitures.
+        angles : array-like (N,)
+            Angles des voitures en degrés.
+        width : float
+            Largeur de la voiture.
+        height : float
+            Longueur de la voiture.
+        edge_samples : int, optionnel
+            Nombre de points supplémentaires répartis sur chaque bord, entre deux coins.
+
+    Retourne :
+        numpy.ndarray : Tableau (N, 4 * (edge_samples + 1), 2) de points (x, y).
+    """
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+    rad_angles = np.radians(np.asarray(angles, dtype=np.float64).reshape(-1))
+    sin, cos = np.sin(rad_angles), np.cos(rad_angles)
+
+    # Demi-dimensions mesurées entre centres de pixels extrêmes du sprite
+    half_length = (height - 1) / 2
+    half_width = (width - 1) / 2
+
+    # Contour parcouru dans le repère de la voiture : (latéral, longitudinal), de -1 à 1
+    corners = np.array([(-1, -1), (1, -1), (1, 1), (-1, 1), (-1, -1)], dtype=np.float64)
+    fractions = np.arange(edge_samples + 1) / (edge_samples + 1)
+    outline = (corners[:-1, None] + (corners[1:] - corners[:-1])[:, None] * fractions[None, :, None]).reshape(-1, 2)
+    lateral = outline[:, 0] * half_width
+    longitudinal = outline[:, 1] * half_length
+
+    # Axe longitudinal (-sin, -cos) et axe latéral (cos, -sin) de chaque voiture
+    xs = positions[:, 0, None] - sin[:, None] * longitudinal + cos[:, None] * lateral
+    ys = positions[:, 1, None] - cos[:, None] * longitudinal - sin[:, None] * lateral
+    return np.stack((xs, ys), axis=2)
+
+
+def obb_collisions(positions, angles, width, height, grass_grid, edge_samples=0):
+    """
+    Teste en un seul appel NumPy si le rectangle orienté de chaque voiture touche l'herbe.
+
+    Comme pour le masque de la carte, les points hors de la carte ne comptent pas comme une collision.
+
+    Paramètres :
+        positions : array-like (N, 2)
+            Centres (x, y) des voitures.
+        angles : array-like (N,)
+            Angles des voitures en degrés.
+        width : float
+            Largeur de la voiture.
+        height : float
+            Longueur de la voiture.
+        grass_grid : numpy.ndarray (hauteur, largeur) de bool
+            Grille de l'herbe de la carte (Map.grass_grid).
+        edge_samples : int, optionnel
+            Nombre de points testés sur chaque bord en plus des coins.
+
+    Retourne :
+        numpy.ndarray : Tableau (N,) de bool, True pour les voitures en collision.
+    """
+    points = car_outline_points(positions, angles, width, height, edge_samples)
+    grid_height, grid_width = grass_grid.shape
+    xi = np.floor(points[..., 0]).astype(np.intp)
+    yi = np.floor(points[..., 1]).astype(np.intp)
+    inside = (xi >= 0) & (xi < grid_width) & (yi >= 0) & (yi < grid_height)
+    hits = inside & grass_grid[np.where(inside, yi, 0), np.where(inside, xi, 0)]
+    return hits.any(axis=1)
+
+
+def check_collisions(cars, map_instance, mode="mask", edge_samples=0):
+    """
+    Détecte les collisions d'un groupe de voitures avec l'herbe.
+
+    Paramètres :
+        cars : list
+            Voitures (Car) à tester. En mode "obb", les voitures de même taille sont testées ensemble.
+        map_instance : Map
+            Carte du circuit.
+        mode : str, optionnel
+            "mask" (chevauchement pixel par pixel des masques, Car.check_collision)
+            ou "obb" (rectangle orienté testé sur la grille de l'herbe, vectorisé).
+        edge_samples : int, optionnel
+            Points supplémentaires par bord en mode "obb".
+
+    Retourne :
+        list : Un booléen par voiture.
+    """
+    if mode not in COLLISION_MODES:
+        raise ValueError(f"Mode de collision inconnu : {mode!r} (choix : {', '.join(COLLISION_MODES)})")
+    if not cars:
+        return []
+    if mode == "mask":
+        return [car.check_collision(map_instance, mode) for car in cars]
+
+    # Un appel vectorisé par taille de voiture
+    groups = {}
+    for i, car in enumerate(cars):
+        groups.setdefault((car.width, car.height), []).append(i)
+    collisions = [False] * len(cars)
+    for (width, height), group in groups.items():
+        positions = [(cars[i].position[0], cars[i].position[1]) for i in group]
+        angles = [cars[i].angle for i in group]
+        hits = obb_collisions(positions, angles, width, height, map_instance.grass_grid, edge_samples)
+        for i, hit in zip(group, hits.tolist()):
+            collisions[i] = hit
+    return collisions
+
+
+def collision_disagreement_report(trajectories, car, map_instance, edge_samples=0):
+    """
+    Compare le mode "obb" au masque pixel par pixel (Car.check_collision) sur des trajectoires enregistrées.
+
+    Paramètres :
+        trajectories : list
+            Liste de trajectoires, chacune étant une liste de poses (x, y, angle).
+        car : Car
+            Voiture dont le sprite et les dimensions servent aux deux tests (sa pose est modifiée).
+        map_instance : Map
+            Carte du circuit.
+        edge_samples : int, optionnel
+            Points supplémentaires par bord en mode "obb".
+
+    Retourne :
+        dict : Nombre de poses, accords et désaccords (collision vue par un seul des deux modes),
+               taux de désaccord, et écart (en ticks) entre les premières collisions de chaque trajectoire.
+    """
+    report = {"poses": 0, "both": 0, "neither": 0, "mask_only": 0, "obb_only": 0,
+              "trajectories": len(trajectories), "first_hit_tick_deltas": []}
+
+    for trajectory in trajectories:
+        poses = np.asarray(trajectory, dtype=np.float64).reshape(-1, 3)
+        obb_hits = obb_collisions(poses[:, :2], poses[:, 2], car.width, car.height,
+                                  map_instance.grass_grid, edge_samples)
+        mask_hits = []
+        for x, y, angle in poses:
+            car.position.update(x, y)
+            car.angle = angle
+            mask_hits.append(car.check_collision(map_instance))
+        mask_hits = np.array(mask_hits, dtype=bool)
+
+        report["poses"] += len(poses)
+        report["both"] += int(np.sum(mask_hits & obb_hits))
+        report["neither"] += int(np.sum(~mask_hits & ~obb_hits))
+        report["mask_only"] += int(np.sum(mask_hits & ~obb_hits))
+        report["obb_only"] += int(np.sum(~mask_hits & obb_hits))
+
+        # Tick de la première collision selon chaque mode (écart positif : le mode "obb" détecte plus tard)
+        if mask_hits.any() and obb_hits.any():
+            report["first_hit_tick_deltas"].append(int(obb_hits.argmax()) - int(mask_hits.argmax()))
+
+    disagreements = report["mask_only"] + report["obb_only"]
+    report["disagreement_rate"] = disagreements / report["poses"] if report["poses"] else 0.0
+    return report
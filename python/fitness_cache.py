@@ -0,0 +1,152 @@
+import hashlib
+from collections import OrderedDict
+
+FITNESS_CACHE_SIZE = 1024  # Nombre maximal d'historiques gardés (un par génome et par scénario)
+
+
+def genome_digest(genome):
+    """
+    Empreinte canonique d'un génome : ses nœuds (biais, réponse, activation, agrégation) et ses connexions
+    actives (poids), triés par clé. Deux génomes de même empreinte donnent le même réseau, donc la même
+    conduite ; les connexions désactivées, sans effet sur le réseau, sont ignorées.
+
+    Paramètres :
+        genome : neat.DefaultGenome
+            Génome à identifier.
+
+    Retourne :
+        str : Empreinte SHA-1 hexadécimale.
+    """
+    nodes = tuple((key, node.bias, node.response, node.activation, node.aggregation)
+                  for key, node in sorted(genome.nodes.items()))
+    connections = tuple((key, connection.weight)
+                        for key, connection in sorted(genome.connections.items()) if connection.enabled)
+    return hashlib.sha1(repr((nodes, connections)).encode()).hexdigest()
+
+
+def evaluation_digest(game_map, parameters, raycast_backend, collision_mode, max_ticks, dt, culling, seed):
+    """
+    Empreinte de tout ce qui, en dehors du génome, détermine l'historique d'une voiture : circuit (image,
+    checkpoints et position de départ), caractéristiques des voitures et réglages de la simulation.
+
+    Paramètres :
+        game_map : Map ou StartPoseMap
+            Carte du scénario.
+        parameters : CarParameters
+            Caractéristiques des voitures.
+        raycast_backend, collision_mode, max_ticks, dt, culling, seed :
+            Voir PopulationSimulation.
+
+    Retourne :
+        str : Empreinte SHA-1 hexadécimale.
+    """
+    track = (game_map.road_hash, repr(game_map.checkpoints), tuple(game_map.start_position), game_map.start_angle)
+    rules = sorted(vars(culling).items()) if culling is not None else None
+    settings = (sorted(vars(parameters).items()), raycast_backend, collision_mode, max_ticks, dt, rules, seed)
+    return hashlib.sha1(repr((track, settings)).encode()).hexdigest()
+
+
+class FitnessCache:
+    def __init__(self, max_entries=FITNESS_CACHE_SIZE):
+        """
+        Cache des historiques de voitures (CarTrace), indexé par l'empreinte du génome et celle du scénario,
+        avec éviction des moins récemment utilisés.
+
+        La simulation étant déterministe, un génome déjà évalué dans les mêmes conditions (élites recopiées
+        d'une génération à l'autre, génomes identiques) n'est pas simulé à nouveau : son historique est
+        réutilisé. Ce sont les historiques qui sont gardés, pas les fitness, car la fitness finale dépend de
+        toute la population (bonus du premier passage, arrêt anticipé) : resolve_generation la recalcule à
+        partir des historiques en cache et des nouveaux, exactement comme si tout avait été simulé.
+
+        Paramètres :
+            max_entries : int, optionnel
+                Nombre maximal d'historiques gardés.
+        """
+        self.max_entries = max_entries
+        self.traces = OrderedDict()
+        self.hits = 0
+        self.lookups = 0
+        self.generation_hits = 0
+        self.generation_lookups = 0
+
+    def begin_generation(self):
+        """
+        Remet à zéro les compteurs de la génération.
+        """
+        self.generation_hits = 0
+        self.generation_lookups = 0
+
+    def lookup(self, genome_keys, context):
+        """
+        Paramètres :
+            genome_keys : list
+                Empreinte de chaque génome (voir genome_digest).
+            context : str
+                Empreinte du scénario (voir evaluation_digest).
+
+        Retourne :
+            list : L'historique en cache de chaque génome, ou None s'il doit être simulé.
+        """
+        traces = []
+        for genome_key in genome_keys:
+            key = (genome_key, context)
+            trace = self.traces.get(key)
+            if trace is not None:
+                self.traces.move_to_end(key)
+                self.generation_hits += 1
+            traces.append(trace)
+        self.generation_lookups += len(genome_keys)
+        self.hits += sum(trace is not None for trace in traces)
+        self.lookups += len(genome_keys)
+        return traces
+
+    def store(self, genome_keys, context, traces, max_ticks):
+        """
+        Garde les historiques complets de génomes simulés (un historique interrompu par l'arrêt anticipé
+        de la génération dépend des autres voitures : il n'est pas gardé).
+
+        Paramètres :
+            genome_keys : list
+                Empreinte de chaque génome.
+            context : str
+                Empreinte du scénario.
+            traces : list
+                Historique (CarTrace) de chaque génome.
+            max_ticks : int
+                Durée maximale d'une génération.
+        """
+        for genome_key, trace in zip(genome_keys, traces):
+            if not trace.complete(max_ticks):
+                continue
+            key = (genome_key, context)
+            self.traces[key] = trace
+            self.traces.move_to_end(key)
+        while len(self.traces) > self.max_entries:
+            self.traces.popitem(last=False)
+
+    def report(self):
+        """
+        Retourne :
+            dict : Historiques trouvés et demandés pendant la génération, taux de succès de la génération
+                   et depuis le début, nombre d'historiques gardés.
+        """
+        return {
+            "hits": self.generation_hits,
+            "lookups": self.generation_lookups,
+            "rate": self.generation_hits / self.generation_lookups if self.generation_lookups else 0.0,
+            "total_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "entries": len(self.traces),
+        }
+
+
+def format_cache_report(report):
+    """
+    Paramètres :
+        report : dict
+            Rapport renvoyé par FitnessCache.report.
+
+    Retourne :
+        str : Résumé du rapport sur une ligne.
+    """
+    return (f"Cache de fitness : {report['hits']}/{report['lookups']} évaluations évitées ({report['rate']:.1%}, "
+            f"{report['total_rate']:.1%} depuis le début), {report['entries']} historiques en cache")
@@ -1,3 +1,4 @@
+import numpy as np
 import pygame
 
 def line_intersect(a1, a2, b1, b2):
@@ -69,4 +70,71 @@ class LapCounter:
         if line_intersect(old_pos, new_pos, start, end):
             # Incrémente l'indice du checkpoint actuel
             self.current_checkpoint += 1
-            #print(f"Checkpoint {checkpoint['order']} franchi !")
\ No newline at end of file
+            #print(f"Checkpoint {checkpoint['order']} franchi !")
+
+
+class BatchLapCounter:
+    def __init__(self, checkpoints, count):
+        """
+        Compteur de tours de toute une population : même comportement que LapCounter pour chaque voiture,
+        mais les passages de checkpoints de toutes les voitures sont testés en une seule opération.
+
+        Paramètres :
+            checkpoints : list
+                Liste de dictionnaires contenant les checkpoints avec des clés 'start', 'end', et 'order'.
+            count : int
+                Nombre de voitures.
+        """
+        # Trie les checkpoints en fonction de leur ordre
+        self.checkpoints = sorted(checkpoints, key=lambda x: x['order'])
+        # Extrémités de chaque checkpoint, indexées par numéro de checkpoint
+        self.starts = np.array([checkpoint['start'] for checkpoint in self.checkpoints], dtype=np.float64).reshape(-1, 2)
+        self.ends = np.array([checkpoint['end'] for checkpoint in self.checkpoints], dtype=np.float64).reshape(-1, 2)
+        # Indice du prochain checkpoint et nombre de tours complétés de chaque voiture
+        self.current_checkpoint = np.zeros(count, dtype=np.intp)
+        self.laps_completed = np.zeros(count, dtype=np.intp)
+
+    @staticmethod
+    def ccw(a, b, c):
+        """
+        Même test d'orientation que line_intersect, pour des tableaux de points (N, 2).
+        """
+        return (c[:, 1] - a[:, 1]) * (b[:, 0] - a[:, 0]) > (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])
+
+    def check_checkpoints(self, old_positions, new_positions, indices=slice(None)):
+        """
+        Vérifie, pour plusieurs voitures à la fois, si leur déplacement croise leur prochain checkpoint.
+
+        Paramètres :
+            old_positions : array-like (N, 2)
+                Positions précédentes des voitures.
+            new_positions : array-like (N, 2)
+                Nouvelles positions des voitures.
+            indices : array-like ou slice, optionnel
+                Voitures concernées, dans l'ordre des lignes des positions (toutes par défaut).
+
+        Retourne :
+            numpy.ndarray de bool (N,) : True pour les voitures qui ont franchi un checkpoint.
+        """
+        old_positions = np.asarray(old_positions, dtype=np.float64).reshape(-1, 2)
+        new_positions = np.asarray(new_positions, dtype=np.float64).reshape(-1, 2)
+        if len(self.checkpoints) == 0:
+            return np.zeros(len(old_positions), dtype=bool)
+
+        current = self.current_checkpoint[indices]
+        laps = self.laps_completed[indices]
+
+        # Tous les checkpoints franchis : commence un nouveau tour
+        wrapped = current >= len(self.checkpoints)
+        current = np.where(wrapped, 0, current)
+        laps = laps + wrapped
+
+        # Vérifie si la trajectoire croise le prochain checkpoint de chaque voiture
+        start = self.starts[current]
+        end = self.ends[current]
+        crossed = ((self.ccw(old_positions, start, end) != self.ccw(new_positions, start, end))
+                   & (self.ccw(old_positions, new_positions, start) != self.ccw(old_positions, new_positions, end)))
+
+        self.current_checkpoint[indices] = current + crossed
+        self.laps_completed[indices] = laps
+        return crossed
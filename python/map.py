@@ -1,6 +1,33 @@
 import pygame
+import numpy as np
+import hashlib
 import json
 import os
+import zipfile
+
+GRASS_COLOR = (0, 200, 0)  # Couleur de l'herbe (vert)
+
+# Dossier du cache disque des tableaux dérivés de l'image de la route
+CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "maps", ".cache")
+CACHE_VERSION = 1  # À incrémenter si le format ou le calcul des tableaux change
+
+# Cache en mémoire, indexé par l'empreinte de l'image : {empreinte: (grass_mask, grass_grid, distance_field)}
+_cache = {}
+
+
+def file_digest(path):
+    """
+    Calcule l'empreinte SHA-1 du contenu d'un fichier.
+
+    Paramètres :
+        path : str
+            Chemin du fichier.
+
+    Retourne :
+        str : Empreinte hexadécimale.
+    """
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
 
 class Map:
     def __init__(self, map_file="maps/map.json"):
@@ -15,21 +42,111 @@ class Map:
         with open(map_file, 'r') as f:
             data = json.load(f)
 
-        # Charge l'image de la route
-        script_dir = os.path.dirname(__file__)  # dossier où se trouve map.py
-        road_image_path = os.path.join(script_dir, "..", "maps", "road.png")
-        self.road_surface = pygame.image.load(road_image_path).convert()
-        self.road_surface = self.road_surface.convert()
+        # Charge l'image de la route indiquée par le JSON (maps/road.png par défaut)
+        self.map_file = map_file
+        road_image_path = self.resolve_road_image(map_file, data.get('road_image'))
+        self.road_surface = pygame.image.load(road_image_path)
+        if pygame.display.get_surface() is not None:
+            # convert() exige une fenêtre ; sans affichage, le format chargé convient aux masques et tableaux
+            self.road_surface = self.road_surface.convert()
+        self.road_hash = file_digest(road_image_path)  # Clé des caches mémoire et disque
 
         # Charge les checkpoints
         self.checkpoints = data.get('checkpoints', [])
         # Chaque checkpoint est un dictionnaire avec les clés 'start', 'end', 'order'
 
-        # Charge la position de départ
+        # Charge la position de départ et l'orientation de départ (en degrés ; -90 : vers la droite, comme Car.reset)
         self.start_position = data.get('start_position', [100, 100])
+        self.start_angle = data.get('start_angle', -90)
+
+        # Positions de départ possibles : celle ci-dessus, puis celles de la clé 'start_poses' du JSON.
+        # Chaque position est un dictionnaire avec les clés 'position', 'angle' et 'checkpoint' (indice,
+        # dans l'ordre des checkpoints, du premier checkpoint à franchir)
+        self.start_poses = [{'position': self.start_position, 'angle': self.start_angle, 'checkpoint': 0}]
+        self.start_poses += data.get('start_poses', [])
+
+        # Masque de l'herbe (collisions), grille booléenne de l'herbe (lancer de rayons vectorisé)
+        # et distance de chaque pixel à l'herbe la plus proche (lancer de rayons "sdf")
+        self.grass_mask, self.grass_grid, self.distance_field = self.load_cached_arrays()
+
+    @staticmethod
+    def resolve_road_image(map_file, road_image):
+        """
+        Trouve le chemin de l'image de la route d'une carte.
+
+        Le chemin du JSON est essayé tel quel (relatif au dossier courant, comme l'écrit road_maker.py),
+        puis relatif au dossier du JSON et à la racine du projet.
+
+        Paramètres :
+            map_file : str
+                Chemin du fichier JSON de la carte.
+            road_image : str ou None
+                Valeur de la clé 'road_image' du JSON.
+
+        Retourne :
+            str : Chemin de l'image de la route.
+        """
+        project_dir = os.path.join(os.path.dirname(__file__), "..")  # dossier parent de python/
+        if road_image:
+            candidates = [road_image,
+                          os.path.join(os.path.dirname(map_file), os.path.basename(road_image)),
+                          os.path.join(project_dir, road_image)]
+            for candidate in candidates:
+                if os.path.exists(candidate):
+                    return candidate
+        return os.path.join(project_dir, "maps", "road.png")
+
+    def load_cached_arrays(self):
+        """
+        Récupère le masque et les tableaux de l'herbe depuis le cache mémoire, puis le cache disque,
+        et ne les calcule qu'en dernier recours. Les deux caches sont indexés par l'empreinte de
+        l'image de la route : modifier road.png invalide automatiquement le cache.
+
+        Retourne :
+            tuple : (pygame.mask.Mask, numpy.ndarray, numpy.ndarray)
+                Le masque de l'herbe, la grille booléenne de l'herbe et le champ de distance.
+        """
+        if self.road_hash in _cache:
+            return _cache[self.road_hash]
+
+        grass_mask = self.create_grass_mask()
+        cache_path = os.path.join(CACHE_DIR, f"{self.road_hash}-v{CACHE_VERSION}.npz")
+        try:
+            with np.load(cache_path) as data:
+                shape = tuple(data['shape'])
+                grass_grid = np.unpackbits(data['grass_grid'], count=shape[0] * shape[1]).reshape(shape).astype(bool)
+                distance_field = data['distance_field']
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            grass_grid = self.grass_grid = self.create_grass_grid()  # create_distance_field part de cette grille
+            distance_field = self.create_distance_field()
+            self.save_cached_arrays(cache_path, grass_grid, distance_field)
+
+        _cache[self.road_hash] = (grass_mask, grass_grid, distance_field)
+        return _cache[self.road_hash]
+
+    @staticmethod
+    def save_cached_arrays(cache_path, grass_grid, distance_field):
+        """
+        Écrit les tableaux de l'herbe dans le cache disque. Un échec d'écriture n'est pas bloquant.
 
-        # Crée un masque uniquement pour l'herbe (zones vertes)
-        self.grass_mask = self.create_grass_mask()
+        Paramètres :
+            cache_path : str
+                Chemin du fichier .npz du cache.
+            grass_grid : numpy.ndarray
+                Grille booléenne de l'herbe.
+            distance_field : numpy.ndarray
+                Champ de distance à l'herbe.
+        """
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            # Écriture dans un fichier temporaire puis renommage, pour ne jamais laisser un cache tronqué
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.savez_compressed(f, shape=np.array(grass_grid.shape),
+                                    grass_grid=np.packbits(grass_grid), distance_field=distance_field)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
 
     def create_grass_mask(self):
         """
@@ -38,20 +155,51 @@ class Map:
         Retourne :
             pygame.mask.Mask : Le masque représentant les zones solides de l'herbe.
         """
-        # Crée un masque de la même taille que la surface de la route
-        grass_mask = pygame.mask.Mask((self.road_surface.get_width(), self.road_surface.get_height()))
-        grass_color = (0, 200, 0)  # Couleur de l'herbe (vert)
+        # Seuil (1, 1, 1) : seule la couleur exacte de l'herbe est retenue ; seuil 255 : alpha ignoré
+        return pygame.mask.from_threshold(self.road_surface, GRASS_COLOR + (255,), (1, 1, 1, 255))
+
+    def create_grass_grid(self):
+        """
+        Crée une grille booléenne où les pixels d'herbe valent True.
+
+        Retourne :
+            numpy.ndarray : Tableau (hauteur, largeur) de bool, indexé par [y, x].
+        """
+        pixels = pygame.surfarray.pixels3d(self.road_surface)  # Tableau (largeur, hauteur, 3) sans copie
+        grass_grid = np.all(pixels == GRASS_COLOR, axis=2).T
+        del pixels  # Libère le verrou posé sur la surface
+        return np.ascontiguousarray(grass_grid)
+
+    def create_distance_field(self):
+        """
+        Calcule la transformée de distance euclidienne exacte de la zone d'herbe.
+
+        L'extérieur de la carte est considéré comme de l'herbe : un rayon qui avance d'au plus
+        la valeur lue ne peut donc ni toucher l'herbe ni sortir de la carte.
+
+        Retourne :
+            numpy.ndarray : Tableau (hauteur, largeur) de float32, nul sur l'herbe.
+        """
+        # Bordure d'herbe d'un pixel autour de la carte
+        padded = np.pad(self.grass_grid, 1, constant_values=True)
+        height, width = padded.shape
+
+        # Première passe : distance verticale à l'herbe la plus proche dans chaque colonne
+        rows = np.arange(height, dtype=np.float64)[:, None]
+        above = np.maximum.accumulate(np.where(padded, rows, -np.inf), axis=0)
+        below = np.minimum.accumulate(np.where(padded, rows, np.inf)[::-1], axis=0)[::-1]
+        column_sq = np.minimum(rows - above, below - rows) ** 2
 
-        # Parcourt chaque pixel de l'image de la route
-        for x in range(self.road_surface.get_width()):
-            for y in range(self.road_surface.get_height()):
-                # Obtient la couleur du pixel actuel
-                color = self.road_surface.get_at((x, y))
-                # Si la couleur correspond à celle de l'herbe, marque le pixel comme solide dans le masque
-                if color[:3] == grass_color:  # Ignore le canal alpha s'il est présent
-                    grass_mask.set_at((x, y), 1)  # Marque les zones d'herbe comme solides
+        # Seconde passe : minimum sur les décalages horizontaux, arrêtée dès qu'aucun ne peut améliorer
+        distance_sq = column_sq.copy()
+        offset = 1
+        while offset < width and offset * offset < distance_sq.max():
+            offset_sq = offset * offset
+            np.minimum(distance_sq[:, offset:], column_sq[:, :-offset] + offset_sq, out=distance_sq[:, offset:])
+            np.minimum(distance_sq[:, :-offset], column_sq[:, offset:] + offset_sq, out=distance_sq[:, :-offset])
+            offset += 1
 
-        return grass_mask
+        return np.sqrt(distance_sq[1:-1, 1:-1]).astype(np.float32)
 
     def draw(self, screen):
         """
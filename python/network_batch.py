@@ -0,0 +1,183 @@
+import numpy as np
+from neat import activations, aggregations
+from neat.nn import FeedForwardNetwork
+
+# Fonctions de neat reconnues par le compilateur (celles de config-feedforward.txt)
+ACTIVATIONS = {activations.tanh_activation: "tanh", activations.sigmoid_activation: "sigmoid",
+               activations.relu_activation: "relu"}
+AGGREGATIONS = {aggregations.sum_aggregation: "sum", aggregations.mean_aggregation: "mean",
+                aggregations.max_aggregation: "max"}
+
+
+class NetworkLayer:
+    def __init__(self, node_slots, biases, responses, activations, aggregations, sources, targets, weights):
+        """
+        Une couche du programme : tous les neurones de même profondeur, tous réseaux confondus.
+
+        Les connexions sont triées par neurone de destination puis dans l'ordre de neat, pour que les
+        sommes soient accumulées exactement comme dans FeedForwardNetwork.activate.
+
+        Paramètres :
+            node_slots : numpy.ndarray (M,)
+                Cases des neurones de la couche dans le tableau des valeurs.
+            biases, responses : numpy.ndarray (M,)
+                Biais et réponses des neurones.
+            activations, aggregations : list (M,)
+                Noms des fonctions d'activation et d'agrégation.
+            sources : numpy.ndarray (E,)
+                Cases des valeurs en entrée de chaque connexion.
+            targets : numpy.ndarray (E,)
+                Neurone de destination de chaque connexion (indice dans la couche), croissant.
+            weights : numpy.ndarray (E,)
+                Poids des connexions.
+        """
+        self.node_slots = node_slots
+        self.biases = biases
+        self.responses = responses
+        self.sources = sources
+        self.targets = targets
+        self.weights = weights
+        self.counts = np.bincount(targets, minlength=len(node_slots)).astype(np.float64)
+        self.starts = np.searchsorted(targets, np.arange(len(node_slots)))
+
+        activations = np.asarray(activations)
+        aggregations = np.asarray(aggregations)
+        self.tanh = np.flatnonzero(activations == "tanh")
+        self.sigmoid = np.flatnonzero(activations == "sigmoid")
+        self.relu = np.flatnonzero(activations == "relu")
+        self.mean = np.flatnonzero(aggregations == "mean")
+        self.max = np.flatnonzero(aggregations == "max")
+
+    def evaluate(self, values):
+        """
+        Calcule les neurones de la couche et écrit leurs valeurs dans values.
+
+        Paramètres :
+            values : numpy.ndarray
+                Valeurs de tous les neurones de tous les réseaux.
+        """
+        weighted = values[self.sources] * self.weights
+        aggregated = np.bincount(self.targets, weights=weighted, minlength=len(self.node_slots))
+        if len(self.mean):
+            aggregated[self.mean] /= self.counts[self.mean]
+        if len(self.max):
+            aggregated[self.max] = np.maximum.reduceat(weighted, self.starts)[self.max]
+
+        z = self.biases + self.responses * aggregated
+        out = np.empty_like(z)
+        out[self.tanh] = np.tanh(np.clip(2.5 * z[self.tanh], -60.0, 60.0))
+        out[self.sigmoid] = 1.0 / (1.0 + np.exp(-np.clip(5.0 * z[self.sigmoid], -60.0, 60.0)))
+        relu = z[self.relu]
+        out[self.relu] = np.where(relu > 0.0, relu, 0.0)
+        values[self.node_slots] = out
+
+
+class NetworkBatch:
+    def __init__(self, nets):
+        """
+        Compile les réseaux feed-forward de toute une population en un seul programme par couches,
+        pour les évaluer tous ensemble en quelques opérations NumPy par tick.
+
+        Les neurones de tous les réseaux sont rangés dans un même tableau de valeurs ; chaque couche
+        regroupe les neurones de même profondeur de tous les réseaux. Les sorties sont identiques à
+        celles de FeedForwardNetwork.activate, aux arrondis près de tanh et exp.
+
+        Paramètres :
+            nets : list
+                Réseaux neat.nn.FeedForwardNetwork, qui doivent tous avoir le même nombre de sorties. Un réseau
+                qui a moins d'entrées que les autres ignore les dernières colonnes des entrées.
+
+        Lève :
+            ValueError : Si un réseau n'est pas un FeedForwardNetwork ou utilise une fonction non prise en charge.
+        """
+        self.count = len(nets)
+        layers = []  # Une liste de neurones (case, noeud de neat, réseau) par profondeur
+        input_slots = []
+        output_slots = []
+        slot_count = 0
+
+        for net in nets:
+            if not isinstance(net, FeedForwardNetwork):
+                raise ValueError(f"Réseau non compilable : {type(net).__name__}")
+
+            # Entrées et sorties d'abord : une sortie jamais calculée reste à 0, comme dans neat
+            slots = {}
+            depths = {}
+            for key in list(net.input_nodes) + list(net.output_nodes):
+                if key not in slots:
+                    slots[key] = slot_count
+                    slot_count += 1
+                depths[key] = 0
+
+            for node, act_func, agg_func, bias, response, links in net.node_evals:
+                if act_func not in ACTIVATIONS:
+                    raise ValueError(f"Fonction d'activation non prise en charge : {act_func.__name__}")
+                if agg_func not in AGGREGATIONS:
+                    raise ValueError(f"Fonction d'agrégation non prise en charge : {agg_func.__name__}")
+                if node not in slots:
+                    slots[node] = slot_count
+                    slot_count += 1
+
+                # node_evals est dans l'ordre topologique : les entrées de ce neurone sont déjà placées
+                depths[node] = 1 + max(depths[i] for i, _ in links)
+                while len(layers) < depths[node]:
+                    layers.append([])
+                layers[depths[node] - 1].append((slots[node], ACTIVATIONS[act_func], AGGREGATIONS[agg_func],
+                                                 bias, response, [(slots[i], w) for i, w in links]))
+
+            input_slots.append([slots[key] for key in net.input_nodes])
+            output_slots.append([slots[key] for key in net.output_nodes])
+
+        # Les entrées manquantes des réseaux les plus petits sont écrites dans une case inutilisée
+        width = max((len(slots) for slots in input_slots), default=0)
+        self.values = np.zeros(slot_count + 1)
+        self.input_slots = np.full((self.count, width), slot_count, dtype=np.intp)
+        for i, slots in enumerate(input_slots):
+            self.input_slots[i, :len(slots)] = slots
+        self.output_slots = np.array(output_slots, dtype=np.intp).reshape(self.count, len(nets[0].output_nodes) if nets else 0)
+        self.layers = [self.compile_layer(layer) for layer in layers]
+
+    @staticmethod
+    def compile_layer(nodes):
+        """
+        Paramètres :
+            nodes : list
+                Neurones (case, activation, agrégation, biais, réponse, connexions) d'une même profondeur.
+
+        Retourne :
+            NetworkLayer : La couche compilée.
+        """
+        sources, targets, weights = [], [], []
+        for k, (_, _, _, _, _, links) in enumerate(nodes):
+            for slot, weight in links:
+                sources.append(slot)
+                targets.append(k)
+                weights.append(weight)
+
+        return NetworkLayer(np.array([node[0] for node in nodes], dtype=np.intp),
+                            np.array([node[3] for node in nodes], dtype=np.float64),
+                            np.array([node[4] for node in nodes], dtype=np.float64),
+                            [node[1] for node in nodes], [node[2] for node in nodes],
+                            np.array(sources, dtype=np.intp), np.array(targets, dtype=np.intp),
+                            np.array(weights, dtype=np.float64))
+
+    def activate(self, inputs, indices=slice(None)):
+        """
+        Évalue les réseaux d'un ensemble de voitures en une seule passe.
+
+        Les neurones des autres réseaux sont aussi calculés (le coût est celui d'une opération NumPy),
+        mais leurs entrées ne sont pas modifiées.
+
+        Paramètres :
+            inputs : array-like (N, nombre d'entrées)
+                Entrées des réseaux, dans l'ordre de indices.
+            indices : array-like ou slice, optionnel
+                Réseaux à évaluer (tous par défaut).
+
+        Retourne :
+            numpy.ndarray (N, nombre de sorties) : Sorties des réseaux.
+        """
+        self.values[self.input_slots[indices]] = inputs
+        for layer in self.layers:
+            layer.evaluate(self.values)
+        return self.values[self.output_slots[indices]]
@@ -0,0 +1,219 @@
+import multiprocessing
+import os
+
+import neat
+
+from python.simulation import (PopulationSimulation, resolve_generation, culling_report, format_culling_report,
+                               MAX_TICKS, FIXED_DT)
+from python.simulation_core import NetworkController
+from python.profiling import StageProfiler
+from python.scenarios import Scenario, aggregate_fitness, format_scenario_fitness
+from python.fitness_cache import genome_digest, evaluation_digest, format_cache_report
+from python.shared_track import SharedTracks, attach_track
+
+# Cartes des scénarios, chargées une seule fois par processus de travail (voir _init_worker)
+_worker_maps = None
+
+
+def _init_worker(scenarios, tracks=()):
+    """
+    Initialise un processus de travail : pygame sans affichage et chargement unique des circuits.
+
+    Paramètres :
+        scenarios : list
+            Scénarios d'évaluation (circuits et positions de départ).
+        tracks : list, optionnel
+            Circuits publiés en mémoire partagée (TrackHandle) : le processus s'y attache au lieu de les charger.
+    """
+    global _worker_maps
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    import pygame
+    pygame.init()
+    for handle in tracks:
+        attach_track(handle)
+    _worker_maps = [scenario.game_map() for scenario in scenarios]
+
+
+def _simulate_shard(task):
+    """
+    Simule une tranche de la population dans un processus de travail, sur chaque scénario.
+
+    Paramètres :
+        task : tuple
+            (génomes, config, paramètres des voitures, backend de raycast, mode de collision, max_ticks, dt,
+             règles d'élimination, graine, profilage).
+
+    Retourne :
+        tuple : (list, dict) Pour chaque scénario, un CarTrace par génome de la tranche ; et les mesures
+                du profileur (ou None).
+    """
+    genomes, config, parameters, raycast_backend, collision_mode, max_ticks, dt, culling, seed, profile = task
+    profiler = StageProfiler(enabled=profile)
+    nets = [neat.nn.FeedForwardNetwork.create(genome, config) for genome in genomes]
+    controller = NetworkController(nets)  # Réseaux compilés une seule fois pour tous les scénarios
+    traces = []
+    for game_map in _worker_maps:
+        simulation = PopulationSimulation(nets, game_map, parameters, raycast_backend=raycast_backend,
+                                          collision_mode=collision_mode, max_ticks=max_ticks, dt=dt, culling=culling,
+                                          seed=seed, profiler=profiler, controller=controller)
+        simulation.run()
+        traces.append(simulation.traces())
+    return traces, profiler.snapshot() if profile else None
+
+
+class ShardedEvaluator:
+    def __init__(self, num_workers, parameters, track_name="map", raycast_backend="step", collision_mode="mask",
+                 max_ticks=MAX_TICKS, dt=FIXED_DT, culling=None, seed=None, profiler=None, scenarios=None,
+                 aggregate="mean", cache=None):
+        """
+        Évalue la population en la répartissant entre plusieurs processus.
+
+        Les tableaux des circuits sont publiés une seule fois en mémoire partagée : chaque processus s'y
+        attache sans copie (ou, si la mémoire partagée n'est pas disponible, charge les circuits) puis
+        simule, sans affichage, les voitures de sa tranche sur chaque scénario. Les historiques de chaque
+        scénario sont ensuite réunis par resolve_fitness, qui applique le bonus du premier passage et l'arrêt
+        anticipé exactement comme la boucle séquentielle : la fitness ne dépend ni du nombre de processus ni
+        du découpage.
+
+        Paramètres :
+            num_workers : int
+                Nombre de processus de travail.
+            parameters : CarParameters
+                Caractéristiques des voitures.
+            track_name : str, optionnel
+                Nom ou chemin du circuit.
+            raycast_backend : str, optionnel
+                Algorithme de lancer de rayons.
+            collision_mode : str, optionnel
+                Détection des collisions.
+            max_ticks : int, optionnel
+                Durée maximale d'une génération.
+            dt : float, optionnel
+                Pas de temps simulé.
+            culling : CullingRules, optionnel
+                Règles d'élimination anticipée ; si fourni, un rapport est affiché à chaque génération.
+            seed : int, optionnel
+                Graine du cœur de simulation.
+            profiler : StageProfiler, optionnel
+                Reçoit les mesures de tous les processus (temps cumulés : ils s'additionnent d'un processus
+                à l'autre et peuvent dépasser la durée de la génération).
+            scenarios : list, optionnel
+                Scénarios d'évaluation (Scenario) ; par défaut, le circuit track_name depuis sa position de départ.
+            aggregate : str, optionnel
+                Agrégation de la fitness sur les scénarios ("mean", "min" ou "weighted", voir aggregate_fitness).
+            cache : FitnessCache, optionnel
+                Cache des historiques : seuls les génomes absents du cache (pour au moins un scénario) sont
+                envoyés aux processus de travail ; un rapport est affiché à chaque génération.
+        """
+        self.num_workers = num_workers
+        self.parameters = parameters
+        self.raycast_backend = raycast_backend
+        self.collision_mode = collision_mode
+        self.max_ticks = max_ticks
+        self.dt = dt
+        self.culling = culling
+        self.seed = seed
+        self.profiler = profiler
+        self.scenarios = scenarios if scenarios else [Scenario(track_name)]
+        self.aggregate = aggregate
+        self.cache = cache
+        # "spawn" : même comportement sous Linux, Windows et macOS, sans hériter de l'état de pygame
+        context = multiprocessing.get_context("spawn")
+        try:
+            self.shared_tracks = SharedTracks([scenario.track for scenario in self.scenarios])
+            tracks = self.shared_tracks.handles
+        except OSError:
+            self.shared_tracks = None  # Chaque processus chargera ses circuits
+            tracks = []
+        self.pool = context.Pool(num_workers, initializer=_init_worker, initargs=(self.scenarios, tracks))
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        """
+        Arrête les processus de travail, puis libère la mémoire partagée des circuits.
+        """
+        if getattr(self, "pool", None) is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+        if getattr(self, "shared_tracks", None) is not None:
+            self.shared_tracks.close()
+            self.shared_tracks = None
+
+    def shards(self, genomes):
+        """
+        Découpe la population en tranches contiguës de tailles équilibrées (une par processus).
+
+        Paramètres :
+            genomes : list
+                Génomes de la population, dans l'ordre.
+
+        Retourne :
+            list : Listes de génomes.
+        """
+        count = min(self.num_workers, len(genomes))
+        bounds = [len(genomes) * k // count for k in range(count + 1)]
+        return [genomes[bounds[k]:bounds[k + 1]] for k in range(count)]
+
+    def evaluate(self, genomes, config):
+        """
+        Fonction d'évaluation à passer à population.run, à la place de eval_genomes.
+
+        Paramètres :
+            genomes : list
+                Liste de tuples (genome_id, genome).
+            config : neat.Config
+                Configuration NEAT.
+        """
+        population = [genome for _, genome in genomes]
+        if not population:
+            return
+
+        # Historiques déjà en cache, pour chaque scénario
+        scenario_traces = [[None] * len(population) for _ in self.scenarios]
+        if self.cache is not None:
+            self.cache.begin_generation()
+            genome_keys = [genome_digest(genome) for genome in population]
+            contexts = [evaluation_digest(scenario.game_map(), self.parameters, self.raycast_backend,
+                                          self.collision_mode, self.max_ticks, self.dt, self.culling, self.seed)
+                        for scenario in self.scenarios]
+            scenario_traces = [self.cache.lookup(genome_keys, context) for context in contexts]
+
+        # Génomes à simuler : ceux qui manquent dans au moins un scénario
+        missing = [i for i in range(len(population)) if any(traces[i] is None for traces in scenario_traces)]
+        if missing:
+            profile = self.profiler is not None and self.profiler.enabled
+            simulated_genomes = [population[i] for i in missing]
+            tasks = [(shard, config, self.parameters, self.raycast_backend, self.collision_mode, self.max_ticks,
+                      self.dt, self.culling, self.seed, profile) for shard in self.shards(simulated_genomes)]
+            results = self.pool.map(_simulate_shard, tasks)
+            if profile:
+                for _, snapshot in results:
+                    self.profiler.merge(snapshot)
+
+            # Historiques de toutes les tranches réunis, scénario par scénario
+            for s, traces in enumerate(scenario_traces):
+                simulated = [trace for shard_traces, _ in results for trace in shard_traces[s]]
+                for i, trace in zip(missing, simulated):
+                    if traces[i] is None:
+                        traces[i] = trace
+                if self.cache is not None:
+                    self.cache.store([genome_keys[i] for i in missing], contexts[s], simulated, self.max_ticks)
+
+        # Fitness de chaque scénario, puis agrégation
+        scenario_fitnesses = []
+        for traces in scenario_traces:
+            fitnesses, generation_ticks = resolve_generation(traces, self.max_ticks)
+            scenario_fitnesses.append(fitnesses)
+            if self.culling is not None and self.culling.enabled():
+                print(format_culling_report(culling_report(traces, generation_ticks)))
+
+        fitnesses = aggregate_fitness(scenario_fitnesses, self.scenarios, self.aggregate)
+        for genome, fitness in zip(population, fitnesses):
+            genome.fitness = float(fitness)
+        if len(self.scenarios) > 1:
+            print(format_scenario_fitness(scenario_fitnesses, self.scenarios))
+        if self.cache is not None:
+            print(format_cache_report(self.cache.report()))
@@ -0,0 +1,225 @@
+import csv
+import json
+import os
+import time
+from contextlib import nullcontext
+
+from neat.reporting import BaseReporter
+
+_NULL_STAGE = nullcontext()
+
+
+class StageTimer:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        """
+        Chronomètre une étape le temps d'un bloc with (voir StageProfiler.stage).
+        """
+        self.profiler = profiler
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.add(self.name, time.perf_counter_ns() - self.start)
+        return False
+
+
+class StageProfiler:
+    def __init__(self, enabled=True):
+        """
+        Temps cumulé et nombre d'appels de chaque étape d'une génération (capteurs, réseaux, physique,
+        collisions, affichage...), ticks de voiture simulés et nombre de voitures au fil des ticks.
+
+        Désactivé, stage() renvoie un contexte vide : le coût se limite à un appel de méthode par étape et par tick.
+
+        Paramètres :
+            enabled : bool, optionnel
+                Active les mesures.
+        """
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self):
+        """
+        Remet les mesures à zéro (au début de chaque génération).
+        """
+        self.nanoseconds = {}
+        self.calls = {}
+        self.car_ticks = 0
+        self.active_cars = []  # Voitures encore en course, à chaque tick
+        self.simulated_cars = []  # Voitures réellement simulées (ni éliminées, ni figées), à chaque tick
+
+    def stage(self, name):
+        """
+        Paramètres :
+            name : str
+                Nom de l'étape.
+
+        Retourne :
+            Contexte à utiliser avec with, qui ajoute la durée du bloc à l'étape.
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return StageTimer(self, name)
+
+    def add(self, name, nanoseconds, calls=1):
+        """
+        Ajoute une durée à une étape.
+
+        Paramètres :
+            name : str
+                Nom de l'étape.
+            nanoseconds : int
+                Durée mesurée.
+            calls : int, optionnel
+                Nombre d'appels correspondants.
+        """
+        self.nanoseconds[name] = self.nanoseconds.get(name, 0) + nanoseconds
+        self.calls[name] = self.calls.get(name, 0) + calls
+
+    def count_tick(self, simulated, active):
+        """
+        Enregistre le nombre de voitures d'un tick.
+
+        Paramètres :
+            simulated : int
+                Voitures simulées pendant ce tick.
+            active : int
+                Voitures encore en course.
+        """
+        if not self.enabled:
+            return
+        self.car_ticks += simulated
+        self.simulated_cars.append(simulated)
+        self.active_cars.append(active)
+
+    def snapshot(self):
+        """
+        Retourne :
+            dict : Mesures sérialisables (stages, car_ticks, active_cars, simulated_cars).
+        """
+        return {"stages": {name: {"calls": self.calls[name], "seconds": self.nanoseconds[name] / 1e9}
+                           for name in self.nanoseconds},
+                "car_ticks": self.car_ticks, "active_cars": list(self.active_cars),
+                "simulated_cars": list(self.simulated_cars)}
+
+    def merge(self, snapshot):
+        """
+        Ajoute les mesures d'un autre profileur (par exemple celui d'un processus d'évaluation).
+        Les nombres de voitures sont additionnés tick par tick.
+
+        Paramètres :
+            snapshot : dict
+                Résultat de StageProfiler.snapshot.
+        """
+        for name, stage in snapshot["stages"].items():
+            self.add(name, round(stage["seconds"] * 1e9), stage["calls"])
+        self.car_ticks += snapshot["car_ticks"]
+        for counts, other in ((self.active_cars, snapshot["active_cars"]),
+                              (self.simulated_cars, snapshot["simulated_cars"])):
+            counts.extend([0] * (len(other) - len(counts)))
+            for tick, count in enumerate(other):
+                counts[tick] += count
+
+
+class ProfilingReporter(BaseReporter):
+    def __init__(self, profiler, csv_path=None, json_path=None):
+        """
+        Reporter neat qui affiche, après chaque évaluation, le profil de la génération, et l'ajoute
+        éventuellement à un fichier CSV (une ligne par étape) et JSON Lines (un objet par génération).
+
+        Paramètres :
+            profiler : StageProfiler
+                Profileur utilisé par la boucle d'évaluation (activé par ce reporter).
+            csv_path : str, optionnel
+                Fichier CSV à compléter.
+            json_path : str, optionnel
+                Fichier JSON Lines à compléter.
+        """
+        self.profiler = profiler
+        self.profiler.enabled = True
+        self.csv_path = csv_path
+        self.json_path = json_path
+        self.generation = None
+        self.generation_start = None
+
+    def start_generation(self, generation):
+        self.generation = generation
+        self.generation_start = time.perf_counter()
+        self.profiler.reset()
+
+    def post_evaluate(self, config, population, species, best_genome):
+        record = self.profiler.snapshot()
+        record["generation"] = self.generation
+        record["evaluation_seconds"] = time.perf_counter() - self.generation_start
+        record["ticks"] = len(record["active_cars"])
+        print(format_profile(record))
+        if self.csv_path:
+            write_profile_csv(self.csv_path, record)
+        if self.json_path:
+            _make_parent(self.json_path)
+            with open(self.json_path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+
+
+def _make_parent(path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+
+def write_profile_csv(path, record):
+    """
+    Ajoute le profil d'une génération à un fichier CSV (en-tête écrit à la création du fichier).
+
+    Paramètres :
+        path : str
+            Fichier CSV.
+        record : dict
+            Profil d'une génération (voir ProfilingReporter.post_evaluate).
+    """
+    _make_parent(path)
+    new_file = not os.path.exists(path)
+    with open(path, "a", newline="") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(["generation", "stage", "calls", "seconds", "mean_us", "share", "evaluation_seconds",
+                             "ticks", "car_ticks"])
+        for name, stage in record["stages"].items():
+            writer.writerow([record["generation"], name, stage["calls"], f"{stage['seconds']:.6f}",
+                             f"{stage['seconds'] * 1e6 / max(stage['calls'], 1):.3f}",
+                             f"{stage['seconds'] / record['evaluation_seconds']:.4f}" if record["evaluation_seconds"] else "",
+                             f"{record['evaluation_seconds']:.6f}", record["ticks"], record["car_ticks"]])
+
+
+def format_profile(record):
+    """
+    Paramètres :
+        record : dict
+            Profil d'une génération (voir ProfilingReporter.post_evaluate).
+
+    Retourne :
+        str : Tableau lisible des étapes, des ticks de voiture et du nombre de voitures actives.
+    """
+    evaluation = record["evaluation_seconds"]
+    lines = [f" ****** Profil de la génération {record['generation']} ({evaluation:.3f} s) ******",
+             f" {'étape':<16}{'appels':>9}{'total (s)':>12}{'moyenne (µs)':>14}{'part':>8}"]
+    for name, stage in sorted(record["stages"].items(), key=lambda item: -item[1]["seconds"]):
+        share = stage["seconds"] / evaluation if evaluation else 0.0
+        lines.append(f" {name:<16}{stage['calls']:>9}{stage['seconds']:>12.3f}"
+                     f"{stage['seconds'] * 1e6 / max(stage['calls'], 1):>14.1f}{share:>8.1%}")
+    other = evaluation - sum(stage["seconds"] for stage in record["stages"].values())
+    if evaluation and other > 0:
+        lines.append(f" {'(autres)':<16}{'':>9}{other:>12.3f}{'':>14}{other / evaluation:>8.1%}")
+    active = record["active_cars"]
+    rate = record["car_ticks"] / evaluation if evaluation else 0.0
+    lines.append(f" {record['car_ticks']} ticks de voiture en {record['ticks']} ticks ({rate:.0f} par seconde)")
+    if active:
+        lines.append(f" voitures actives : {active[0]} au départ, {active[-1]} à la fin, "
+                     f"{sum(active) / len(active):.1f} en moyenne")
+    return "\n".join(lines)
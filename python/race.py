@@ -0,0 +1,163 @@
+import csv
+
+import numpy as np
+
+from python.simulation_core import Simulation, NetworkController, FIXED_DT
+
+RACE_MAX_TICKS = 60 * 60 * 10  # Durée maximale d'une course (10 minutes simulées)
+
+
+class Race:
+    def __init__(self, game_map, names, nets, parameters, laps=3, raycast_backend="step", collision_mode="mask",
+                 max_ticks=RACE_MAX_TICKS, dt=FIXED_DT):
+        """
+        Course entre voitures pilotées par leurs réseaux, sur le cœur de simulation : tout le plateau
+        avance en un seul appel par tick (capteurs regroupés par jeu d'angles, réseaux compilés en un
+        seul programme, physique vectorisée). Une voiture s'arrête quand elle a fait tous ses tours,
+        quand elle sort de la piste ou quand elle est immobilisée : son état n'a pas changé pendant un tick,
+        ses entrées et donc ses commandes resteront identiques, elle ne bougera plus jamais.
+
+        Paramètres :
+            game_map : Map
+                Carte du circuit.
+            names : list
+                Nom de chaque voiture.
+            nets : list
+                Réseau de neurones de chaque voiture.
+            parameters : list
+                CarParameters de chaque voiture.
+            laps : int, optionnel
+                Nombre de tours à compléter.
+            raycast_backend : str, optionnel
+                Algorithme de lancer de rayons ("step", "sdf" ou "lut").
+            collision_mode : str, optionnel
+                Détection des collisions ("mask" ou "obb").
+            max_ticks : int, optionnel
+                Durée maximale de la course.
+            dt : float, optionnel
+                Pas de temps simulé.
+        """
+        count = len(names)
+        self.names = list(names)
+        self.laps = laps
+        self.max_ticks = max_ticks
+        self.simulation = Simulation(game_map, parameters, NetworkController(nets), raycast_backend=raycast_backend,
+                                     collision_mode=collision_mode, dt=dt)
+        self.batch = self.simulation.batch
+        self.lap_counter = self.simulation.lap_counter
+        self.finish_tick = np.zeros(count, dtype=np.intp)  # 0 : n'a pas terminé
+        self.crash_tick = np.zeros(count, dtype=np.intp)  # 0 : n'est pas sorti de la piste
+        self.stall_tick = np.zeros(count, dtype=np.intp)  # 0 : n'est pas immobilisée
+
+    @property
+    def tick(self):
+        """
+        Retourne :
+            int : Nombre de ticks simulés depuis le départ.
+        """
+        return self.simulation.tick
+
+    def finished(self):
+        """
+        Retourne :
+            bool : True si toutes les voitures sont arrêtées ou si la durée maximale est atteinte.
+        """
+        return self.tick >= self.max_ticks or not self.batch.active.any()
+
+    def step(self, screen=None):
+        """
+        Avance la course d'un tick.
+
+        Paramètres :
+            screen : pygame.Surface, optionnel
+                Si fourni, les voitures en course y sont dessinées avant d'avancer.
+
+        Retourne :
+            tuple : (StepResult, numpy.ndarray) Événements du tick et voitures arrêtées pendant ce tick.
+        """
+        batch = self.batch
+        active = np.flatnonzero(batch.active)
+        state_before = (batch.position[active].copy(), batch.angle[active].copy(), batch.speed[active].copy(),
+                        batch.lateral_velocity[active].copy())
+        result = self.simulation.step(active, screen)
+
+        # Arrêter les voitures qui ont complété les tours requis, puis celles qui touchent l'herbe
+        done = result.lap_done & (result.laps >= self.laps)
+        crashed = result.collisions & ~done
+        # ...et celles qui sont immobilisées pour toujours
+        stalled = (np.all(batch.position[active] == state_before[0], axis=1)
+                   & (batch.angle[active] == state_before[1]) & (batch.speed[active] == state_before[2])
+                   & (batch.lateral_velocity[active] == state_before[3])
+                   & ~result.crossed & ~done & ~crashed)
+        self.finish_tick[active[done]] = self.tick
+        self.crash_tick[active[crashed]] = self.tick
+        self.stall_tick[active[stalled]] = self.tick
+        stopped = active[done | crashed | stalled]
+        self.batch.active[stopped] = False
+        return result, stopped
+
+    def standings(self):
+        """
+        Classement : d'abord les voitures arrivées, dans l'ordre d'arrivée, puis les autres par
+        progression (tours puis checkpoints), celles encore en course (ou immobilisées) avant celles
+        sorties de la piste au même endroit, puis les plus tardivement sorties.
+
+        Retourne :
+            list : Un dict par voiture (rank, name, status, laps, checkpoint, tick, time), dans l'ordre du classement.
+        """
+        checkpoints = max(len(self.lap_counter.checkpoints), 1)
+        progress = self.lap_counter.laps_completed * checkpoints + self.lap_counter.current_checkpoint
+        finished = self.finish_tick > 0
+        crashed = self.crash_tick > 0
+        order = np.lexsort((np.arange(len(self.names)), -self.crash_tick, crashed, -progress,
+                            np.where(finished, self.finish_tick, np.iinfo(np.intp).max)))
+
+        standings = []
+        for rank, i in enumerate(order.tolist()):
+            status = ("terminé" if finished[i] else "sortie" if crashed[i]
+                      else "immobile" if self.stall_tick[i] else "en course")
+            tick = int(self.finish_tick[i] or self.crash_tick[i] or self.stall_tick[i] or self.tick)
+            standings.append({"rank": rank, "name": self.names[i], "status": status,
+                              "laps": int(self.lap_counter.laps_completed[i]),
+                              "checkpoint": int(self.lap_counter.current_checkpoint[i]),
+                              "tick": tick, "time": tick * self.simulation.dt})
+        return standings
+
+    def run(self):
+        """
+        Fait courir toutes les voitures jusqu'à la fin, sans affichage.
+
+        Retourne :
+            list : Classement final (voir standings).
+        """
+        while not self.finished():
+            self.step()
+        return self.standings()
+
+
+def format_standings(standings):
+    """
+    Retourne :
+        str : Tableau lisible du classement.
+    """
+    lines = [f"{'rang':>5}  {'voiture':<28}{'statut':<11}{'tours':>6}{'checkpoint':>12}{'temps (s)':>11}"]
+    for row in standings:
+        lines.append(f"{row['rank']:>5}  {row['name'][:27]:<28}{row['status']:<11}{row['laps']:>6}"
+                     f"{row['checkpoint']:>12}{row['time']:>11.2f}")
+    return "\n".join(lines)
+
+
+def write_standings_csv(path, standings):
+    """
+    Écrit le classement dans un fichier CSV.
+
+    Paramètres :
+        path : str
+            Fichier CSV.
+        standings : list
+            Classement (voir Race.standings).
+    """
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["rank", "name", "status", "laps", "checkpoint", "tick", "time"])
+        writer.writeheader()
+        writer.writerows(standings)
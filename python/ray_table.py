@@ -0,0 +1,264 @@
+import os
+import time
+
+import numpy as np
+
+from python.map import CACHE_DIR
+from python.raycast import Raycast, MAX_RAY_DISTANCE
+
+RAY_TABLE_CELL = 2  # Pas de la grille des positions (en pixels)
+RAY_TABLE_ANGLE = 2  # Pas des directions (en degrés)
+RAY_TABLE_VERSION = 1  # À incrémenter si le format ou le calcul de la table change
+BUILD_CHUNK = 2048  # Nombre de positions tracées par appel pendant la construction
+
+# Tables déjà ouvertes dans ce processus : {(empreinte de l'image, pas, pas angulaire): RayTable}
+_tables = {}
+
+
+class RayTable:
+    def __init__(self, index, distances, cell=RAY_TABLE_CELL, angle_step=RAY_TABLE_ANGLE):
+        """
+        Table des distances lues par les rayons, échantillonnées sur une grille de positions (tous les
+        cell pixels, sur la route) et de directions absolues (tous les angle_step degrés). Elle ne dépend
+        pas des angles des rayons d'une voiture : un rayon d'angle a d'une voiture orientée selon h est lu
+        dans la direction h + a.
+
+        Paramètres :
+            index : numpy.ndarray (hauteur // cell + 1, largeur // cell + 1) d'int32
+                Ligne de distances de chaque nœud de la grille, -1 pour un nœud sur l'herbe.
+            distances : numpy.ndarray (nœuds sur la route, 360 // angle_step) d'uint8
+                Distance exacte (marche pixel par pixel) depuis chaque nœud, dans chaque direction.
+            cell : int, optionnel
+                Pas de la grille des positions.
+            angle_step : int, optionnel
+                Pas des directions.
+        """
+        self.index = index
+        self.distances = distances
+        self.cell = cell
+        self.angle_step = angle_step
+        self.directions = distances.shape[1]
+
+    @property
+    def nbytes(self):
+        """
+        Retourne :
+            int : Taille de la table (index et distances), en octets.
+        """
+        return self.index.nbytes + self.distances.nbytes
+
+    def lookup(self, positions, angles):
+        """
+        Lit les distances de rayons par interpolation : bilinéaire entre les quatre nœuds de la grille
+        qui entourent la position (seuls les nœuds sur la route comptent), linéaire entre les deux
+        directions qui encadrent l'angle du rayon.
+
+        Paramètres :
+            positions : numpy.ndarray (N, 2)
+                Origines (x, y) des rayons.
+            angles : numpy.ndarray (N, R)
+                Angles absolus des rayons en degrés (angle de la voiture + angle du rayon).
+
+        Retourne :
+            numpy.ndarray : Distances (N, R).
+        """
+        gx = positions[:, 0] / self.cell
+        gy = positions[:, 1] / self.cell
+        i0 = np.floor(gx).astype(np.intp)
+        j0 = np.floor(gy).astype(np.intp)
+        fx = (gx - i0)[:, None]
+        fy = (gy - j0)[:, None]
+
+        a = np.mod(angles / self.angle_step, self.directions)
+        k0 = np.floor(a).astype(np.intp) % self.directions
+        k1 = (k0 + 1) % self.directions
+        fa = a - np.floor(a)
+
+        height, width = self.index.shape
+        total = np.zeros(angles.shape)
+        weight = np.zeros(angles.shape)
+        for dj, di, w in ((0, 0, (1 - fx) * (1 - fy)), (0, 1, fx * (1 - fy)),
+                          (1, 0, (1 - fx) * fy), (1, 1, fx * fy)):
+            j = j0 + dj
+            i = i0 + di
+            inside = (j >= 0) & (j < height) & (i >= 0) & (i < width)
+            rows = np.where(inside, self.index[np.clip(j, 0, height - 1), np.clip(i, 0, width - 1)], -1)[:, None]
+            valid = rows >= 0
+            rows = np.where(valid, rows, 0)
+            values = (1 - fa) * self.distances[rows, k0] + fa * self.distances[rows, k1]
+            w = np.where(valid, w, 0.0)
+            total += w * values
+            weight += w
+        return np.divide(total, weight, out=np.zeros(angles.shape), where=weight > 0)
+
+
+def build_ray_table(game_map, cell=RAY_TABLE_CELL, angle_step=RAY_TABLE_ANGLE):
+    """
+    Calcule la table des distances d'un circuit en traçant exactement (sphere tracing, identique à la
+    marche pixel par pixel) un rayon par nœud de la grille sur la route et par direction.
+
+    Paramètres :
+        game_map : Map
+            Carte du circuit.
+        cell : int, optionnel
+            Pas de la grille des positions.
+        angle_step : int, optionnel
+            Pas des directions.
+
+    Retourne :
+        tuple : (numpy.ndarray, numpy.ndarray) Index des nœuds et distances (voir RayTable).
+    """
+    grass = game_map.grass_grid
+    height, width = grass.shape
+    ys = np.arange(0, height, cell)
+    xs = np.arange(0, width, cell)
+    road = ~grass[np.ix_(ys, xs)]
+
+    index = np.full((height // cell + 1, width // cell + 1), -1, dtype=np.int32)
+    nodes = np.argwhere(road)
+    index[nodes[:, 0], nodes[:, 1]] = np.arange(len(nodes), dtype=np.int32)
+
+    raycast = Raycast(list(range(0, 360, angle_step)), backend="sdf")
+    positions = np.stack((xs[nodes[:, 1]], ys[nodes[:, 0]]), axis=1).astype(np.float64)
+    distances = np.empty((len(nodes), 360 // angle_step), dtype=np.uint8)  # MAX_RAY_DISTANCE <= 255
+    for start in range(0, len(nodes), BUILD_CHUNK):
+        chunk = positions[start:start + BUILD_CHUNK]
+        distances[start:start + BUILD_CHUNK], _ = raycast.cast_rays_batch(chunk, np.zeros(len(chunk)), game_map)
+    return index, distances
+
+
+def ray_table_paths(game_map, cell=RAY_TABLE_CELL, angle_step=RAY_TABLE_ANGLE):
+    """
+    Retourne :
+        tuple : (str, str) Fichiers .npy de l'index et des distances dans le cache des cartes, nommés
+                d'après l'empreinte de l'image de la route (modifier l'image invalide la table).
+    """
+    prefix = os.path.join(CACHE_DIR, f"{game_map.road_hash}-rays-c{cell}-a{angle_step}-r{MAX_RAY_DISTANCE}"
+                                     f"-v{RAY_TABLE_VERSION}")
+    return f"{prefix}-index.npy", f"{prefix}-distances.npy"
+
+
+def get_ray_table(game_map, cell=RAY_TABLE_CELL, angle_step=RAY_TABLE_ANGLE):
+    """
+    Renvoie la table des distances d'un circuit, ouverte une seule fois par processus.
+
+    La table est lue depuis le cache disque par projection en mémoire, en lecture seule : les processus
+    de travail qui l'ouvrent partagent les mêmes pages. Elle n'est calculée (puis écrite) que si elle
+    est absente du cache ; le calcul prend quelques secondes.
+
+    Paramètres :
+        game_map : Map
+            Carte du circuit.
+        cell : int, optionnel
+            Pas de la grille des positions.
+        angle_step : int, optionnel
+            Pas des directions.
+
+    Retourne :
+        RayTable : La table du circuit.
+    """
+    key = (game_map.road_hash, cell, angle_step)
+    if key in _tables:
+        return _tables[key]
+
+    index_path, distances_path = ray_table_paths(game_map, cell, angle_step)
+    try:
+        index = np.load(index_path, mmap_mode="r")
+        distances = np.load(distances_path, mmap_mode="r")
+    except (OSError, ValueError):
+        print(f"Calcul de la table des rayons ({cell} px, {angle_step}°)...")
+        index, distances = build_ray_table(game_map, cell, angle_step)
+        if save_ray_table(index_path, distances_path, index, distances):
+            index = np.load(index_path, mmap_mode="r")
+            distances = np.load(distances_path, mmap_mode="r")
+        else:
+            for array in (index, distances):
+                array.flags.writeable = False
+
+    _tables[key] = RayTable(index, distances, cell, angle_step)
+    return _tables[key]
+
+
+def save_ray_table(index_path, distances_path, index, distances):
+    """
+    Écrit la table dans le cache disque (fichiers temporaires puis renommage : une table n'est jamais
+    lue à moitié écrite). Un échec d'écriture n'est pas bloquant.
+
+    Retourne :
+        bool : True si la table a été écrite.
+    """
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        for path, array in ((distances_path, distances), (index_path, index)):
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp_path, path)
+        return True
+    except OSError:
+        return False
+
+
+def ray_table_report(game_map, table, samples=20000, seed=0):
+    """
+    Mesure l'erreur de la table par rapport au lancer exact, sur des rayons tirés au hasard (positions
+    uniformes sur la route, directions uniformes), et sa taille en mémoire.
+
+    Paramètres :
+        game_map : Map
+            Carte du circuit.
+        table : RayTable
+            Table à évaluer.
+        samples : int, optionnel
+            Nombre de rayons comparés.
+        seed : int, optionnel
+            Graine du tirage.
+
+    Retourne :
+        dict : Erreur absolue (moyenne, médiane, 95e et 99e centiles, maximum, en pixels), erreur moyenne
+               de l'entrée du réseau (distance / MAX_RAY_DISTANCE), taille et durée d'une lecture.
+    """
+    rng = np.random.default_rng(seed)
+    road = np.argwhere(~game_map.grass_grid)
+    pixels = road[rng.integers(len(road), size=samples)]
+    positions = pixels[:, ::-1] + rng.random((samples, 2))
+    angles = rng.uniform(0, 360, samples)
+
+    start = time.perf_counter()
+    exact, _ = Raycast([0], backend="sdf").cast_rays_batch(positions, angles, game_map)
+    exact_time = time.perf_counter() - start
+    start = time.perf_counter()
+    approx = table.lookup(positions, angles[:, None])
+    lookup_time = time.perf_counter() - start
+
+    error = np.abs(approx - exact).ravel()
+    return {
+        "samples": samples,
+        "mean": float(error.mean()),
+        "median": float(np.median(error)),
+        "p95": float(np.percentile(error, 95)),
+        "p99": float(np.percentile(error, 99)),
+        "max": float(error.max()),
+        "input_error": float(error.mean() / MAX_RAY_DISTANCE),
+        "nodes": int(table.distances.shape[0]),
+        "nbytes": table.nbytes,
+        "exact_us": exact_time / samples * 1e6,
+        "lookup_us": lookup_time / samples * 1e6,
+    }
+
+
+def format_ray_table_report(report):
+    """
+    Paramètres :
+        report : dict
+            Rapport renvoyé par ray_table_report.
+
+    Retourne :
+        str : Rapport lisible.
+    """
+    return (f"  erreur (px) sur {report['samples']} rayons : moyenne {report['mean']:.2f}, "
+            f"médiane {report['median']:.2f}, 95e centile {report['p95']:.2f}, 99e centile {report['p99']:.2f}, "
+            f"max {report['max']:.1f}\n"
+            f"  erreur moyenne des entrées du réseau : {report['input_error']:.2%}\n"
+            f"  mémoire : {report['nodes']} nœuds, {report['nbytes'] / 2 ** 20:.1f} Mo\n"
+            f"  lecture : {report['lookup_us']:.2f} µs par rayon (lancer exact : {report['exact_us']:.2f} µs)")
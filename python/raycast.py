@@ -1,16 +1,31 @@
 import pygame
 import math
+import numpy as np
+
+MAX_RAY_DISTANCE = 200  # Distance maximale parcourue par un rayon (en pixels)
+RAYCAST_BACKENDS = ("step", "sdf", "lut")  # Algorithmes disponibles pour cast_rays_batch
+SAFETY_MARGIN = math.sqrt(2) + 1e-6  # Écart maximal entre distance le long du rayon et distance entre pixels
 
 class Raycast:
-    def __init__(self, angles):
+    def __init__(self, angles, backend="step"):
         """
         Initialise l'objet Raycast avec une liste d'angles.
 
         Paramètres :
             angles : list
                 Liste des angles en degrés pour les rayons.
+            backend : str, optionnel
+                Algorithme de cast_rays_batch : "step" (marche pixel par pixel sur la grille d'herbe),
+                "sdf" (sphere tracing sur le champ de distance de la carte) ou "lut" (lecture interpolée
+                dans la table des distances précalculée du circuit, approchée, voir python.ray_table).
         """
+        if backend not in RAYCAST_BACKENDS:
+            raise ValueError(f"Backend de raycast inconnu : {backend!r} (choix : {', '.join(RAYCAST_BACKENDS)})")
+
         self.angles = angles  # Liste des angles en degrés
+        self.backend = backend  # Algorithme utilisé par cast_rays_batch
+        self.angles_array = np.asarray(angles, dtype=np.float64)  # Angles pour le lancer vectorisé
+        self.steps = np.arange(MAX_RAY_DISTANCE, dtype=np.float64)  # Distances testées le long de chaque rayon
 
     def cast_rays(self, car_position, car_angle, map_surface):
         """
@@ -44,7 +59,7 @@ class Raycast:
             dy = -math.cos(rad_angle)
 
             distance = 0
-            max_distance = 200  # Distance maximale pour vérifier les obstacles
+            max_distance = MAX_RAY_DISTANCE  # Distance maximale pour vérifier les obstacles
             step = 1  # Taille de l'étape en pixels
 
             # Parcours le rayon jusqu'à la distance maximale
@@ -72,6 +87,114 @@ class Raycast:
 
         return distances, end_points
 
+    def cast_rays_batch(self, car_positions, car_angles, map_instance):
+        """
+        Lance tous les rayons de toutes les voitures en un seul appel NumPy.
+
+        Les backends "step" et "sdf" reproduisent la marche pixel par pixel de cast_rays, mais sur les
+        tableaux précalculés de la carte (Map.grass_grid, Map.distance_field) au lieu de Surface.get_at.
+        Le backend "lut" ne trace aucun rayon : il interpole les distances exactes échantillonnées tous les
+        quelques pixels et degrés (voir python.ray_table).
+
+        Paramètres :
+            car_positions : array-like (N, 2)
+                Positions (x, y) des N voitures.
+            car_angles : array-like (N,)
+                Angles des voitures en degrés.
+            map_instance : Map
+                Carte sur laquelle les rayons sont projetés.
+
+        Retourne :
+            tuple : (numpy.ndarray, numpy.ndarray)
+                distances : tableau (N, nombre de rayons) des distances.
+                end_points : tableau (N, nombre de rayons, 2) des points d'extrémité.
+        """
+        car_positions = np.asarray(car_positions, dtype=np.float64).reshape(-1, 2)
+        car_angles = np.asarray(car_angles, dtype=np.float64).reshape(-1)
+
+        # Directions de tous les rayons : (N, R)
+        rad_angles = np.radians(car_angles[:, None] + self.angles_array[None, :])
+        dx = -np.sin(rad_angles)
+        dy = -np.cos(rad_angles)
+
+        if self.backend == "lut":
+            from python.ray_table import get_ray_table  # Import différé : ray_table utilise Raycast
+            distances = get_ray_table(map_instance).lookup(car_positions, car_angles[:, None] + self.angles_array)
+        elif self.backend == "sdf":
+            distances = self._sphere_trace(car_positions, dx, dy, map_instance.grass_grid, map_instance.distance_field)
+        else:
+            distances = self._step_rays(car_positions, dx, dy, map_instance.grass_grid)
+
+        end_points = np.stack((car_positions[:, 0, None] + dx * distances,
+                               car_positions[:, 1, None] + dy * distances), axis=2)
+
+        return distances, end_points
+
+    def _step_rays(self, car_positions, dx, dy, grass_grid):
+        """
+        Avance tous les rayons d'un pixel à la fois, toutes les étapes étant évaluées d'un coup.
+
+        Retourne :
+            numpy.ndarray : Distances (N, R).
+        """
+        height, width = grass_grid.shape
+
+        # Points testés le long de chaque rayon : (N, R, MAX_RAY_DISTANCE)
+        x0 = car_positions[:, 0, None, None]
+        y0 = car_positions[:, 1, None, None]
+        xs = x0 + dx[:, :, None] * self.steps
+        ys = y0 + dy[:, :, None] * self.steps
+
+        # Un rayon s'arrête en sortant de la carte ou en touchant l'herbe
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        xi = np.where(inside, xs, 0).astype(np.intp)
+        yi = np.where(inside, ys, 0).astype(np.intp)
+        hit = ~inside | grass_grid[yi, xi]
+
+        # Première étape bloquante, ou la distance maximale si le rayon ne touche rien
+        return np.where(hit.any(axis=2), hit.argmax(axis=2), MAX_RAY_DISTANCE).astype(np.float64)
+
+    def _sphere_trace(self, car_positions, dx, dy, grass_grid, distance_field):
+        """
+        Avance chaque rayon par sauts sûrs lus dans le champ de distance (sphere tracing).
+
+        Un pixel d'herbe situé à la distance f du pixel courant ne peut pas être atteint en moins
+        de f - sqrt(2) pixels le long du rayon : toutes les étapes entières jusque-là sont sautées.
+        Le résultat est donc identique à celui de la marche pixel par pixel.
+
+        Retourne :
+            numpy.ndarray : Distances (N, R).
+        """
+        height, width = grass_grid.shape
+        shape = dx.shape
+
+        # Rayons aplatis ; seuls les rayons encore en cours sont traités à chaque itération
+        x0 = np.broadcast_to(car_positions[:, 0, None], shape).ravel()
+        y0 = np.broadcast_to(car_positions[:, 1, None], shape).ravel()
+        dx = dx.ravel()
+        dy = dy.ravel()
+        distances = np.zeros(dx.size, dtype=np.float64)
+        running = np.arange(dx.size)
+
+        while running.size:
+            t = distances[running]
+            xs = x0[running] + dx[running] * t
+            ys = y0[running] + dy[running] * t
+
+            # Arrêt en sortant de la carte ou en touchant l'herbe, comme pour la marche pixel par pixel
+            inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+            xi = np.where(inside, xs, 0).astype(np.intp)
+            yi = np.where(inside, ys, 0).astype(np.intp)
+            free_pixel = inside & ~grass_grid[yi, xi]
+
+            # Saut jusqu'à la première étape entière qui n'est pas garantie libre
+            jump = np.floor(np.maximum(distance_field[yi, xi] - SAFETY_MARGIN, 0)) + 1
+            t = np.where(free_pixel, np.minimum(t + jump, MAX_RAY_DISTANCE), t)
+            distances[running] = t
+            running = running[free_pixel & (t < MAX_RAY_DISTANCE)]
+
+        return distances.reshape(shape)
+
     def draw_rays(self, screen, car_position, end_points):
         """
         Dessine les rayons sur l'écran à partir de la position de la voiture jusqu'aux points d'extrémité.
@@ -83,7 +206,9 @@ class Raycast:
                 La position actuelle de la voiture (x, y).
             end_points : list
                 Liste des points d'extrémité pour chaque rayon.
+
+        Retourne :
+            list : Zones de l'écran modifiées (pygame.Rect), une par rayon.
         """
-        for end_point in end_points:
-            # Dessine une ligne entre la position de la voiture et le point d'extrémité du rayon
-            pygame.draw.line(screen, (24, 196, 201), car_position, end_point, 1)
\ No newline at end of file
+        # Dessine une ligne entre la position de la voiture et le point d'extrémité de chaque rayon
+        return [pygame.draw.line(screen, (24, 196, 201), car_position, end_point, 1) for end_point in end_points]
\ No newline at end of file
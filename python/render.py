@@ -0,0 +1,139 @@
+from collections import OrderedDict
+
+import pygame
+
+
+class DirtyRectRenderer:
+    def __init__(self, screen, background):
+        """
+        Affichage par zones modifiées : au lieu de redessiner toute la carte à chaque image, seules les
+        zones dessinées à l'image précédente (voitures, rayons, textes) sont restaurées depuis le fond,
+        puis seules les zones modifiées sont envoyées à l'écran. Le coût dépend du nombre de voitures,
+        pas de la taille de la fenêtre.
+
+        Paramètres :
+            screen : pygame.Surface
+                Fenêtre du jeu.
+            background : pygame.Surface
+                Fond (la carte), copié : les éléments figés y sont ajoutés par stamp().
+        """
+        self.screen = screen
+        self.background = background.copy()
+        self.previous = []  # Zones dessinées pendant l'image précédente
+        self.current = []  # Zones dessinées pendant l'image en cours
+        self.full_redraw = True
+
+    def invalidate(self):
+        """
+        Force un affichage complet à la prochaine image (par exemple si la fenêtre a été recouverte).
+        """
+        self.full_redraw = True
+
+    def begin_frame(self):
+        """
+        Efface les éléments de l'image précédente en restaurant le fond sous leurs zones.
+        """
+        if self.full_redraw:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            for rect in self.previous:
+                self.screen.blit(self.background, rect, rect)
+
+    def add(self, rects):
+        """
+        Signale des zones dessinées directement sur l'écran (voir Simulation.draw).
+
+        Paramètres :
+            rects : list
+                Zones (pygame.Rect) modifiées.
+        """
+        self.current.extend(rects)
+
+    def blit(self, surface, position):
+        """
+        Dessine une surface (voiture, texte...) et retient sa zone.
+
+        Paramètres :
+            surface : pygame.Surface
+                Surface à dessiner.
+            position : tuple ou pygame.Rect
+                Position du coin supérieur gauche ou zone de destination.
+
+        Retourne :
+            pygame.Rect : Zone modifiée.
+        """
+        rect = self.screen.blit(surface, position)
+        self.current.append(rect)
+        return rect
+
+    def stamp(self, surface, position):
+        """
+        Ajoute au fond un élément qui ne bougera plus (par exemple une voiture arrêtée) : il n'est
+        plus redessiné aux images suivantes.
+
+        Paramètres :
+            surface : pygame.Surface
+                Surface à ajouter.
+            position : tuple ou pygame.Rect
+                Position du coin supérieur gauche ou zone de destination.
+        """
+        rect = self.background.blit(surface, position)
+        self.screen.blit(self.background, rect, rect)
+        self.current.append(rect)
+
+    def end_frame(self):
+        """
+        Envoie à l'écran les zones effacées et dessinées pendant cette image.
+        """
+        if self.full_redraw:
+            pygame.display.flip()
+            self.full_redraw = False
+        else:
+            pygame.display.update(self.previous + self.current)
+        self.previous = self.current
+        self.current = []
+
+
+class TextCache:
+    def __init__(self, font, max_entries=1024):
+        """
+        Réutilise les surfaces de texte déjà rendues : font.render n'est appelé que pour un texte
+        (ou une couleur) jamais vu, par exemple quand le rang, le tour ou le checkpoint d'une voiture change.
+
+        Paramètres :
+            font : pygame.font.Font
+                Police utilisée.
+            max_entries : int, optionnel
+                Nombre maximal de surfaces gardées (les moins récemment utilisées sont oubliées).
+        """
+        self.font = font
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text, color, antialias=True):
+        """
+        Paramètres :
+            text : str
+                Texte à afficher.
+            color : tuple
+                Couleur du texte.
+            antialias : bool, optionnel
+                Lissage des caractères.
+
+        Retourne :
+            pygame.Surface : Surface du texte (partagée : ne pas la modifier).
+        """
+        key = (text, color, antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = self.font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
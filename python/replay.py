@@ -0,0 +1,323 @@
+import json
+import os
+
+import neat
+import numpy as np
+from neat.reporting import BaseReporter
+
+from python.simulation import PopulationSimulation, MAX_TICKS
+from python.simulation_core import FIXED_DT
+
+REPLAY_DIR = "replays"  # Dossier des replays enregistrés pendant l'entraînement
+REPLAY_VERSION = 1  # À incrémenter si le format des fichiers change
+
+
+class ReplayRecorder:
+    def __init__(self, count, capacity=MAX_TICKS):
+        """
+        Enregistre, tick par tick, l'état de chaque voiture d'une simulation (voir Simulation, paramètre
+        recorder) : position, angle, vitesse, sorties du réseau et commandes, passages de checkpoints
+        et tick de la sortie de piste.
+
+        Seules les voitures avancées pendant un tick y sont enregistrées : une voiture arrêtée (sortie de
+        piste, éliminée ou figée) garde ensuite sa dernière pose.
+
+        Paramètres :
+            count : int
+                Nombre de voitures.
+            capacity : int, optionnel
+                Nombre de ticks prévus (les tableaux grandissent au besoin).
+        """
+        self.count = count
+        self.position = np.zeros((count, capacity + 1, 2), dtype=np.float32)
+        self.angle = np.zeros((count, capacity + 1), dtype=np.float32)
+        self.speed = np.zeros((count, capacity + 1), dtype=np.float32)
+        self.outputs = np.zeros((count, capacity + 1, 2), dtype=np.float32)
+        self.throttle = np.zeros((count, capacity + 1), dtype=np.int8)
+        self.steer = np.zeros((count, capacity + 1), dtype=np.int8)
+        self.ticks = np.zeros(count, dtype=np.int32)  # Dernier tick enregistré de chaque voiture
+        self.collision_tick = np.zeros(count, dtype=np.int32)  # 0 : pas de sortie de piste
+        self.events = []  # Passages de checkpoints : (voiture, tick, prochain checkpoint, tours complétés)
+
+    def start(self, simulation):
+        """
+        Enregistre la pose de départ (tick 0) de toutes les voitures.
+
+        Paramètres :
+            simulation : Simulation
+                Simulation enregistrée.
+        """
+        batch = simulation.batch
+        self.position[:, 0] = batch.position
+        self.angle[:, 0] = batch.angle
+        self.speed[:, 0] = batch.speed
+
+    def record(self, simulation, result, throttle, steer):
+        """
+        Enregistre le tick qui vient d'être simulé (appelé par Simulation.step).
+
+        Paramètres :
+            simulation : Simulation
+                Simulation enregistrée.
+            result : StepResult
+                Événements du tick.
+            throttle, steer : numpy.ndarray
+                Commandes des voitures avancées.
+        """
+        tick = simulation.tick
+        if tick >= self.angle.shape[1]:
+            self.grow(2 * tick)
+        batch = simulation.batch
+        indices = result.indices
+        self.position[indices, tick] = batch.position[indices]
+        self.angle[indices, tick] = batch.angle[indices]
+        self.speed[indices, tick] = batch.speed[indices]
+        self.throttle[indices, tick] = throttle
+        self.steer[indices, tick] = steer
+        outputs = getattr(simulation.controller, "outputs", None)
+        if outputs is not None:
+            self.outputs[indices, tick] = outputs
+        self.ticks[indices] = tick
+        self.collision_tick[indices[result.collisions]] = tick
+        for k in np.flatnonzero(result.crossed).tolist():
+            self.events.append((int(indices[k]), tick, int(result.checkpoints[k]), int(result.laps[k])))
+
+    def grow(self, capacity):
+        """
+        Agrandit les tableaux pour contenir capacity ticks.
+        """
+        for name in ("position", "angle", "speed", "outputs", "throttle", "steer"):
+            array = getattr(self, name)
+            grown = np.zeros((array.shape[0], capacity + 1) + array.shape[2:], dtype=array.dtype)
+            grown[:, :array.shape[1]] = array
+            setattr(self, name, grown)
+
+    def save(self, path, names, fitness, metadata):
+        """
+        Écrit le replay dans un fichier .npz compressé, une colonne par grandeur enregistrée. Après son
+        dernier tick, chaque voiture garde sa dernière pose : le lecteur n'a qu'à indexer les tableaux.
+
+        Paramètres :
+            path : str
+                Fichier .npz.
+            names : list
+                Nom de chaque voiture.
+            fitness : list
+                Fitness de chaque voiture (celle de la génération).
+            metadata : dict
+                Informations sérialisables en JSON (circuit, génération, pas de temps, image des voitures...).
+        """
+        length = int(self.ticks.max()) + 1 if self.count else 1
+        columns = {}
+        for name in ("position", "angle", "speed", "outputs", "throttle", "steer"):
+            array = getattr(self, name)[:, :length].copy()
+            for i, last in enumerate(self.ticks.tolist()):
+                array[i, last + 1:] = array[i, last]
+            columns[name] = array
+        events = np.array(self.events, dtype=np.int32).reshape(-1, 4)
+        metadata = dict(metadata, version=REPLAY_VERSION)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, names=np.array(names, dtype=str), fitness=np.asarray(fitness, dtype=np.float64),
+                                ticks=self.ticks, collision_tick=self.collision_tick, events=events,
+                                metadata=np.array(json.dumps(metadata)), **columns)
+        os.replace(tmp_path, path)
+
+
+class Replay:
+    def __init__(self, path):
+        """
+        Replay chargé depuis un fichier écrit par ReplayRecorder.save. L'état de toutes les voitures à
+        n'importe quel tick se lit directement dans les tableaux, sans réseau ni physique : un lecteur peut
+        avancer, reculer ou sauter à n'importe quelle vitesse.
+
+        Paramètres :
+            path : str
+                Fichier .npz.
+
+        Lève :
+            ValueError : Si le fichier n'a pas été écrit par une version compatible.
+        """
+        with np.load(path) as data:
+            self.metadata = json.loads(str(data["metadata"]))
+            if self.metadata.get("version") != REPLAY_VERSION:
+                raise ValueError(f"Version de replay non prise en charge : {self.metadata.get('version')!r}")
+            self.names = data["names"].tolist()
+            self.fitness = data["fitness"]
+            self.ticks = data["ticks"]
+            self.collision_tick = data["collision_tick"]
+            self.position = data["position"]
+            self.angle = data["angle"]
+            self.speed = data["speed"]
+            self.outputs = data["outputs"]
+            self.throttle = data["throttle"]
+            self.steer = data["steer"]
+            events = data["events"]
+        self.path = path
+        self.dt = self.metadata.get("dt", FIXED_DT)
+
+        # Passages de checkpoints de chaque voiture, triés par tick
+        self.event_ticks = []
+        self.event_progress = []  # (prochain checkpoint, tours complétés) après chaque passage
+        for i in range(len(self.names)):
+            car_events = events[events[:, 0] == i]
+            self.event_ticks.append(car_events[:, 1])
+            self.event_progress.append(car_events[:, 2:4])
+
+    @property
+    def length(self):
+        """
+        Retourne :
+            int : Nombre de ticks du replay (le tick 0 est la pose de départ).
+        """
+        return self.angle.shape[1] - 1
+
+    def clamp(self, tick):
+        """
+        Retourne :
+            int : Tick ramené entre 0 et length.
+        """
+        return min(max(int(tick), 0), self.length)
+
+    def poses(self, tick):
+        """
+        Paramètres :
+            tick : int
+                Tick demandé.
+
+        Retourne :
+            tuple : (numpy.ndarray (N, 2), numpy.ndarray (N,)) Positions et angles des voitures.
+        """
+        tick = self.clamp(tick)
+        return self.position[:, tick], self.angle[:, tick]
+
+    def progress(self, tick):
+        """
+        Paramètres :
+            tick : int
+                Tick demandé.
+
+        Retourne :
+            tuple : (numpy.ndarray, numpy.ndarray) Prochain checkpoint et tours complétés de chaque voiture.
+        """
+        tick = self.clamp(tick)
+        checkpoints = np.zeros(len(self.names), dtype=np.int32)
+        laps = np.zeros(len(self.names), dtype=np.int32)
+        for i, (ticks, progress) in enumerate(zip(self.event_ticks, self.event_progress)):
+            k = np.searchsorted(ticks, tick, side="right")
+            if k:
+                checkpoints[i], laps[i] = progress[k - 1]
+        return checkpoints, laps
+
+    def status(self, tick):
+        """
+        Paramètres :
+            tick : int
+                Tick demandé.
+
+        Retourne :
+            list : Statut de chaque voiture : "en course", "sortie" (sortie de piste) ou "arrêtée" (éliminée
+                   ou immobilisée).
+        """
+        tick = self.clamp(tick)
+        return ["sortie" if 0 < crash <= tick else "arrêtée" if last < tick else "en course"
+                for crash, last in zip(self.collision_tick.tolist(), self.ticks.tolist())]
+
+
+def replay_path(directory, generation):
+    """
+    Retourne :
+        str : Fichier du replay d'une génération (ex. "replays/generation-0012.npz").
+    """
+    return os.path.join(directory, f"generation-{generation:04d}.npz")
+
+
+class ReplayReporter(BaseReporter):
+    def __init__(self, best, scenario, parameters, raycast_backend="step", collision_mode="mask", max_ticks=MAX_TICKS,
+                 dt=FIXED_DT, culling=None, seed=None, directory=REPLAY_DIR, every=1):
+        """
+        Reporter neat qui enregistre, après chaque évaluation, le replay des meilleurs génomes de la génération.
+
+        La simulation étant déterministe et chaque voiture indépendante des autres, les meilleurs génomes
+        sont simulés une seconde fois, seuls et avec un ReplayRecorder : leurs trajectoires sont celles de
+        la génération, quel que soit le mode d'évaluation (séquentiel, processus de travail, cache de fitness).
+
+        Paramètres :
+            best : int
+                Nombre de génomes enregistrés (les meilleures fitness).
+            scenario : Scenario
+                Scénario rejoué (circuit et position de départ).
+            parameters : CarParameters
+                Caractéristiques des voitures.
+            raycast_backend, collision_mode, max_ticks, dt, culling, seed :
+                Réglages de la simulation, identiques à ceux de l'évaluation (voir PopulationSimulation).
+            directory : str, optionnel
+                Dossier des replays.
+            every : int, optionnel
+                Enregistre une génération sur every.
+        """
+        self.best = best
+        self.scenario = scenario
+        self.parameters = parameters
+        self.raycast_backend = raycast_backend
+        self.collision_mode = collision_mode
+        self.max_ticks = max_ticks
+        self.dt = dt
+        self.culling = culling
+        self.seed = seed
+        self.directory = directory
+        self.every = every
+        self.generation = None
+
+    def start_generation(self, generation):
+        self.generation = generation
+
+    def post_evaluate(self, config, population, species, best_genome):
+        if self.generation % self.every:
+            return
+        genomes = sorted(population.items(),
+                         key=lambda item: item[1].fitness if item[1].fitness is not None else float("-inf"),
+                         reverse=True)[:self.best]
+        path = replay_path(self.directory, self.generation)
+        record_replay(path, genomes, config, self.scenario, self.parameters, raycast_backend=self.raycast_backend,
+                      collision_mode=self.collision_mode, max_ticks=self.max_ticks, dt=self.dt, culling=self.culling,
+                      seed=self.seed, generation=self.generation)
+        print(f"Replay des {len(genomes)} meilleurs génomes enregistré dans {path}")
+
+
+def record_replay(path, genomes, config, scenario, parameters, raycast_backend="step", collision_mode="mask",
+                  max_ticks=MAX_TICKS, dt=FIXED_DT, culling=None, seed=None, generation=None):
+    """
+    Simule des génomes avec un ReplayRecorder et écrit leur replay.
+
+    Paramètres :
+        path : str
+            Fichier .npz du replay.
+        genomes : list
+            Tuples (genome_id, genome).
+        config : neat.Config
+            Configuration NEAT.
+        scenario : Scenario
+            Scénario rejoué.
+        parameters : CarParameters
+            Caractéristiques des voitures.
+        raycast_backend, collision_mode, max_ticks, dt, culling, seed :
+            Voir PopulationSimulation.
+        generation : int, optionnel
+            Numéro de la génération, gardé dans les métadonnées.
+    """
+    nets = [neat.nn.FeedForwardNetwork.create(genome, config) for _, genome in genomes]
+    recorder = ReplayRecorder(len(nets), max_ticks)
+    simulation = PopulationSimulation(nets, scenario.game_map(), parameters, raycast_backend=raycast_backend,
+                                      collision_mode=collision_mode, max_ticks=max_ticks, dt=dt, culling=culling,
+                                      seed=seed, recorder=recorder)
+    simulation.run()
+    metadata = {"track": scenario.track, "pose": scenario.pose, "generation": generation, "dt": dt,
+                "image_path": parameters.image_path, "width": parameters.width, "height": parameters.height,
+                "raycast_backend": raycast_backend, "collision_mode": collision_mode}
+    recorder.save(path, [f"genome-{genome_id}" for genome_id, _ in genomes],
+                  [genome.fitness for _, genome in genomes], metadata)
@@ -0,0 +1,173 @@
+import numpy as np
+
+from python.track_registry import get_track, track_path, DEFAULT_TRACK
+
+AGGREGATES = ("mean", "min", "weighted")  # Agrégation de la fitness d'un génome sur plusieurs scénarios
+
+# Cartes des positions de départ déjà construites dans ce processus : {(chemin du JSON, position): carte}
+_start_maps = {}
+
+
+class StartPoseMap:
+    def __init__(self, game_map, pose):
+        """
+        Vue d'une carte depuis une autre position de départ : la position, l'orientation et l'ordre des
+        checkpoints changent (le premier checkpoint à franchir devient le premier de la liste, un tour
+        reste donc un tour complet), tout le reste (surface, masque, grille et champ de distance de
+        l'herbe) est celui de la carte partagée, sans copie.
+
+        Paramètres :
+            game_map : Map
+                Carte partagée du circuit.
+            pose : dict
+                Position de départ (clés 'position', 'angle' et 'checkpoint', voir Map.start_poses).
+        """
+        self.track = game_map
+        self.start_position = pose['position']
+        self.start_angle = pose.get('angle', -90)
+        first = pose.get('checkpoint', 0)
+        checkpoints = sorted(game_map.checkpoints, key=lambda x: x['order'])
+        checkpoints = checkpoints[first:] + checkpoints[:first]
+        self.checkpoints = [dict(checkpoint, order=order) for order, checkpoint in enumerate(checkpoints, start=1)]
+
+    def __getattr__(self, name):
+        # Attributs non redéfinis : ceux de la carte partagée
+        if name == "track":
+            raise AttributeError(name)
+        return getattr(self.track, name)
+
+
+def get_start_map(name=DEFAULT_TRACK, pose=0):
+    """
+    Renvoie la carte d'un circuit vue depuis l'une de ses positions de départ, construite une seule fois
+    par processus (les tableaux de l'herbe sont ceux de get_track, partagés entre toutes les positions).
+
+    Paramètres :
+        name : str, optionnel
+            Nom du circuit ou chemin vers son fichier JSON.
+        pose : int, optionnel
+            Indice de la position de départ dans Map.start_poses (0 : position de départ du JSON).
+
+    Retourne :
+        Map ou StartPoseMap : La carte partagée elle-même pour la position 0, sinon une vue de cette carte.
+
+    Lève :
+        IndexError : Si le circuit n'a pas de position de départ d'indice pose.
+    """
+    game_map = get_track(name)
+    if pose == 0:
+        return game_map
+    key = (track_path(name), pose)
+    if key not in _start_maps:
+        if not 0 <= pose < len(game_map.start_poses):
+            raise IndexError(f"Position de départ {pose} inconnue pour le circuit {name!r} "
+                             f"({len(game_map.start_poses)} positions)")
+        _start_maps[key] = StartPoseMap(game_map, game_map.start_poses[pose])
+    return _start_maps[key]
+
+
+class Scenario:
+    def __init__(self, track=DEFAULT_TRACK, pose=0, weight=1.0):
+        """
+        Scénario d'évaluation : un circuit, une position de départ et le poids de la fitness obtenue
+        (agrégation "weighted"). Un scénario ne contient que des noms : il peut être envoyé aux processus
+        de travail, qui chargent la carte eux-mêmes.
+
+        Paramètres :
+            track : str, optionnel
+                Nom du circuit ou chemin vers son fichier JSON.
+            pose : int, optionnel
+                Indice de la position de départ (voir Map.start_poses).
+            weight : float, optionnel
+                Poids du scénario.
+        """
+        self.track = track
+        self.pose = pose
+        self.weight = weight
+
+    def game_map(self):
+        """
+        Retourne :
+            Map ou StartPoseMap : Carte du scénario (voir get_start_map).
+        """
+        return get_start_map(self.track, self.pose)
+
+    def __repr__(self):
+        return f"Scenario({self.track!r}, pose={self.pose}, weight={self.weight})"
+
+    def __str__(self):
+        return f"{self.track}@{self.pose}"
+
+
+def parse_scenarios(spec):
+    """
+    Lit une liste de scénarios écrite "circuit[@position][*poids],..." (ex. "map,map@1,road-train*2").
+    "circuit@all" ajoute toutes les positions de départ du circuit.
+
+    Paramètres :
+        spec : str
+            Liste des scénarios séparés par des virgules.
+
+    Retourne :
+        list : Les scénarios (Scenario), dans l'ordre.
+    """
+    scenarios = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        weight = 1.0
+        if "*" in item:
+            item, weight = item.rsplit("*", 1)
+            weight = float(weight)
+        pose = "0"
+        if "@" in item:
+            item, pose = item.rsplit("@", 1)
+        if pose == "all":
+            poses = range(len(get_track(item).start_poses))
+        else:
+            poses = [int(pose)]
+        scenarios.extend(Scenario(item, p, weight) for p in poses)
+    return scenarios
+
+
+def aggregate_fitness(fitnesses, scenarios, method="mean"):
+    """
+    Combine la fitness de chaque génome sur plusieurs scénarios.
+
+    Paramètres :
+        fitnesses : list
+            Fitness de tous les génomes pour chaque scénario (un numpy.ndarray (N,) par scénario).
+        scenarios : list
+            Les scénarios correspondants (leurs poids servent à l'agrégation "weighted").
+        method : str, optionnel
+            "mean" (moyenne), "min" (pire scénario) ou "weighted" (moyenne pondérée par les poids).
+
+    Retourne :
+        numpy.ndarray : Fitness agrégée de chaque génome.
+    """
+    if method not in AGGREGATES:
+        raise ValueError(f"Agrégation inconnue : {method!r} (choix : {', '.join(AGGREGATES)})")
+    fitnesses = np.asarray(fitnesses, dtype=np.float64)
+    if len(fitnesses) == 1:
+        return fitnesses[0]
+    if method == "mean":
+        return fitnesses.mean(axis=0)
+    if method == "min":
+        return fitnesses.min(axis=0)
+    return np.average(fitnesses, axis=0, weights=[scenario.weight for scenario in scenarios])
+
+
+def format_scenario_fitness(fitnesses, scenarios):
+    """
+    Paramètres :
+        fitnesses : list
+            Fitness de tous les génomes pour chaque scénario.
+        scenarios : list
+            Les scénarios correspondants.
+
+    Retourne :
+        str : Meilleure et moyenne fitness de chaque scénario, sur une ligne.
+    """
+    return "Scénarios : " + ", ".join(f"{scenario} (meilleure {np.max(fitness):.1f}, moyenne {np.mean(fitness):.1f})"
+                                      for scenario, fitness in zip(scenarios, fitnesses))
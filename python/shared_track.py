@@ -0,0 +1,170 @@
+import json
+from multiprocessing import shared_memory
+
+import numpy as np
+import pygame
+
+from python.map import Map
+from python.track_registry import get_track, track_path, register_track
+
+SHARED_ARRAYS = ("grass_grid", "distance_field")  # Tableaux de la carte publiés en mémoire partagée
+ALIGNMENT = 64  # Alignement (en octets) de chaque tableau dans le bloc partagé
+
+# Blocs de mémoire partagée ouverts par ce processus de travail (gardés ouverts tant que les cartes servent)
+_attached = []
+
+
+class TrackHandle:
+    def __init__(self, path, block_name, layout, game_map):
+        """
+        Description d'un circuit publié en mémoire partagée, envoyée aux processus de travail : le nom du
+        bloc, l'emplacement de chaque tableau dans ce bloc et les petites données de la carte (checkpoints,
+        positions de départ). Elle ne contient aucun tableau : elle se transmet en quelques kilo-octets.
+
+        Paramètres :
+            path : str
+                Chemin absolu du fichier JSON du circuit (clé du registre des circuits).
+            block_name : str
+                Nom du bloc de mémoire partagée.
+            layout : dict
+                {nom du tableau: (décalage en octets, forme, type)}.
+            game_map : Map
+                Carte publiée.
+        """
+        self.path = path
+        self.block_name = block_name
+        self.layout = layout
+        self.map_file = game_map.map_file
+        self.road_hash = game_map.road_hash
+        self.checkpoints = game_map.checkpoints
+        self.start_position = game_map.start_position
+        self.start_angle = game_map.start_angle
+        self.start_poses = game_map.start_poses
+
+
+class SharedTracks:
+    def __init__(self, names):
+        """
+        Publie les tableaux dérivés de plusieurs circuits (grille de l'herbe, champ de distance) dans la
+        mémoire partagée, une seule fois pour tous les processus de travail : ceux-ci s'y attachent sans
+        copie (attach_track) au lieu de recharger chacun l'image, le masque et les tableaux de chaque
+        circuit. La mémoire de chaque processus reste alors à peu près la même quel que soit leur nombre.
+
+        Le processus qui publie possède les blocs : il doit appeler close() quand les processus de travail
+        sont arrêtés.
+
+        Paramètres :
+            names : list
+                Noms ou chemins des circuits (les doublons sont publiés une seule fois).
+
+        Lève :
+            OSError : Si la mémoire partagée n'est pas disponible.
+        """
+        self.blocks = []
+        self.handles = []
+        for path in dict.fromkeys(track_path(name) for name in names):
+            game_map = get_track(path)
+            layout = {}
+            size = 0
+            for name in SHARED_ARRAYS:
+                array = getattr(game_map, name)
+                layout[name] = (size, array.shape, array.dtype.str)
+                size += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+            block = shared_memory.SharedMemory(create=True, size=size)
+            self.blocks.append(block)
+            for name, (offset, shape, dtype) in layout.items():
+                np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)[...] = getattr(game_map, name)
+            self.handles.append(TrackHandle(path, block.name, layout, game_map))
+
+    def close(self):
+        """
+        Libère les blocs de mémoire partagée.
+        """
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+
+class SharedMap:
+    def __init__(self, handle, arrays):
+        """
+        Carte d'un circuit dont les tableaux sont ceux de la mémoire partagée (en lecture seule). Elle
+        offre les mêmes attributs que Map ; le masque de l'herbe (collisions "mask") et la surface de la
+        route (affichage) ne sont construits qu'à la première utilisation.
+
+        Paramètres :
+            handle : TrackHandle
+                Description du circuit publié.
+            arrays : dict
+                Tableaux attachés à la mémoire partagée, par nom.
+        """
+        self.map_file = handle.map_file
+        self.road_hash = handle.road_hash
+        self.checkpoints = handle.checkpoints
+        self.start_position = handle.start_position
+        self.start_angle = handle.start_angle
+        self.start_poses = handle.start_poses
+        self.grass_grid = arrays["grass_grid"]
+        self.distance_field = arrays["distance_field"]
+        self._grass_mask = None
+        self._road_surface = None
+
+    @property
+    def grass_mask(self):
+        """
+        Retourne :
+            pygame.mask.Mask : Masque de l'herbe, reconstruit depuis la grille (identique à Map.create_grass_mask).
+        """
+        if self._grass_mask is None:
+            # Surface 8 bits : 1 sur l'herbe, 0 (transparent) sur la route
+            surface = pygame.surfarray.make_surface(self.grass_grid.T.view(np.uint8))
+            surface.set_colorkey(0)
+            self._grass_mask = pygame.mask.from_surface(surface)
+        return self._grass_mask
+
+    @property
+    def road_surface(self):
+        """
+        Retourne :
+            pygame.Surface : Image de la route, chargée à la première utilisation.
+        """
+        if self._road_surface is None:
+            with open(self.map_file, 'r') as f:
+                road_image = Map.resolve_road_image(self.map_file, json.load(f).get('road_image'))
+            self._road_surface = pygame.image.load(road_image)
+        return self._road_surface
+
+    def draw(self, screen):
+        """
+        Dessine la surface de la route sur l'écran.
+
+        Paramètres :
+            screen : pygame.Surface
+                L'écran sur lequel la surface de la route doit être dessinée.
+        """
+        screen.blit(self.road_surface, (0, 0))
+
+
+def attach_track(handle):
+    """
+    Attache un processus de travail à un circuit publié par SharedTracks, sans copie, et l'inscrit dans le
+    registre des circuits : get_track (et donc les scénarios) renvoie ensuite cette carte.
+
+    Paramètres :
+        handle : TrackHandle
+            Description du circuit publié.
+
+    Retourne :
+        SharedMap : La carte du circuit.
+    """
+    block = shared_memory.SharedMemory(name=handle.block_name)
+    _attached.append(block)
+    arrays = {}
+    for name, (offset, shape, dtype) in handle.layout.items():
+        array = np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)
+        array.flags.writeable = False
+        arrays[name] = array
+    game_map = SharedMap(handle, arrays)
+    register_track(handle.path, game_map)
+    return game_map
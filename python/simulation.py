@@ -0,0 +1,554 @@
+import numpy as np
+
+from python.simulation_core import Simulation, NetworkController, FIXED_DT
+
+MAX_TICKS = 2000  # Durée maximale d'une génération (en ticks)
+
+# Termes de la fitness, identiques à ceux de la boucle d'origine de main_neat.eval_genomes
+CHECKPOINT_REWARD = 100  # Passage d'un checkpoint
+FIRST_CHECKPOINT_BONUS = 200  # Première voiture de la population à passer un checkpoint
+LAP_REWARD = 10000  # Tour complété
+TIME_DECAY = 0.001  # Décroissance à chaque tick
+STEP_PENALTY = 1  # Pénalité à chaque tick
+SLOW_SPEED = 80  # En dessous de cette vitesse...
+SLOW_PENALTY = 3  # ...pénalité supplémentaire à chaque tick
+COLLISION_PENALTY = 4000  # Sortie de piste
+STALL_SPEED = 1  # Voiture considérée comme bloquée si |vitesse| <= STALL_SPEED...
+STALL_FITNESS = 0.1  # ...et fitness < STALL_FITNESS
+
+
+class CullingRules:
+    def __init__(self, progress_ticks=None, slow_speed=None, slow_ticks=None, penalty=0):
+        """
+        Règles d'élimination anticipée des voitures pendant une génération (toutes désactivées par défaut).
+
+        Une voiture éliminée devient inactive, comme après une collision : elle n'est plus simulée et sa
+        fitness est celle du tick d'élimination, diminuée de penalty.
+
+        Paramètres :
+            progress_ticks : int, optionnel
+                Élimine une voiture qui n'a franchi aucun checkpoint depuis ce nombre de ticks.
+            slow_speed : float, optionnel
+                Élimine une voiture dont la vitesse reste inférieure à slow_speed...
+            slow_ticks : int, optionnel
+                ...pendant ce nombre de ticks consécutifs.
+            penalty : float, optionnel
+                Pénalité de fitness appliquée à l'élimination.
+        """
+        self.progress_ticks = progress_ticks
+        self.slow_speed = slow_speed
+        self.slow_ticks = slow_ticks
+        self.penalty = penalty
+
+    def enabled(self):
+        """
+        Retourne :
+            bool : True si au moins une règle est active.
+        """
+        return self.progress_ticks is not None or self.slow_rule()
+
+    def slow_rule(self):
+        """
+        Retourne :
+            bool : True si la règle de vitesse est active.
+        """
+        return self.slow_speed is not None and self.slow_ticks is not None
+
+
+class CarTrace:
+    def __init__(self, fitness, stalled, collided, frozen, frozen_delta, crossings, cull_reason=None, cull_tick=0,
+                 cull_penalty=0):
+        """
+        Historique d'une voiture, indépendant des autres voitures de la population.
+
+        La fitness enregistrée exclut le bonus du premier passage d'un checkpoint et l'arrêt anticipé
+        de la génération, qui dépendent de toute la population : resolve_fitness les applique ensuite.
+
+        Paramètres :
+            fitness : numpy.ndarray (T,)
+                Fitness cumulée à la fin de chaque tick simulé.
+            stalled : numpy.ndarray (T,) de bool
+                |vitesse| <= STALL_SPEED à la fin de chaque tick.
+            collided : bool
+                True si la voiture est sortie de piste au dernier tick.
+            frozen : bool
+                True si la voiture a atteint un état figé au dernier tick : sa fitness évolue ensuite
+                de frozen_delta par tick, sans autre événement.
+            frozen_delta : float
+                Variation de fitness par tick d'une voiture figée.
+            crossings : dict
+                {indice de checkpoint: tick du premier passage}.
+            cull_reason : str, optionnel
+                Règle d'élimination ("progress" ou "slow"), ou None si la voiture n'est pas éliminée.
+            cull_tick : int, optionnel
+                Tick de l'élimination. Pour une voiture figée, il peut être postérieur au dernier tick simulé.
+            cull_penalty : float, optionnel
+                Pénalité appliquée au tick de l'élimination.
+        """
+        self.fitness = fitness
+        self.stalled = stalled
+        self.collided = collided
+        self.frozen = frozen
+        self.frozen_delta = frozen_delta
+        self.crossings = crossings
+        self.cull_reason = cull_reason
+        self.cull_tick = cull_tick
+        self.cull_penalty = cull_penalty
+
+    def ticks(self):
+        """
+        Retourne :
+            int : Nombre de ticks simulés.
+        """
+        return len(self.fitness)
+
+    def complete(self, max_ticks=MAX_TICKS):
+        """
+        Paramètres :
+            max_ticks : int, optionnel
+                Durée maximale de la génération.
+
+        Retourne :
+            bool : True si l'historique décrit toute la génération (voiture sortie de piste, éliminée, figée
+                   ou simulée jusqu'à max_ticks), False s'il a été interrompu par l'arrêt anticipé.
+        """
+        return self.collided or self.frozen or self.cull_reason is not None or self.ticks() >= max_ticks
+
+
+class PopulationSimulation:
+    def __init__(self, nets, game_map, parameters, raycast_backend="step", collision_mode="mask",
+                 max_ticks=MAX_TICKS, dt=FIXED_DT, culling=None, seed=None, profiler=None, controller=None,
+                 recorder=None):
+        """
+        Simule une génération : une population de voitures pilotées par des réseaux de neurones sur le
+        cœur de simulation (Simulation), avec le calcul de la fitness de l'entraînement.
+
+        Chaque voiture évolue indépendamment des autres : la simulation peut donc être découpée en
+        plusieurs morceaux (processus) dont les historiques sont réunis par resolve_fitness.
+
+        Paramètres :
+            nets : list
+                Réseaux de neurones (un par voiture), avec une méthode activate(inputs).
+            game_map : Map
+                Carte du circuit.
+            parameters : CarParameters
+                Caractéristiques des voitures.
+            raycast_backend : str, optionnel
+                Algorithme de lancer de rayons ("step", "sdf" ou "lut").
+            collision_mode : str, optionnel
+                Détection des collisions ("mask" ou "obb").
+            max_ticks : int, optionnel
+                Durée maximale de la simulation.
+            dt : float, optionnel
+                Pas de temps simulé.
+            culling : CullingRules, optionnel
+                Règles d'élimination anticipée (aucune par défaut).
+            seed : int, optionnel
+                Graine du cœur de simulation.
+            profiler : StageProfiler, optionnel
+                Mesure le temps passé dans chaque étape et le nombre de voitures à chaque tick.
+            controller : NetworkController, optionnel
+                Contrôleur déjà construit pour ces réseaux, à réutiliser (par exemple d'un scénario
+                d'évaluation à l'autre) ; par défaut, NetworkController(nets).
+            recorder : ReplayRecorder, optionnel
+                Enregistre chaque tick de la simulation (voir python.replay).
+        """
+        count = len(nets)
+        self.nets = nets
+        self.game_map = game_map
+        self.parameters = parameters
+        self.max_ticks = max_ticks
+        self.culling = culling if culling is not None else CullingRules()
+
+        # Cœur de simulation : physique, capteurs, réseaux, checkpoints et collisions
+        if controller is None:
+            controller = NetworkController(nets)
+        self.core = Simulation(game_map, [parameters] * count, controller, raycast_backend=raycast_backend,
+                               collision_mode=collision_mode, dt=dt, seed=seed, profiler=profiler, recorder=recorder)
+        self.profiler = self.core.profiler
+        self.batch = self.core.batch
+        self.cars = self.core.cars
+        self.lap_counter = self.core.lap_counter
+
+        # Historiques de chaque voiture
+        self.fitness = np.zeros(count)  # Fitness courante, hors bonus du premier passage
+        self.fitness_history = np.zeros((count, max_ticks))
+        self.stalled_history = np.zeros((count, max_ticks), dtype=bool)
+        self.ticks = np.zeros(count, dtype=np.intp)  # Nombre de ticks simulés par voiture
+        self.collided = np.zeros(count, dtype=bool)
+        self.frozen = np.zeros(count, dtype=bool)
+        self.frozen_delta = np.zeros(count)
+        self.crossings = [{} for _ in range(count)]
+
+        # Élimination anticipée
+        self.last_progress = np.zeros(count, dtype=np.intp)  # Tick du dernier checkpoint franchi
+        self.slow_count = np.zeros(count, dtype=np.intp)  # Ticks consécutifs sous culling.slow_speed
+        self.cull_reason = [None] * count
+        self.cull_tick = np.zeros(count, dtype=np.intp)  # 0 : pas d'élimination prévue
+
+        # Voitures actives et voitures simulées (actives et non figées), tenues à jour à chaque tick
+        self.active_cars = np.arange(count)
+        self.running_cars = np.arange(count)
+
+        # Bonus du premier passage, attribué en direct quand la simulation couvre toute la population
+        self.bonus = np.zeros(count)
+        self.checkpoint_claimed = [False] * len(game_map.checkpoints)
+
+    @property
+    def tick(self):
+        """
+        Retourne :
+            int : Nombre de ticks simulés depuis le début de la génération.
+        """
+        return self.core.tick
+
+    def running(self):
+        """
+        Retourne :
+            numpy.ndarray : Indices des voitures encore simulées (actives et non figées).
+        """
+        return self.running_cars
+
+    def finished(self):
+        """
+        Retourne :
+            bool : True si la durée maximale est atteinte ou si plus aucune voiture n'évolue.
+        """
+        return self.tick >= self.max_ticks or len(self.running_cars) == 0
+
+    def step(self, screen=None, show_rays=False):
+        """
+        Avance la simulation d'un tick pour toutes les voitures encore simulées.
+
+        Paramètres :
+            screen : pygame.Surface, optionnel
+                Si fourni, les voitures actives (et leurs rayons) y sont dessinées avant d'avancer.
+            show_rays : bool, optionnel
+                Dessine les rayons des voitures.
+
+        Retourne :
+            list : Zones de l'écran dessinées (vide sans screen).
+        """
+        batch = self.batch
+        running = self.running_cars
+
+        rects = []
+        if screen is not None:
+            with self.profiler.stage("draw"):
+                rects = self.core.draw(screen, self.idle_cars())
+
+        # État avant le tick, pour détecter les voitures figées
+        state_before = (batch.position[running].copy(), batch.angle[running].copy(),
+                        batch.speed[running].copy(), batch.lateral_velocity[running].copy())
+        fitness_before = self.fitness[running].copy()
+
+        # Capteurs, réseaux, physique, checkpoints et collisions de toutes les voitures simulées
+        result = self.core.step(running, screen, show_rays)
+        rewarded, lap_done, collisions = result.rewarded, result.lap_done, result.collisions
+
+        # Récompenses pour passer un checkpoint puis pour terminer un tour (comme dans la boucle d'origine,
+        # le premier checkpoint d'un nouveau tour n'est pas récompensé)
+        self.fitness[running] += np.where(rewarded, CHECKPOINT_REWARD, 0)
+        self.fitness[running] += np.where(lap_done, LAP_REWARD, 0)
+
+        # La première voiture à passer un checkpoint reçoit un bonus (ordre des génomes en cas d'égalité)
+        for k in np.flatnonzero(rewarded).tolist():
+            i = int(running[k])
+            cp = int(result.previous_checkpoints[k])  # numéro du checkpoint atteint
+            self.crossings[i].setdefault(cp, self.tick)
+            if not self.checkpoint_claimed[cp]:
+                self.bonus[i] += FIRST_CHECKPOINT_BONUS
+                self.checkpoint_claimed[cp] = True
+
+        events = (result.crossed | lap_done | (result.checkpoints != result.previous_checkpoints)
+                  | (result.checkpoints >= len(self.lap_counter.checkpoints)))
+
+        # Décroissance de la fitness et pénalités, comme dans la boucle d'origine (la récompense de
+        # distance y était mesurée après la mise à jour de la position précédente : elle est toujours nulle)
+        self.fitness[running] -= TIME_DECAY
+        self.fitness[running] -= STEP_PENALTY
+        self.fitness[running] -= np.where(batch.speed[running] < SLOW_SPEED, SLOW_PENALTY, 0)
+
+        # Sortie de piste
+        collided = running[collisions]
+        self.fitness[collided] -= COLLISION_PENALTY
+        batch.active[collided] = False
+        self.collided[collided] = True
+
+        # Élimination anticipée des voitures qui ne progressent plus
+        culled = self.apply_culling(running, result.crossed | lap_done, collisions)
+
+        # Une voiture dont l'état n'a pas changé pendant ce tick, sans événement, ne changera plus :
+        # ses entrées, donc les sorties de son réseau, resteront identiques
+        unchanged = (np.all(batch.position[running] == state_before[0], axis=1)
+                     & (batch.angle[running] == state_before[1])
+                     & (batch.speed[running] == state_before[2])
+                     & (batch.lateral_velocity[running] == state_before[3])
+                     & ~events & ~collisions & ~culled)
+        frozen = running[unchanged]
+        self.frozen[frozen] = True
+        self.frozen_delta[frozen] = self.fitness[frozen] - fitness_before[unchanged]
+        self.schedule_culling(frozen)
+
+        self.fitness_history[running, self.tick - 1] = self.fitness[running]
+        self.stalled_history[running, self.tick - 1] = np.abs(batch.speed[running]) <= STALL_SPEED
+        self.ticks[running] = self.tick
+
+        # Mise à jour incrémentale des voitures actives et simulées
+        self.running_cars = running[~(collisions | culled | unchanged)]
+        if np.any(collisions | culled):
+            self.active_cars = self.active_cars[batch.active[self.active_cars]]
+
+        # Les voitures figées ne sont plus simulées : leur fitness évolue linéairement (comme dans resolve_fitness)
+        idle = self.idle_cars()
+        last = self.ticks[idle]
+        self.fitness[idle] = self.fitness_history[idle, last - 1] + self.frozen_delta[idle] * (self.tick - last)
+
+        # Élimination prévue d'une voiture figée
+        due = idle[self.cull_tick[idle] == self.tick]
+        if len(due):
+            self.fitness[due] -= self.culling.penalty
+            batch.active[due] = False
+            self.active_cars = self.active_cars[batch.active[self.active_cars]]
+
+        self.profiler.count_tick(len(running), len(self.active_cars))
+        return rects + result.rects
+
+    def idle_cars(self):
+        """
+        Retourne :
+            numpy.ndarray : Indices des voitures actives mais figées (plus simulées).
+        """
+        return np.setdiff1d(self.active_cars, self.running_cars, assume_unique=True)
+
+    def apply_culling(self, running, progressed, collisions):
+        """
+        Applique les règles d'élimination aux voitures simulées pendant ce tick.
+
+        Paramètres :
+            running : numpy.ndarray
+                Indices des voitures simulées.
+            progressed : numpy.ndarray de bool
+                Voitures qui ont franchi un checkpoint pendant ce tick.
+            collisions : numpy.ndarray de bool
+                Voitures sorties de piste pendant ce tick (déjà inactives).
+
+        Retourne :
+            numpy.ndarray de bool : Voitures éliminées pendant ce tick.
+        """
+        rules = self.culling
+        if not rules.enabled():
+            return np.zeros(len(running), dtype=bool)
+
+        self.last_progress[running[progressed]] = self.tick
+        no_progress = np.zeros(len(running), dtype=bool)
+        if rules.progress_ticks is not None:
+            no_progress = self.tick - self.last_progress[running] >= rules.progress_ticks
+        too_slow = np.zeros(len(running), dtype=bool)
+        if rules.slow_rule():
+            self.slow_count[running] = np.where(self.batch.speed[running] < rules.slow_speed,
+                                                self.slow_count[running] + 1, 0)
+            too_slow = self.slow_count[running] >= rules.slow_ticks
+
+        culled = (no_progress | too_slow) & ~collisions
+        for k in np.flatnonzero(culled).tolist():
+            self.cull_reason[running[k]] = "progress" if no_progress[k] else "slow"
+        indices = running[culled]
+        self.fitness[indices] -= rules.penalty
+        self.batch.active[indices] = False
+        self.cull_tick[indices] = self.tick
+        return culled
+
+    def schedule_culling(self, frozen):
+        """
+        Calcule le tick où des voitures qui viennent de se figer seront éliminées : leur état ne changeant
+        plus, les règles d'élimination donnent ce tick à l'avance.
+
+        Paramètres :
+            frozen : numpy.ndarray
+                Indices des voitures figées pendant ce tick.
+        """
+        rules = self.culling
+        if not rules.enabled() or len(frozen) == 0:
+            return
+
+        never = self.max_ticks + 1
+        progress_tick = np.full(len(frozen), never)
+        if rules.progress_ticks is not None:
+            progress_tick = self.last_progress[frozen] + rules.progress_ticks
+        slow_tick = np.full(len(frozen), never)
+        if rules.slow_rule():
+            slow = self.batch.speed[frozen] < rules.slow_speed
+            slow_tick = np.where(slow, self.tick + rules.slow_ticks - self.slow_count[frozen], never)
+
+        cull_tick = np.minimum(progress_tick, slow_tick)
+        for k, i in enumerate(frozen.tolist()):
+            if cull_tick[k] <= self.max_ticks:
+                self.cull_tick[i] = cull_tick[k]
+                self.cull_reason[i] = "progress" if progress_tick[k] <= slow_tick[k] else "slow"
+
+    def all_stalled(self):
+        """
+        Condition d'arrêt anticipé de la boucle d'origine : toutes les voitures sont inactives ou
+        bloquées avec une fitness faible. N'a de sens que si la simulation couvre toute la population
+        (le bonus du premier passage est alors attribué en direct).
+
+        Retourne :
+            bool : True si la génération peut s'arrêter.
+        """
+        # Seules les voitures encore actives sont examinées (liste tenue à jour à chaque tick)
+        active = self.active_cars
+        if len(active) == 0:
+            return True
+        stalled = np.abs(self.batch.speed[active]) <= STALL_SPEED
+        return bool(np.all(stalled & (self.fitness[active] + self.bonus[active] < STALL_FITNESS)))
+
+    def run(self, stop_when_stalled=False):
+        """
+        Simule jusqu'à la fin.
+
+        Paramètres :
+            stop_when_stalled : bool, optionnel
+                Applique l'arrêt anticipé en direct (uniquement si la simulation couvre toute la population).
+        """
+        while not self.finished():
+            self.step()
+            if stop_when_stalled and self.all_stalled():
+                break
+
+    def traces(self):
+        """
+        Retourne :
+            list : Un CarTrace par voiture.
+        """
+        return [CarTrace(self.fitness_history[i, :self.ticks[i]].copy(), self.stalled_history[i, :self.ticks[i]].copy(),
+                         bool(self.collided[i]), bool(self.frozen[i]), float(self.frozen_delta[i]), dict(self.crossings[i]),
+                         self.cull_reason[i], int(self.cull_tick[i]), self.culling.penalty)
+                for i in range(len(self.nets))]
+
+
+def resolve_generation(traces, max_ticks=MAX_TICKS):
+    """
+    Calcule la fitness finale de chaque voiture à partir des historiques indépendants de toute la population.
+
+    Les deux règles qui couplent les voitures sont appliquées de façon déterministe, quel que soit le
+    découpage de la population entre processus, et donnent le même résultat que la boucle d'origine :
+    - le bonus du premier passage d'un checkpoint revient à la voiture qui l'a passé au plus petit tick,
+      les égalités étant départagées par l'ordre des génomes (ordre de parcours de la boucle d'origine) ;
+    - la génération s'arrête au premier tick où toutes les voitures sont inactives ou bloquées avec une
+      fitness (bonus compris) inférieure à STALL_FITNESS ; la fitness retenue est celle de ce tick.
+
+    Paramètres :
+        traces : list
+            Un CarTrace par génome, dans l'ordre de la population.
+        max_ticks : int, optionnel
+            Durée maximale de la génération.
+
+    Retourne :
+        tuple : (fitness finale de chaque voiture (numpy.ndarray), nombre de ticks de la génération).
+    """
+    count = len(traces)
+    if count == 0:
+        return np.zeros(0), 0
+
+    fitness = np.empty((count, max_ticks))
+    stalled = np.empty((count, max_ticks), dtype=bool)
+    inactive = np.zeros((count, max_ticks), dtype=bool)
+    ticks = np.arange(1, max_ticks + 1)
+
+    for i, trace in enumerate(traces):
+        n = trace.ticks()
+        fitness[i, :n] = trace.fitness
+        stalled[i, :n] = trace.stalled
+        if n == 0:
+            fitness[i, :] = 0
+            stalled[i, :] = True
+            continue
+        if trace.frozen:
+            # Une voiture figée garde son état et perd frozen_delta par tick, jusqu'à son élimination éventuelle
+            fitness[i, n:] = trace.fitness[-1] + trace.frozen_delta * (ticks[n:] - n)
+            if trace.cull_reason is not None:
+                end = trace.cull_tick
+                fitness[i, end - 1:] = fitness[i, end - 1] - trace.cull_penalty
+                inactive[i, end - 1:] = True
+        else:
+            fitness[i, n:] = trace.fitness[-1]
+            if trace.collided or trace.cull_reason is not None:
+                inactive[i, n - 1:] = True
+        stalled[i, n:] = trace.stalled[-1]
+
+    # Bonus du premier passage : plus petit tick, puis ordre des génomes
+    winners = {}
+    for i, trace in enumerate(traces):
+        for cp, tick in trace.crossings.items():
+            if cp not in winners or tick < winners[cp][0]:
+                winners[cp] = (tick, i)
+    for tick, i in winners.values():
+        fitness[i, tick - 1:] += FIRST_CHECKPOINT_BONUS
+
+    # Premier tick où toute la population est inactive ou bloquée
+    stopped = np.all(inactive | (stalled & (fitness < STALL_FITNESS)), axis=0)
+    last_tick = int(np.argmax(stopped)) if stopped.any() else max_ticks - 1
+
+    return fitness[:, last_tick], last_tick + 1
+
+
+def resolve_fitness(traces, max_ticks=MAX_TICKS):
+    """
+    Fitness finale de chaque voiture (voir resolve_generation).
+
+    Paramètres :
+        traces : list
+            Un CarTrace par génome, dans l'ordre de la population.
+        max_ticks : int, optionnel
+            Durée maximale de la génération.
+
+    Retourne :
+        numpy.ndarray : Fitness finale de chaque voiture.
+    """
+    return resolve_generation(traces, max_ticks)[0]
+
+
+def culling_report(traces, generation_ticks):
+    """
+    Mesure le travail de simulation économisé par l'élimination anticipée pendant une génération.
+
+    Le travail économisé est compté en ticks-voiture : une voiture éliminée au tick t d'une génération
+    de T ticks économise T - t ticks de lancer de rayons, de réseau et de collision.
+
+    Paramètres :
+        traces : list
+            Un CarTrace par génome.
+        generation_ticks : int
+            Nombre de ticks de la génération (voir resolve_generation).
+
+    Retourne :
+        dict : Nombre de voitures éliminées (au total et par règle), ticks-voiture simulés et économisés,
+               et part du travail économisé.
+    """
+    culled = [trace for trace in traces if trace.cull_reason is not None and trace.cull_tick <= generation_ticks]
+    simulated = sum(min(trace.ticks(), generation_ticks) for trace in traces)
+    saved = sum(generation_ticks - trace.cull_tick for trace in culled)
+    return {
+        "cars": len(traces),
+        "culled": len(culled),
+        "culled_progress": sum(trace.cull_reason == "progress" for trace in culled),
+        "culled_slow": sum(trace.cull_reason == "slow" for trace in culled),
+        "simulated_ticks": simulated,
+        "saved_ticks": saved,
+        "saved_rate": saved / (simulated + saved) if simulated + saved else 0.0,
+    }
+
+
+def format_culling_report(report):
+    """
+    Paramètres :
+        report : dict
+            Rapport renvoyé par culling_report.
+
+    Retourne :
+        str : Résumé du rapport sur une ligne.
+    """
+    return (f"Élimination anticipée : {report['culled']}/{report['cars']} voitures "
+            f"({report['culled_progress']} sans progression, {report['culled_slow']} trop lentes), "
+            f"{report['saved_ticks']} ticks-voiture économisés ({report['saved_rate']:.1%})")
@@ -0,0 +1,357 @@
+import hashlib
+
+import numpy as np
+
+from python.car_batch import CarBatch
+from python.collision import check_collisions, obb_collisions
+from python.lap_counter import BatchLapCounter
+from python.network_batch import NetworkBatch
+from python.profiling import StageProfiler
+from python.raycast import Raycast, MAX_RAY_DISTANCE
+
+FIXED_DT = 1 / 60  # Pas de temps simulé (en secondes)
+
+
+class CarParameters:
+    def __init__(self, width=13, height=23, max_speed=2000, min_speed=0, acceleration=80, turn_speed=150,
+                 raycast_angles=(-67.5, -45, -22.5, 0, 22.5, 45, 67.5), image_path="Cars/Blue_F1.png"):
+        """
+        Regroupe les caractéristiques d'une voiture (ou de toutes les voitures d'une population).
+
+        Paramètres :
+            width, height : int
+                Dimensions de la voiture.
+            max_speed, min_speed, acceleration, turn_speed : float
+                Paramètres de conduite (voir Car).
+            raycast_angles : list
+                Angles des rayons en degrés.
+            image_path : str
+                Image de la voiture (sprite et masque de collision).
+        """
+        self.width = width
+        self.height = height
+        self.max_speed = max_speed
+        self.min_speed = min_speed
+        self.acceleration = acceleration
+        self.turn_speed = turn_speed
+        self.raycast_angles = list(raycast_angles)
+        self.image_path = image_path
+
+
+class NetworkController:
+    def __init__(self, nets):
+        """
+        Pilote chaque voiture avec son réseau de neurones : output[0] > 0.5 accélère (sinon freine),
+        output[1] > 0.5 tourne à droite (sinon à gauche).
+
+        Les réseaux neat sont compilés en un seul programme NumPy (NetworkBatch) ; à défaut, chaque
+        réseau est activé séparément. Les sorties brutes du dernier appel restent dans self.outputs
+        (pour l'enregistrement des replays).
+
+        Paramètres :
+            nets : list
+                Réseaux de neurones (un par voiture), avec une méthode activate(inputs).
+        """
+        self.nets = nets
+        self.outputs = None
+        try:
+            self.network_batch = NetworkBatch(nets)
+        except ValueError:
+            self.network_batch = None
+
+    def commands(self, simulation, inputs, indices):
+        """
+        Paramètres :
+            simulation : Simulation
+                Simulation pilotée.
+            inputs : numpy.ndarray (N, nombre d'entrées)
+                Entrées normalisées des voitures (voir Simulation.sense).
+            indices : numpy.ndarray (N,)
+                Voitures pilotées.
+
+        Retourne :
+            tuple : (accélération, direction), deux numpy.ndarray (N,) de -1, 0 ou 1 (voir CarBatch.apply_commands).
+        """
+        if self.network_batch is not None:
+            outputs = self.network_batch.activate(inputs, indices)
+        else:
+            outputs = np.array([self.nets[i].activate(inputs[k, :simulation.input_sizes[i]].tolist())
+                                for k, i in enumerate(indices.tolist())]).reshape(-1, 2)
+        self.outputs = outputs
+        return np.where(outputs[:, 0] > 0.5, 1, -1), np.where(outputs[:, 1] > 0.5, -1, 1)
+
+
+class Simulation:
+    def __init__(self, game_map, parameters, controller, raycast_backend="step", collision_mode="mask", dt=FIXED_DT,
+                 seed=None, start_noise=0.0, profiler=None, recorder=None):
+        """
+        Cœur de simulation déterministe : fait avancer des voitures sur un circuit par pas de temps fixes,
+        sans fenêtre ni horloge. Pour une même graine, les trajectoires sont identiques au bit près.
+
+        Chaque tick : capteurs (rayons) des voitures demandées, commandes du contrôleur, physique,
+        passages de checkpoints et collisions, le tout vectorisé sur l'ensemble des voitures. Ce que
+        les collisions et les tours entraînent (élimination, fitness, fin de course) est laissé aux
+        scripts qui utilisent le cœur (entraînement, course, conduite manuelle).
+
+        Paramètres :
+            game_map : Map
+                Carte du circuit.
+            parameters : list
+                Un CarParameters par voiture.
+            controller : objet
+                Contrôleur avec une méthode commands(simulation, inputs, indices) (voir NetworkController).
+            raycast_backend : str, optionnel
+                Algorithme de lancer de rayons ("step", "sdf" ou "lut").
+            collision_mode : str, optionnel
+                Détection des collisions ("mask" ou "obb").
+            dt : float, optionnel
+                Pas de temps simulé.
+            seed : int, optionnel
+                Graine du générateur aléatoire de la simulation (bruit sur les positions de départ).
+            start_noise : float, optionnel
+                Écart type (en pixels) du bruit ajouté aux positions de départ. 0 : départ exact.
+            profiler : StageProfiler, optionnel
+                Mesure le temps passé dans chaque étape d'un tick (aucune mesure par défaut).
+            recorder : ReplayRecorder, optionnel
+                Enregistre la pose de départ puis chaque tick simulé (voir python.replay).
+        """
+        count = len(parameters)
+        self.game_map = game_map
+        self.parameters = parameters
+        self.controller = controller
+        self.collision_mode = collision_mode
+        self.dt = dt
+        self.seed = seed
+        self.start_noise = start_noise
+        self.rng = np.random.default_rng(seed)
+        self.profiler = profiler if profiler is not None else StageProfiler(enabled=False)
+        self.tick = 0
+
+        # État physique de toutes les voitures et vues Car pour l'affichage et les collisions
+        self.batch = CarBatch(count, game_map.start_position,
+                              max_speed=[p.max_speed for p in parameters],
+                              acceleration=[p.acceleration for p in parameters],
+                              turn_speed=[p.turn_speed for p in parameters],
+                              min_speed=[p.min_speed for p in parameters])
+        self.cars = [self.batch.view(i, p.image_path, width=p.width, height=p.height) for i, p in enumerate(parameters)]
+        self.lap_counter = BatchLapCounter(game_map.checkpoints, count)
+        self.previous_positions = np.empty((count, 2))
+        self.reset_cars(np.arange(count))
+
+        # Un Raycast par jeu d'angles ; les entrées des voitures qui ont moins de rayons sont complétées par des 0
+        self.sensor_groups = {}
+        for i, p in enumerate(parameters):
+            self.sensor_groups.setdefault(tuple(p.raycast_angles), []).append(i)
+        self.sensors = [(Raycast(list(angles), backend=raycast_backend), np.array(cars, dtype=np.intp))
+                        for angles, cars in self.sensor_groups.items()]
+        self.input_sizes = np.array([len(p.raycast_angles) + 2 for p in parameters], dtype=np.intp)
+        self.input_width = int(self.input_sizes.max()) if count else 0
+        self.endpoints = {}  # Extrémités des rayons du dernier appel à sense, par voiture
+
+        # Voitures groupées par dimensions : en mode "obb", chaque groupe est testé en un seul appel
+        size_groups = {}
+        for i, p in enumerate(parameters):
+            size_groups.setdefault((p.width, p.height), []).append(i)
+        self.size_groups = [(width, height, np.array(cars, dtype=np.intp))
+                            for (width, height), cars in size_groups.items()]
+
+        self.recorder = recorder
+        if recorder is not None:
+            recorder.start(self)
+
+    def reset_cars(self, indices):
+        """
+        Replace des voitures au départ (avec le bruit de départ éventuel).
+
+        Paramètres :
+            indices : array-like
+                Voitures à replacer.
+        """
+        indices = np.asarray(indices, dtype=np.intp)
+        start = np.broadcast_to(np.asarray(self.game_map.start_position, dtype=np.float64), (len(indices), 2))
+        if self.start_noise:
+            start = start + self.rng.normal(0.0, self.start_noise, (len(indices), 2))
+        self.batch.reset(start, indices, self.game_map.start_angle)
+        self.previous_positions[indices] = self.batch.position[indices]
+
+    def sense(self, indices, keep_endpoints=False):
+        """
+        Lance les rayons de plusieurs voitures et normalise les entrées de leurs contrôleurs.
+
+        Paramètres :
+            indices : numpy.ndarray (N,)
+                Voitures concernées.
+            keep_endpoints : bool, optionnel
+                Conserve les extrémités des rayons dans self.endpoints (pour l'affichage).
+
+        Retourne :
+            numpy.ndarray (N, input_width) : Distances / MAX_RAY_DISTANCE, vitesse / vitesse maximale et
+            angle / 360 de chaque voiture, complétés par des 0.
+        """
+        batch = self.batch
+        inputs = np.zeros((len(indices), self.input_width))
+        self.endpoints = {}
+        for raycast, group in self.sensors:
+            rows = np.flatnonzero(np.isin(indices, group)) if len(self.sensors) > 1 else np.arange(len(indices))
+            cars = indices[rows]
+            distances, endpoints = raycast.cast_rays_batch(batch.position[cars], batch.angle[cars], self.game_map)
+            rays = distances.shape[1]
+            inputs[rows, :rays] = distances / MAX_RAY_DISTANCE
+            inputs[rows, rays] = batch.speed[cars] / batch.max_speed[cars]
+            inputs[rows, rays + 1] = batch.angle[cars] / 360
+            if keep_endpoints:
+                self.endpoints.update(zip(cars.tolist(), endpoints))
+        return inputs
+
+    def draw(self, screen, indices, show_rays=False):
+        """
+        Dessine des voitures (et les rayons du dernier appel à sense).
+
+        Paramètres :
+            screen : pygame.Surface
+                Surface de dessin.
+            indices : array-like
+                Voitures à dessiner.
+            show_rays : bool, optionnel
+                Dessine les rayons des voitures.
+
+        Retourne :
+            list : Zones de l'écran modifiées (pygame.Rect), pour un affichage par zones (DirtyRectRenderer).
+        """
+        rects = []
+        for i in np.asarray(indices).tolist():
+            rects.append(self.cars[i].draw(screen))
+            if show_rays and i in self.endpoints:
+                rects.extend(self.sensors[0][0].draw_rays(screen, self.cars[i].position, self.endpoints[i]))
+        return rects
+
+    def step(self, indices=None, screen=None, show_rays=False):
+        """
+        Avance d'un tick les voitures demandées.
+
+        Paramètres :
+            indices : numpy.ndarray, optionnel
+                Voitures à faire avancer (par défaut, les voitures actives).
+            screen : pygame.Surface, optionnel
+                Si fourni, les voitures (et leurs rayons) y sont dessinées avant d'avancer.
+            show_rays : bool, optionnel
+                Dessine les rayons des voitures.
+
+        Retourne :
+            StepResult : Passages de checkpoints, tours et collisions de ce tick.
+        """
+        batch = self.batch
+        if indices is None:
+            indices = np.flatnonzero(batch.active)
+        indices = np.asarray(indices, dtype=np.intp)
+        profiler = self.profiler
+        self.tick += 1
+
+        # Capteurs, puis commandes du contrôleur, pour toutes les voitures à la fois
+        with profiler.stage("cast_rays"):
+            inputs = self.sense(indices, keep_endpoints=screen is not None and show_rays)
+        rects = []
+        if screen is not None:
+            with profiler.stage("draw"):
+                rects = self.draw(screen, indices, show_rays)
+        with profiler.stage("activate"):
+            throttle, steer = self.controller.commands(self, inputs, indices)
+
+        # Physique
+        with profiler.stage("physics"):
+            batch.apply_commands(throttle, steer, self.dt, indices)
+            batch.update(self.dt, indices)
+
+        # Passages de checkpoints de toutes les voitures en une seule opération
+        lap_counter = self.lap_counter
+        with profiler.stage("lap_counter"):
+            previous_checkpoints = lap_counter.current_checkpoint[indices].copy()
+            previous_laps = lap_counter.laps_completed[indices].copy()
+            crossed = lap_counter.check_checkpoints(self.previous_positions[indices], batch.position[indices],
+                                                    indices)
+            self.previous_positions[indices] = batch.position[indices]
+
+        # Collisions de toutes les voitures déplacées pendant ce tick
+        with profiler.stage("check_collision"):
+            collisions = self.collisions(indices)
+
+        result = StepResult(indices, previous_checkpoints, previous_laps, crossed,
+                            lap_counter.current_checkpoint[indices], lap_counter.laps_completed[indices], collisions,
+                            rects)
+        if self.recorder is not None:
+            self.recorder.record(self, result, throttle, steer)
+        return result
+
+    def collisions(self, indices):
+        """
+        Détecte les collisions de plusieurs voitures avec l'herbe. En mode "obb", les rectangles orientés
+        sont testés directement sur les tableaux de CarBatch, un appel par taille de voiture ; en mode
+        "mask", chaque voiture est testée par son masque (Car.check_collision).
+
+        Paramètres :
+            indices : numpy.ndarray (N,)
+                Voitures concernées.
+
+        Retourne :
+            numpy.ndarray (N,) de bool : True pour les voitures en collision.
+        """
+        if self.collision_mode != "obb":
+            return np.array(check_collisions([self.cars[i] for i in indices.tolist()], self.game_map,
+                                             self.collision_mode), dtype=bool).reshape(-1)
+
+        batch = self.batch
+        collisions = np.zeros(len(indices), dtype=bool)
+        for width, height, group in self.size_groups:
+            rows = np.flatnonzero(np.isin(indices, group)) if len(self.size_groups) > 1 else np.arange(len(indices))
+            cars = indices[rows]
+            collisions[rows] = obb_collisions(batch.position[cars], batch.angle[cars], width, height,
+                                              self.game_map.grass_grid)
+        return collisions
+
+    def digest(self):
+        """
+        Empreinte de l'état de toutes les voitures (positions, vitesses, angles, checkpoints), pour vérifier
+        que deux simulations sont identiques au bit près.
+
+        Retourne :
+            str : Empreinte SHA-1 hexadécimale.
+        """
+        sha = hashlib.sha1()
+        for array in (self.batch.position, self.batch.velocity, self.batch.lateral_velocity, self.batch.angle,
+                      self.batch.speed, self.batch.active, self.lap_counter.current_checkpoint,
+                      self.lap_counter.laps_completed):
+            sha.update(np.ascontiguousarray(array).tobytes())
+        return sha.hexdigest()
+
+
+class StepResult:
+    def __init__(self, indices, previous_checkpoints, previous_laps, crossed, checkpoints, laps, collisions,
+                 rects=()):
+        """
+        Événements d'un tick, une ligne par voiture avancée.
+
+        Paramètres :
+            indices : numpy.ndarray
+                Voitures avancées pendant ce tick.
+            previous_checkpoints, previous_laps : numpy.ndarray
+                Prochain checkpoint et tours complétés avant le tick.
+            crossed : numpy.ndarray de bool
+                Voitures qui ont franchi un checkpoint.
+            checkpoints, laps : numpy.ndarray
+                Prochain checkpoint et tours complétés après le tick.
+            collisions : numpy.ndarray de bool
+                Voitures sorties de piste.
+            rects : list, optionnel
+                Zones de l'écran dessinées pendant ce tick.
+        """
+        self.indices = indices
+        self.previous_checkpoints = previous_checkpoints
+        self.previous_laps = previous_laps
+        self.crossed = crossed
+        self.checkpoints = checkpoints
+        self.laps = laps
+        self.collisions = collisions
+        self.rects = list(rects)
+        # Checkpoint récompensé (l'indice a augmenté : le premier checkpoint d'un nouveau tour ne compte pas)
+        self.rewarded = checkpoints > previous_checkpoints
+        self.lap_done = laps > previous_laps
@@ -0,0 +1,179 @@
+import multiprocessing
+import os
+
+import numpy as np
+
+SPECTATOR_FPS = 60  # Fréquence d'affichage du spectateur, indépendante de l'entraînement
+
+
+def run_viewer(connection, track_name, image_path, width, height, fps=SPECTATOR_FPS, video_driver=None):
+    """
+    Boucle du processus spectateur : affiche, à sa propre fréquence, la dernière image reçue de l'entraînement.
+
+    Le spectateur demande une image ("frame") quand il est prêt à l'afficher : l'entraînement n'envoie
+    jamais plus d'images que le spectateur n'en affiche, et ne l'attend jamais.
+
+    Paramètres :
+        connection : multiprocessing.connection.Connection
+            Extrémité du tube côté spectateur.
+        track_name : str
+            Nom ou chemin du circuit.
+        image_path : str
+            Image des voitures.
+        width, height : int
+            Dimensions des voitures.
+        fps : int, optionnel
+            Fréquence d'affichage.
+        video_driver : str, optionnel
+            Pilote vidéo SDL d'origine de l'utilisateur (None : pilote par défaut).
+    """
+    # Le processus hérite de l'environnement de l'entraînement, dont le pilote "dummy" (sans fenêtre) :
+    # le pilote d'origine est rétabli avant d'initialiser l'affichage
+    if video_driver is None:
+        os.environ.pop("SDL_VIDEODRIVER", None)
+    else:
+        os.environ["SDL_VIDEODRIVER"] = video_driver
+    import pygame
+    from python.car_neat import get_rotated_sprites
+    from python.track_registry import get_track
+
+    pygame.display.quit()  # Affichage éventuellement déjà initialisé avec "dummy" (import du script principal)
+    pygame.init()
+    game_map = get_track(track_name)
+    screen = pygame.display.set_mode(game_map.road_surface.get_size())
+    pygame.display.set_caption("Entraînement NEAT (spectateur)")
+    sprites = get_rotated_sprites(image_path, width, height)
+    font = pygame.font.Font(None, 28)
+    clock = pygame.time.Clock()
+    snapshot = None
+    requested = False
+
+    try:
+        while True:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    return
+
+            if not requested:
+                connection.send("frame")
+                requested = True
+            # Ne garde que l'image la plus récente
+            while connection.poll():
+                message = connection.recv()
+                if message is None:
+                    return
+                snapshot = message
+                requested = False
+
+            game_map.draw(screen)
+            if snapshot is not None:
+                for (x, y), angle in zip(snapshot["positions"].tolist(), snapshot["angles"].tolist()):
+                    surface, _ = sprites.get(angle)
+                    screen.blit(surface, surface.get_rect(center=(x, y)))
+                text = (f"Génération {snapshot['generation']}  tick {snapshot['tick']}  "
+                        f"voitures actives : {snapshot['active']}  meilleure fitness : {snapshot['best_fitness']:.1f}")
+                screen.blit(font.render(text, True, (255, 255, 255), (0, 0, 0)), (10, 10))
+            pygame.display.flip()
+            clock.tick(fps)
+    except (EOFError, BrokenPipeError):
+        pass  # L'entraînement est terminé
+    finally:
+        pygame.quit()
+
+
+class SpectatorStream:
+    def __init__(self, track_name, image_path, width, height, best=10, every=1, fps=SPECTATOR_FPS,
+                 video_driver=None):
+        """
+        Diffuse l'entraînement (sans affichage) vers un processus spectateur qui dessine les meilleures
+        voitures dans sa propre fenêtre.
+
+        L'envoi est tiré par le spectateur : à chaque tick, publish() ne fait qu'un poll non bloquant et
+        n'envoie une image (positions et angles de quelques voitures) que si le spectateur en a demandé
+        une. Fermer la fenêtre du spectateur n'interrompt pas l'entraînement.
+
+        Paramètres :
+            track_name : str
+                Nom ou chemin du circuit.
+            image_path : str
+                Image des voitures.
+            width, height : int
+                Dimensions des voitures.
+            best : int, optionnel
+                Nombre de voitures affichées (les meilleures fitness) ; 0 affiche toutes les voitures actives.
+            every : int, optionnel
+                Diffuse une génération sur every.
+            fps : int, optionnel
+                Fréquence d'affichage du spectateur.
+            video_driver : str, optionnel
+                Pilote vidéo SDL de l'utilisateur, relevé avant que l'entraînement ne choisisse "dummy"
+                (None : pilote par défaut).
+        """
+        self.best = best
+        self.every = every
+        self.generation = 0
+        self.streaming = False
+        context = multiprocessing.get_context("spawn")
+        self.connection, viewer_connection = context.Pipe()
+        self.process = context.Process(target=run_viewer, daemon=True,
+                                       args=(viewer_connection, track_name, image_path, width, height, fps,
+                                             video_driver))
+        self.process.start()
+        viewer_connection.close()
+
+    def begin_generation(self, generation):
+        """
+        Paramètres :
+            generation : int
+                Numéro de la génération qui commence.
+        """
+        self.generation = generation
+        self.streaming = self.connection is not None and generation % self.every == 0
+
+    def publish(self, simulation):
+        """
+        Envoie l'état courant si le spectateur attend une image.
+
+        Paramètres :
+            simulation : PopulationSimulation
+                Simulation de la génération en cours.
+        """
+        if not self.streaming:
+            return
+        try:
+            if not self.connection.poll():
+                return
+            while self.connection.poll():
+                self.connection.recv()
+            active = simulation.active_cars
+            fitness = simulation.fitness[active] + simulation.bonus[active]
+            if 0 < self.best < len(active):
+                keep = np.argpartition(-fitness, self.best - 1)[:self.best]
+                shown = active[keep]
+            else:
+                shown = active
+            self.connection.send({"generation": self.generation, "tick": simulation.tick,
+                                  "positions": simulation.batch.position[shown].copy(),
+                                  "angles": simulation.batch.angle[shown].copy(), "active": len(active),
+                                  "best_fitness": float(fitness.max()) if len(fitness) else 0.0})
+        except (EOFError, BrokenPipeError, ConnectionResetError, OSError):
+            # Le spectateur a été fermé : l'entraînement continue sans lui
+            self.connection = None
+            self.streaming = False
+
+    def close(self):
+        """
+        Arrête le spectateur.
+        """
+        if self.connection is not None:
+            try:
+                self.connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.connection.close()
+            self.connection = None
+        if self.process is not None:
+            self.process.join(timeout=5)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process = None
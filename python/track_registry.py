@@ -0,0 +1,95 @@
+import os
+
+from python.map import Map
+
+# Dossier contenant les fichiers JSON des circuits
+MAPS_DIR = os.path.join(os.path.dirname(__file__), "..", "maps")
+DEFAULT_TRACK = "map"  # Circuit par défaut (maps/map.json)
+
+# Circuits déjà chargés dans ce processus : {chemin absolu du JSON: Map}
+_tracks = {}
+
+
+def track_path(name):
+    """
+    Convertit un nom de circuit en chemin de fichier JSON.
+
+    Paramètres :
+        name : str
+            Nom d'un circuit de maps/ (ex. "map" pour maps/map.json) ou chemin vers un fichier JSON.
+
+    Retourne :
+        str : Chemin absolu du fichier JSON.
+    """
+    if name.endswith(".json") or os.path.sep in name or "/" in name:
+        return os.path.abspath(name)
+    return os.path.abspath(os.path.join(MAPS_DIR, f"{name}.json"))
+
+
+def available_tracks():
+    """
+    Liste les circuits disponibles dans maps/.
+
+    Retourne :
+        list : Noms des circuits (nom du fichier JSON sans l'extension).
+    """
+    return sorted(file[:-5] for file in os.listdir(MAPS_DIR) if file.endswith(".json"))
+
+
+def get_track(name=DEFAULT_TRACK):
+    """
+    Renvoie la carte partagée d'un circuit, en ne la chargeant qu'une fois par processus.
+
+    La carte regroupe la surface de la route, le masque et la grille de l'herbe, le champ de distance
+    et les checkpoints. Elle est partagée entre tous les appelants et doit être traitée en lecture seule :
+    ses tableaux NumPy sont verrouillés en écriture.
+
+    Paramètres :
+        name : str, optionnel
+            Nom du circuit ou chemin vers son fichier JSON.
+
+    Retourne :
+        Map : La carte du circuit.
+    """
+    path = track_path(name)
+    if path not in _tracks:
+        track = Map(path)
+        for array in (track.grass_grid, track.distance_field):
+            array.flags.writeable = False
+        _tracks[path] = track
+    return _tracks[path]
+
+
+def register_track(name, track):
+    """
+    Inscrit une carte déjà construite dans le registre : get_track la renverra pour ce circuit (par exemple
+    une carte attachée à la mémoire partagée, voir python.shared_track).
+
+    Paramètres :
+        name : str
+            Nom du circuit ou chemin vers son fichier JSON.
+        track : Map ou SharedMap
+            Carte du circuit, en lecture seule.
+    """
+    _tracks[track_path(name)] = track
+
+
+def preload_tracks(names):
+    """
+    Charge plusieurs circuits à l'avance pour qu'ils restent en mémoire simultanément.
+
+    Paramètres :
+        names : list
+            Noms ou chemins des circuits.
+
+    Retourne :
+        list : Les cartes correspondantes, dans le même ordre.
+    """
+    return [get_track(name) for name in names]
+
+
+def clear_tracks():
+    """
+    Oublie les circuits chargés (par exemple après avoir modifié une carte avec road_maker.py).
+    """
+    _tracks.clear()
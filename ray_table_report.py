@@ -0,0 +1,35 @@
+import sys
+import time
+
+import pygame
+
+from python.track_registry import get_track, DEFAULT_TRACK
+from python.ray_table import get_ray_table, ray_table_report, format_ray_table_report, RAY_TABLE_CELL, RAY_TABLE_ANGLE
+
+SAMPLES = 20000  # Nombre de rayons comparés au lancer exact
+
+
+if __name__ == "__main__":
+    # Usage : python ray_table_report.py [circuit ...] [--samples=20000] [--seed=0]
+    # Calcule (ou ouvre depuis le cache) la table des rayons de chaque circuit, puis compare ses distances
+    # à celles du lancer exact sur des rayons tirés au hasard
+    samples = SAMPLES
+    seed = 0
+    tracks = []
+    for arg in sys.argv[1:]:
+        if arg.startswith("--samples="):
+            samples = int(arg.split("=", 1)[1])
+        elif arg.startswith("--seed="):
+            seed = int(arg.split("=", 1)[1])
+        else:
+            tracks.append(arg)
+
+    pygame.init()
+    for track in tracks or [DEFAULT_TRACK]:
+        game_map = get_track(track)
+        start = time.perf_counter()
+        table = get_ray_table(game_map)
+        elapsed = time.perf_counter() - start
+        print(f"\nCircuit {track} (grille {RAY_TABLE_CELL} px, {RAY_TABLE_ANGLE}°) : "
+              f"table prête en {elapsed:.2f} s")
+        print(format_ray_table_report(ray_table_report(game_map, table, samples, seed)))
@@ -0,0 +1,156 @@
+import glob
+import os
+import sys
+
+import pygame
+
+from python.replay import Replay, REPLAY_DIR
+from python.track_registry import get_track
+from python.car_neat import get_rotated_sprites
+
+PLAYER_FPS = 60  # Fréquence d'affichage du lecteur
+SPEEDS = (0.25, 0.5, 1, 2, 4, 8, 16, 32)  # Vitesses de lecture (ticks simulés par tick affiché, à 60 FPS)
+SEEK_SECONDS = 1  # Saut des flèches gauche et droite (en secondes simulées, x10 avec Maj)
+TIMELINE_HEIGHT = 12  # Hauteur de la barre de progression en bas de la fenêtre
+LEADERBOARD_SIZE = 10  # Nombre de voitures listées dans le tableau
+
+
+def latest_replay(directory=REPLAY_DIR):
+    """
+    Retourne :
+        str ou None : Le replay le plus récent du dossier, ou None s'il n'y en a aucun.
+    """
+    files = glob.glob(os.path.join(directory, "*.npz"))
+    return max(files, key=os.path.getmtime) if files else None
+
+
+def format_summary(replay):
+    """
+    Paramètres :
+        replay : Replay
+            Replay chargé.
+
+    Retourne :
+        str : Résumé lisible du replay (une ligne par voiture).
+    """
+    meta = replay.metadata
+    checkpoints, laps = replay.progress(replay.length)
+    lines = [f"Replay {replay.path} : circuit {meta.get('track')}@{meta.get('pose', 0)}, génération "
+             f"{meta.get('generation')}, {len(replay.names)} voitures, {replay.length} ticks "
+             f"({replay.length * replay.dt:.1f} s)",
+             f"{'voiture':<20}{'fitness':>12}{'tours':>7}{'checkpoint':>12}{'dernier tick':>14}{'sortie':>8}"]
+    for i, name in enumerate(replay.names):
+        crash = int(replay.collision_tick[i])
+        lines.append(f"{name[:19]:<20}{replay.fitness[i]:>12.1f}{laps[i]:>7}{checkpoints[i]:>12}"
+                     f"{int(replay.ticks[i]):>14}{crash if crash else '-':>8}")
+    return "\n".join(lines)
+
+
+def play(replay, speed=1):
+    """
+    Affiche un replay dans une fenêtre jusqu'à sa fermeture.
+
+    Commandes : Espace met en pause, flèches gauche et droite reculent et avancent (Maj : x10), flèches
+    haut et bas changent la vitesse, Origine revient au départ, un clic sur la barre du bas saute à ce moment.
+
+    Paramètres :
+        replay : Replay
+            Replay à afficher.
+        speed : float, optionnel
+            Vitesse de lecture initiale.
+    """
+    meta = replay.metadata
+    game_map = get_track(meta["track"])
+    screen = pygame.display.set_mode(game_map.road_surface.get_size())
+    pygame.display.set_caption(f"Replay : {os.path.basename(replay.path)}")
+    width, height = screen.get_size()
+    background = game_map.road_surface.convert()
+    sprites = get_rotated_sprites(meta["image_path"], meta["width"], meta["height"])
+    font = pygame.font.Font(None, 24)
+    clock = pygame.time.Clock()
+
+    speed_index = min(range(len(SPEEDS)), key=lambda k: abs(SPEEDS[k] - speed))
+    position = 0.0  # Tick affiché (fractionnaire aux vitesses inférieures à 1)
+    paused = False
+
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return
+            if event.type == pygame.KEYDOWN:
+                seek = SEEK_SECONDS / replay.dt * (10 if event.mod & pygame.KMOD_SHIFT else 1)
+                if event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_RIGHT:
+                    position += seek
+                elif event.key == pygame.K_LEFT:
+                    position -= seek
+                elif event.key == pygame.K_UP:
+                    speed_index = min(speed_index + 1, len(SPEEDS) - 1)
+                elif event.key == pygame.K_DOWN:
+                    speed_index = max(speed_index - 1, 0)
+                elif event.key == pygame.K_HOME:
+                    position = 0.0
+                elif event.key == pygame.K_ESCAPE:
+                    return
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.pos[1] >= height - TIMELINE_HEIGHT:
+                position = event.pos[0] / width * replay.length
+
+        if not paused:
+            position += SPEEDS[speed_index]
+        position = min(max(position, 0.0), float(replay.length))
+        tick = int(position)
+
+        # Voitures : les arrêtées en gris, sous celles en course
+        screen.blit(background, (0, 0))
+        positions, angles = replay.poses(tick)
+        status = replay.status(tick)
+        order = sorted(range(len(status)), key=lambda i: status[i] == "en course")
+        for i in order:
+            surface, _ = sprites.get(float(angles[i]))
+            if status[i] != "en course":
+                surface = surface.copy()
+                surface.fill((128, 128, 128, 255), special_flags=pygame.BLEND_RGBA_MULT)
+            screen.blit(surface, surface.get_rect(center=(float(positions[i, 0]), float(positions[i, 1]))))
+
+        # Tableau : les voitures les plus avancées à ce tick
+        checkpoints, laps = replay.progress(tick)
+        ranking = sorted(range(len(status)), key=lambda i: (-laps[i], -checkpoints[i], -replay.fitness[i]))
+        header = (f"Génération {meta.get('generation')}  tick {tick}/{replay.length}  {tick * replay.dt:.2f} s  "
+                  f"x{SPEEDS[speed_index]:g}{'  (pause)' if paused else ''}")
+        screen.blit(font.render(header, True, (255, 255, 255), (0, 0, 0)), (10, 10))
+        for row, i in enumerate(ranking[:LEADERBOARD_SIZE]):
+            text = (f"{replay.names[i]}  tours {laps[i]}  checkpoint {checkpoints[i]}  "
+                    f"vitesse {replay.speed[i, tick]:.0f}  {status[i]}")
+            screen.blit(font.render(text, True, (255, 255, 255), (0, 0, 0)), (10, 40 + 24 * row))
+
+        # Barre de progression
+        pygame.draw.rect(screen, (40, 40, 40), (0, height - TIMELINE_HEIGHT, width, TIMELINE_HEIGHT))
+        filled = int(width * tick / max(replay.length, 1))
+        pygame.draw.rect(screen, (230, 180, 0), (0, height - TIMELINE_HEIGHT, filled, TIMELINE_HEIGHT))
+
+        pygame.display.flip()
+        clock.tick(PLAYER_FPS)
+
+
+if __name__ == "__main__":
+    # Usage : python replay_player.py [replay.npz] [--speed=1] [--summary]
+    # Sans fichier, ouvre le replay le plus récent du dossier "replays" (écrit par main_neat.py --replay=N).
+    # "--summary" affiche le résumé du replay sans ouvrir de fenêtre.
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    summary = "--summary" in sys.argv[1:]
+    speed = 1
+    for arg in sys.argv[1:]:
+        if arg.startswith("--speed="):
+            speed = float(arg.split("=", 1)[1])
+
+    path = args[0] if args else latest_replay()
+    if path is None:
+        sys.exit(f"Aucun replay dans {REPLAY_DIR} : lancer l'entraînement avec --replay=N")
+    replay = Replay(path)
+    print(format_summary(replay))
+
+    if not summary:
+        pygame.init()
+        play(replay, speed)
+        pygame.quit()
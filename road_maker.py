@@ -47,6 +47,7 @@ class MapEditor:
         # Structures de données pour les checkpoints et la position de départ
         self.checkpoints = []  # Liste des dictionnaires : {'start': (x, y), 'end': (x, y), 'order': int}
         self.start_position = None  # Tuple (x, y) pour la position de départ
+        self.start_options = {}  # Orientation et positions de départ supplémentaires du JSON, conservées telles quelles
 
         # Mode actuel
         self.mode = MODE_DRAW
@@ -167,6 +168,7 @@ class MapEditor:
             'checkpoints': self.checkpoints,
             'start_position': self.start_position
         }
+        data.update(self.start_options)
         pygame.image.save(self.road_surface, "maps/road.png")
         data['road_image'] = "maps/road.png"
         with open(MAP_FILE, 'w') as f:
@@ -198,6 +200,7 @@ class MapEditor:
         self.render_all_checkpoints()
 
         self.start_position = data.get('start_position')
+        self.start_options = {key: data[key] for key in ('start_angle', 'start_poses') if key in data}
         if self.start_position:
             self.render_start_position()
 